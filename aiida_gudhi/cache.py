@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of Rips calculation results
+
+Results are keyed on a hash of the distance matrix content together with the
+normalized command line parameters and settings. A cache hit returns the
+output nodes of the earlier calculation instead of submitting a new one.
+
+Usage::
+
+    cache = RipsCache(max_size=10 * 1024**3)
+    calc, outputs = cache.submit(calc)  # calc is None on a hit
+    ...
+    cache.add(calc)  # once calc has finished
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+#: Extra of a calculation holding its cache key
+KEY_EXTRA = 'gudhi_cache_key'
+
+#: Number of bytes hashed at a time
+HASH_CHUNK_SIZE = 2**24
+
+
+def _hash_file(sha, filename):
+    """Update hash with content of file."""
+    with open(filename, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+            sha.update(chunk)
+
+
+def hash_distance_matrix(node):
+    """Hash of distance matrix content.
+
+    :param node: SinglefileData (GUDHI text format), DistanceMatrixData or
+        point cloud ArrayData
+    :returns: hex digest or None, if content cannot be hashed
+    """
+    from aiida.orm import DataFactory
+    SinglefileData = DataFactory('singlefile')
+    ArrayData = DataFactory('array')
+
+    sha = hashlib.sha256()
+    sha.update(type(node).__name__.encode('utf-8'))
+
+    if isinstance(node, SinglefileData):
+        _hash_file(sha, node.get_file_abs_path())
+    elif isinstance(node, ArrayData):
+        # .npy files include dtype and shape in their header
+        for name in sorted(node.get_arraynames()):
+            sha.update(name.encode('utf-8'))
+            _hash_file(sha, node.get_abs_path('{}.npy'.format(name)))
+    else:
+        return None
+
+    return sha.hexdigest()
+
+
+def normalize_parameters(parameters):
+    """Normalized representation of RipsDistanceMatrixParameters.
+
+    Defaults are filled in by the schema, such that parameters set explicitly
+    to their default value give the same result as omitted ones.
+
+    :returns: JSON string with sorted keys
+    """
+    parameters_dict = parameters.validate(parameters.get_dict())
+    return json.dumps(parameters_dict, sort_keys=True)
+
+
+def normalize_settings(settings):
+    """Normalized representation of settings of a Rips calculation.
+
+    Settings change the outputs (e.g. threshold sweeps, summary-only
+    retrieval), so they are part of the key. Defaults are filled in by the
+    schema; no settings are equivalent to empty settings.
+
+    :param settings: ParameterData or None
+    :returns: JSON string with sorted keys
+    """
+    from aiida_gudhi.data.rips import settings_schema
+    settings_dict = {} if settings is None else settings.get_dict()
+    return json.dumps(settings_schema(settings_dict), sort_keys=True)
+
+
+def cache_key(distance_matrix, parameters, settings=None):
+    """Cache key of a Rips calculation.
+
+    :param distance_matrix: node providing the distance matrix
+    :param parameters: RipsDistanceMatrixParameters
+    :param settings: ParameterData with settings of the calculation
+    :returns: hex digest or None, if the input cannot be cached
+    """
+    content = hash_distance_matrix(distance_matrix)
+    if content is None:
+        return None
+
+    sha = hashlib.sha256()
+    sha.update(content.encode('utf-8'))
+    sha.update(normalize_parameters(parameters).encode('utf-8'))
+    sha.update(normalize_settings(settings).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def calculation_key(calc):
+    """Cache key of a RipsDistanceMatrixCalculation from its inputs.
+
+    Calculations with parameter variants are not cached.
+    """
+    inputs = calc.get_inputs_dict()
+    if calc.get_variants():
+        return None
+    for linkname in ['distance_matrix', 'point_cloud']:
+        if linkname in inputs:
+            return cache_key(inputs[linkname], inputs['parameters'],
+                             inputs.get('settings'))
+    return None
+
+
+class RipsCache(object):
+    """
+    Cache of Rips calculation results with LRU eviction.
+
+    The cache lives in a directory containing an ``index.json`` and a copy
+    of the barcode file of each entry. If ``max_size`` (bytes) is given,
+    least recently used entries are evicted once the barcode files exceed
+    this size.
+    """
+
+    def __init__(self, path=None, max_size=None):
+        """
+        :param path: cache directory (default: gudhi_cache in the AiiDA
+            configuration folder)
+        :param max_size: maximum total size of cached barcode files in bytes
+        """
+        if path is None:
+            from aiida.common.setup import AIIDA_CONFIG_FOLDER
+            path = os.path.join(
+                os.path.expanduser(AIIDA_CONFIG_FOLDER), 'gudhi_cache')
+
+        self.path = path
+        self.max_size = max_size
+
+        if not os.path.isdir(self._files_dir):
+            os.makedirs(self._files_dir)
+
+    @property
+    def _index_file(self):
+        return os.path.join(self.path, 'index.json')
+
+    @property
+    def _files_dir(self):
+        return os.path.join(self.path, 'files')
+
+    def _file(self, key):
+        return os.path.join(self._files_dir, '{}.barcode'.format(key))
+
+    def _load(self):
+        """Load index from disk."""
+        try:
+            with open(self._index_file, 'r') as handle:
+                return json.load(handle)
+        except (IOError, OSError):
+            return {'entries': {}, 'hits': 0, 'misses': 0}
+
+    def _save(self, index):
+        """Write index to disk atomically."""
+        handle, tmp = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(handle, 'w') as tmp_handle:
+            json.dump(index, tmp_handle)
+        os.rename(tmp, self._index_file)
+
+    def _evict(self, index):
+        """Remove least recently used entries until within max_size."""
+        if self.max_size is None:
+            return
+
+        entries = index['entries']
+        lru = sorted(entries, key=lambda k: entries[k]['last_used'])
+        total = sum(e['size'] for e in entries.values())
+        while total > self.max_size and lru:
+            key = lru.pop(0)
+            total -= entries.pop(key)['size']
+            if os.path.exists(self._file(key)):
+                os.remove(self._file(key))
+
+    @property
+    def stats(self):
+        """Cache statistics.
+
+        :returns: dict with hits, misses, number of entries and total size
+        """
+        index = self._load()
+        return {
+            'hits': index['hits'],
+            'misses': index['misses'],
+            'entries': len(index['entries']),
+            'size': sum(e['size'] for e in index['entries'].values()),
+        }
+
+    def get_file(self, key):
+        """Return path to cached barcode file (or None)."""
+        filename = self._file(key)
+        return filename if os.path.exists(filename) else None
+
+    def lookup(self, key):
+        """Look up output nodes of cached calculation.
+
+        Counts a hit or a miss.
+
+        :param key: cache key
+        :returns: dict of output nodes (link name: node) or None
+        """
+        from aiida.orm import load_node
+        from aiida.common.exceptions import NotExistent
+
+        index = self._load()
+        entry = index['entries'].get(key)
+        outputs = None
+
+        if entry is not None:
+            try:
+                calc = load_node(entry['calc'])
+                outputs = {
+                    link: node
+                    for link, node in calc.get_outputs_dict().items()
+                    if link in entry['links']
+                }
+                entry['last_used'] = time.time()
+            except NotExistent:
+                del index['entries'][key]
+
+        if outputs:
+            index['hits'] += 1
+        else:
+            index['misses'] += 1
+        self._save(index)
+
+        return outputs
+
+    def submit(self, calc):
+        """Submit calculation unless its result is cached.
+
+        :param calc: unstored RipsDistanceMatrixCalculation with inputs set
+        :returns: tuple (calc, None) if calc was submitted, (None, outputs)
+            with dict of cached output nodes on a cache hit
+        """
+        key = calculation_key(calc)
+        if key is not None:
+            outputs = self.lookup(key)
+            if outputs:
+                return None, outputs
+
+        calc.store_all()
+        if key is not None:
+            calc.set_extra(KEY_EXTRA, key)
+        calc.submit()
+        return calc, None
+
+    def add(self, calc):
+        """Add results of finished calculation to the cache.
+
+        :param calc: RipsDistanceMatrixCalculation submitted via ``submit``
+        """
+        key = calc.get_extra(KEY_EXTRA, None) or calculation_key(calc)
+        if key is None:
+            return
+
+        outputs = calc.get_outputs_dict()
+        parameters = calc.inp.parameters
+        links = [
+            name for link in parameters.output_links
+            for name in [
+                link, '{}_barcode'.format(link), '{}_summary'.format(link)
+            ] if name in outputs
+        ] + sorted(
+            name for link in parameters.output_links for name in outputs
+            if name.startswith('{}_sweep_'.format(link)))
+        # nothing to cache without barcode (e.g. only summary retrieved)
+        if parameters.output_links[0] not in links:
+            return
+
+        barcode = outputs[parameters.output_links[0]].get_file_abs_path()
+        shutil.copyfile(barcode, self._file(key))
+
+        index = self._load()
+        index['entries'][key] = {
+            'calc': calc.uuid,
+            'links': links,
+            'size': os.path.getsize(self._file(key)),
+            'last_used': time.time(),
+        }
+        self._evict(index)
+        self._save(index)
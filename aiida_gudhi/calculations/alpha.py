@@ -0,0 +1,216 @@
+"""
+Alpha complex calculation
+
+Register calculations via the "aiida.calculations" entry point in setup.json.
+"""
+
+import numpy as np
+from voluptuous import Invalid
+from aiida.orm.calculation.job import JobCalculation
+from aiida.common.utils import classproperty
+from aiida.common.exceptions import (InputValidationError, ValidationError)
+from aiida.common.datastructures import (CalcInfo, CodeInfo)
+from aiida.orm import DataFactory
+from aiida_gudhi.data.rips import settings_schema
+from aiida_gudhi import compression
+
+ParameterData = DataFactory('parameter')
+ArrayData = DataFactory('array')
+StructureData = DataFactory('structure')
+AlphaComplexParameters = DataFactory('gudhi.alpha')
+
+
+def write_off(handle, positions):
+    """Write point coordinates in OFF format (vertices only).
+
+    :param handle: writable file handle
+    :param positions: array of point coordinates (n, d)
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    handle.write('OFF\n{} 0 0\n'.format(len(positions)))
+    np.savetxt(handle, positions, fmt='%.12g')
+
+
+class AlphaComplexCalculation(JobCalculation):
+    """
+    Calculating persistence homology diagram of the alpha complex of points.
+
+    Takes point coordinates instead of a distance matrix. Note that the
+    filtration values of alpha complexes are squared radii.
+    Periodic structures are not supported.
+    """
+
+    _POINTS_FILE = 'points.off'
+
+    def _init_internal_params(self):
+        """
+        Init internal parameters at class load time
+        """
+        # reuse base class function
+        super(AlphaComplexCalculation, self)._init_internal_params()
+
+        self._default_parser = 'gudhi.alpha'
+
+    @classproperty
+    def _use_methods(cls):
+        """
+        Add use_* methods for calculations.
+
+        Code below enables the usage
+        my_calculation.use_parameters(my_parameters)
+        """
+        use_dict = JobCalculation._use_methods
+        use_dict.update({
+            "parameters": {
+                'valid_types': AlphaComplexParameters,
+                'additional_parameter': None,
+                'linkname': 'parameters',
+                'docstring': 'add command line parameters',
+            },
+            "point_cloud": {
+                'valid_types': (ArrayData, StructureData),
+                'additional_parameter': None,
+                'linkname': 'point_cloud',
+                'docstring': "point coordinates ('positions' array of "
+                "ArrayData or sites of non-periodic StructureData)",
+            },
+            "settings": {
+                'valid_types': ParameterData,
+                'additional_parameter': None,
+                'linkname': 'settings',
+                'docstring': "additional settings (see settings_schema)",
+            },
+        })
+        return use_dict
+
+    def get_barcode_outputs(self):
+        """Output files of the calculation.
+
+        :returns: list of tuples (file name, link name, parameters)
+        """
+        parameters = self.get_inputs_dict()['parameters']
+        return [(fname, link, parameters)
+                for fname, link in zip(parameters.output_files,
+                                       parameters.output_links)]
+
+    def _validate_inputs(self, inputdict):
+        """ Validate input links.
+        """
+        # Check inputdict
+        try:
+            parameters = inputdict.pop(self.get_linkname('parameters'))
+        except KeyError:
+            raise InputValidationError("No parameters specified for this "
+                                       "calculation")
+        if not isinstance(parameters, AlphaComplexParameters):
+            raise InputValidationError("parameters not of type "
+                                       "AlphaComplexParameters")
+        # Check code
+        try:
+            code = inputdict.pop(self.get_linkname('code'))
+        except KeyError:
+            raise InputValidationError("No code specified for this "
+                                       "calculation")
+
+        # Check input points
+        try:
+            point_cloud = inputdict.pop(self.get_linkname('point_cloud'))
+        except KeyError:
+            raise InputValidationError("No point_cloud specified for this "
+                                       "calculation")
+
+        if isinstance(point_cloud, StructureData):
+            if any(point_cloud.pbc):
+                raise InputValidationError(
+                    "Periodic structures are not supported")
+            positions = np.array([s.position for s in point_cloud.sites])
+        elif isinstance(point_cloud, ArrayData):
+            if 'positions' not in point_cloud.get_arraynames():
+                raise InputValidationError(
+                    "point_cloud does not contain 'positions' array")
+            positions = point_cloud.get_array('positions')
+        else:
+            raise InputValidationError(
+                "point_cloud not of type ArrayData or StructureData")
+
+        settings = self._validate_settings(
+            inputdict.pop(self.get_linkname('settings'), None), parameters)
+
+        # Check that nothing is left unparsed
+        if inputdict:
+            raise ValidationError("Unrecognized inputs: {}".format(inputdict))
+
+        return parameters, code, positions, settings
+
+    @staticmethod
+    def _validate_settings(settings, parameters):
+        """Validate settings input.
+
+        :returns: settings dictionary with defaults
+        """
+        if settings is None:
+            settings_dict = {}
+        elif not isinstance(settings, ParameterData):
+            raise InputValidationError("settings not of type ParameterData")
+        else:
+            settings_dict = settings.get_dict()
+
+        try:
+            settings_dict = settings_schema(settings_dict)
+        except Invalid as exc:
+            raise InputValidationError("Invalid settings: {}".format(exc))
+
+        if settings_dict['retrieve'] == 'summary':
+            raise InputValidationError(
+                "retrieve 'summary' is not supported for alpha complexes")
+
+        # as for Rips, truncation is exact only without persistence cutoff
+        thresholds = settings_dict['threshold_sweep']
+        if thresholds:
+            threshold = parameters.threshold
+            if threshold is not None and max(thresholds) > threshold:
+                raise InputValidationError(
+                    "threshold_sweep values must not exceed max-alpha-square")
+            if parameters.get_dict()['min-persistence'] > 0:
+                raise InputValidationError(
+                    "threshold_sweep requires min-persistence 0")
+
+        return settings_dict
+
+    def _prepare_for_submission(self, tempfolder, inputdict):
+        """
+        Create input files.
+
+            :param tempfolder: aiida.common.folders.Folder subclass where
+                the plugin should put all its files.
+            :param inputdict: dictionary of the input nodes as they would
+                be returned by get_inputs_dict
+        """
+        parameters, code, positions, settings = self._validate_inputs(
+            inputdict)
+        compress = settings.get('compression')
+
+        with open(tempfolder.get_abs_path(self._POINTS_FILE), 'w') as handle:
+            write_off(handle, positions)
+
+        # Prepare CalcInfo to be returned to aiida
+        calcinfo = CalcInfo()
+        calcinfo.uuid = self.uuid
+        calcinfo.local_copy_list = []
+        calcinfo.remote_copy_list = []
+        calcinfo.retrieve_list = [
+            compression.compressed_name(fname, compress)
+            for fname in parameters.output_files
+        ]
+        # barcodes are compressed on the remote before retrieval
+        if compress:
+            calcinfo.append_text = compression.compress_command(
+                parameters.output_files, compress)
+
+        codeinfo = CodeInfo()
+        codeinfo.cmdline_params = parameters.cmdline_params(
+            points_file_name=self._POINTS_FILE)
+        codeinfo.code_uuid = code.uuid
+        calcinfo.codes_info = [codeinfo]
+
+        return calcinfo
@@ -0,0 +1,300 @@
+"""
+Batched Rips calculation: several distance matrices in one scheduler job
+
+Register calculations via the "aiida.calculations" entry point in setup.json.
+"""
+
+import re
+from voluptuous import Schema, Optional, Any, Invalid
+from aiida.orm.calculation.job import JobCalculation
+from aiida.common.utils import classproperty
+from aiida.common.exceptions import (InputValidationError, ValidationError)
+from aiida.common.datastructures import CalcInfo
+from aiida.orm import DataFactory
+from aiida_gudhi.distance import validate_gudhi_matrix
+
+ParameterData = DataFactory('parameter')
+SinglefileData = DataFactory('singlefile')
+RipsDistanceMatrixParameters = DataFactory('gudhi.rdm')
+DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+
+#: Schema of 'settings' input of RipsBatchCalculation
+settings_schema = Schema({
+    # run entries one after the other or in parallel
+    Optional('mode', default='serial'): Any('serial', 'parallel'),
+    # number of entries run at the same time in parallel mode
+    # (default: number of allocated MPI processes)
+    Optional('num_parallel'): int,
+})
+
+
+class RipsBatchCalculation(JobCalculation):
+    """
+    Calculating persistence homology diagrams of several distance matrices
+    in a single job.
+
+    Each entry is identified by a label and consists of a distance matrix
+    (``use_distance_matrix(node, label)``) and optionally its own parameters
+    (``use_parameters(node, label)``; default: shared ``parameters``).
+    A generated driver script runs GUDHI on the entries, one after the other
+    or in parallel over the allocated cores.
+    """
+
+    _DRIVER_SCRIPT = 'batch.sh'
+    _LABEL_REGEX = re.compile(r'^[A-Za-z0-9_]+$')
+
+    def _init_internal_params(self):
+        """
+        Init internal parameters at class load time
+        """
+        # reuse base class function
+        super(RipsBatchCalculation, self)._init_internal_params()
+
+        self._default_parser = 'gudhi.rdm_batch'
+
+    @classmethod
+    def _get_linkname_distance_matrix(cls, label):
+        return 'distance_matrix_{}'.format(label)
+
+    @classmethod
+    def _get_linkname_parameters(cls, label):
+        return 'parameters_{}'.format(label)
+
+    @classproperty
+    def _use_methods(cls):
+        """
+        Add use_* methods for calculations.
+
+        Code below enables the usage
+        my_calculation.use_distance_matrix(my_matrix, label='a')
+        """
+        use_dict = JobCalculation._use_methods
+        use_dict.update({
+            "parameters": {
+                'valid_types': RipsDistanceMatrixParameters,
+                'additional_parameter': 'label',
+                'linkname': cls._get_linkname_parameters,
+                'docstring': 'add command line parameters of entry',
+            },
+            "shared_parameters": {
+                'valid_types': RipsDistanceMatrixParameters,
+                'additional_parameter': None,
+                'linkname': 'parameters',
+                'docstring': 'command line parameters of entries without '
+                'their own parameters',
+            },
+            "distance_matrix": {
+                'valid_types': (SinglefileData, DistanceMatrixData),
+                'additional_parameter': 'label',
+                'linkname': cls._get_linkname_distance_matrix,
+                'docstring': "distance matrix of entry",
+            },
+            "settings": {
+                'valid_types': ParameterData,
+                'additional_parameter': None,
+                'linkname': 'settings',
+                'docstring': "additional settings (see settings_schema)",
+            },
+        })
+        return use_dict
+
+    def get_labels(self):
+        """Labels of entries, from the input links."""
+        prefix = self._get_linkname_distance_matrix('')
+        return sorted(link[len(prefix):] for link in self.get_inputs_dict()
+                      if link.startswith(prefix))
+
+    def get_parameters(self, label):
+        """Parameters of entry (own or shared), from the input links."""
+        inputs = self.get_inputs_dict()
+        return inputs.get(
+            self._get_linkname_parameters(label),
+            inputs.get(self.get_linkname('shared_parameters')))
+
+    @staticmethod
+    def output_file(label):
+        """Name of barcode file of entry."""
+        return '{}.barcode'.format(label)
+
+    @staticmethod
+    def matrix_file(label):
+        """Name of distance matrix file of entry."""
+        return '{}.matrix'.format(label)
+
+    def _validate_inputs(self, inputdict):
+        """ Validate input links.
+
+        :returns: tuple (code, entries, settings) where entries is a
+            dictionary {label: (distance_matrix, parameters)}
+        """
+        # Check code
+        try:
+            code = inputdict.pop(self.get_linkname('code'))
+        except KeyError:
+            raise InputValidationError("No code specified for this "
+                                       "calculation")
+        if code.is_local():
+            raise InputValidationError(
+                "RipsBatchCalculation requires a remote code")
+
+        shared_parameters = inputdict.pop(
+            self.get_linkname('shared_parameters'), None)
+
+        matrix_prefix = self._get_linkname_distance_matrix('')
+        parameters_prefix = self._get_linkname_parameters('')
+        matrices = {
+            link[len(matrix_prefix):]: inputdict.pop(link)
+            for link in list(inputdict) if link.startswith(matrix_prefix)
+        }
+        parameters = {
+            link[len(parameters_prefix):]: inputdict.pop(link)
+            for link in list(inputdict)
+            if link.startswith(parameters_prefix)
+        }
+        if not matrices:
+            raise InputValidationError("No distance matrices specified")
+
+        entries = {}
+        for label, distance_matrix in matrices.items():
+            if not self._LABEL_REGEX.match(label):
+                raise InputValidationError(
+                    "Invalid label '{}' (use letters, digits and _)".format(
+                        label))
+            if not isinstance(distance_matrix,
+                              (SinglefileData, DistanceMatrixData)):
+                raise InputValidationError(
+                    "distance_matrix_{} not of type SinglefileData or "
+                    "DistanceMatrixData".format(label))
+            if isinstance(distance_matrix, SinglefileData):
+                try:
+                    validate_gudhi_matrix(distance_matrix.get_file_abs_path())
+                except ValueError as exc:
+                    raise InputValidationError(
+                        "Invalid distance matrix of entry '{}': {}".format(
+                            label, exc))
+
+            entry_parameters = parameters.pop(label, shared_parameters)
+            if not isinstance(entry_parameters, RipsDistanceMatrixParameters):
+                raise InputValidationError(
+                    "No parameters of type RipsDistanceMatrixParameters for "
+                    "entry '{}'".format(label))
+            entries[label] = (distance_matrix, entry_parameters)
+
+        if parameters:
+            raise InputValidationError(
+                "Parameters without distance matrix: {}".format(
+                    list(parameters)))
+
+        settings = inputdict.pop(self.get_linkname('settings'), None)
+        settings_dict = {} if settings is None else settings.get_dict()
+        try:
+            settings_dict = settings_schema(settings_dict)
+        except Invalid as exc:
+            raise InputValidationError("Invalid settings: {}".format(exc))
+
+        # Check that nothing is left unparsed
+        if inputdict:
+            raise ValidationError("Unrecognized inputs: {}".format(inputdict))
+
+        return code, entries, settings_dict
+
+    def _num_parallel(self, settings):
+        """Number of entries run at the same time."""
+        if settings['mode'] == 'serial':
+            return 1
+        if 'num_parallel' in settings:
+            return settings['num_parallel']
+
+        resources = self.get_resources()
+        return resources.get('num_machines', 1) * resources.get(
+            'num_mpiprocs_per_machine', 1)
+
+    def _driver_script(self, code, entries, settings):
+        """Generate bash script running GUDHI on all entries.
+
+        Up to MAX_JOBS entries run in the background. A new entry starts as
+        soon as one finishes (``wait -n``, bash >= 4.3); older shells run the
+        entries in batches of MAX_JOBS instead.
+        Since the script replaces the code invocation, it also contains the
+        prepend and append text of the code.
+        """
+        lines = [
+            '#!/bin/bash',
+            '# Generated by aiida-gudhi: runs {} Rips computations'.format(
+                len(entries)),
+            code.get_prepend_text(),
+            "EXEC='{}'".format(code.get_execname()),
+            'MAX_JOBS={}'.format(self._num_parallel(settings)),
+            'running=0',
+            '',
+            '# wait -n (wait for any job) needs bash >= 4.3',
+            'if [ "${BASH_VERSINFO[0]}" -gt 4 ] || { [ "${BASH_VERSINFO[0]}" '
+            '-eq 4 ] && [ "${BASH_VERSINFO[1]}" -ge 3 ]; }; then',
+            '    wait_slot() { wait -n; running=$((running - 1)); }',
+            'else',
+            '    echo "bash $BASH_VERSION: running entries in batches of '
+            '$MAX_JOBS" >&2',
+            '    wait_slot() { wait; running=0; }',
+            'fi',
+            '',
+        ]
+
+        for label in sorted(entries):
+            _distance_matrix, parameters = entries[label]
+            args = parameters.cmdline_params(
+                distance_matrix_file_name=self.matrix_file(label),
+                output_file_name=self.output_file(label))
+            lines += [
+                '"$EXEC" {} > {}.log 2>&1 &'.format(' '.join(args), label),
+                'running=$((running + 1))',
+                'if [ $running -ge $MAX_JOBS ]; then',
+                '    wait_slot',
+                'fi',
+            ]
+
+        lines += ['wait', code.get_append_text(), '']
+        return '\n'.join(lines)
+
+    def _prepare_for_submission(self, tempfolder, inputdict):
+        """
+        Create input files.
+
+            :param tempfolder: aiida.common.folders.Folder subclass where
+                the plugin should put all its files.
+            :param inputdict: dictionary of the input nodes as they would
+                be returned by get_inputs_dict
+        """
+        code, entries, settings = self._validate_inputs(inputdict)
+
+        calcinfo = CalcInfo()
+        calcinfo.uuid = self.uuid
+        calcinfo.remote_copy_list = []
+        calcinfo.local_copy_list = []
+        calcinfo.retrieve_list = []
+        for label in entries:
+            calcinfo.retrieve_list += [
+                self.output_file(label), '{}.log'.format(label)
+            ]
+
+        for label, (distance_matrix, _parameters) in entries.items():
+            fname = self.matrix_file(label)
+            if isinstance(distance_matrix, DistanceMatrixData):
+                with open(tempfolder.get_abs_path(fname), 'w') as handle:
+                    distance_matrix.write_gudhi(handle)
+            else:
+                calcinfo.local_copy_list.append(
+                    [distance_matrix.get_file_abs_path(), fname])
+
+        with open(tempfolder.get_abs_path(self._DRIVER_SCRIPT), 'w') as handle:
+            handle.write(self._driver_script(code, entries, settings))
+
+        # The driver script takes the place of the code invocation.
+        # A CodeInfo per entry would run either all entries one after the
+        # other (code_run_modes.SERIAL) or all of them at once (PARALLEL),
+        # while the driver keeps num_parallel entries running. Command line
+        # parameters come from cmdline_params() of each entry; the entries
+        # are serial programs, so no mpirun is needed.
+        calcinfo.prepend_text = 'bash {}'.format(self._DRIVER_SCRIPT)
+        calcinfo.codes_info = []
+
+        return calcinfo
@@ -0,0 +1,77 @@
+"""
+Inline calculations splitting distance matrices into connected components
+
+Points in different connected components of the graph of edges up to
+max-edge-length do not share any simplex, so the Rips complexes of the
+components can be computed independently and their barcodes merged.
+"""
+
+import numpy as np
+from aiida.orm import DataFactory
+from aiida.orm.calculation.inline import make_inline
+from aiida_gudhi.data.barcode import BarcodeData
+from aiida_gudhi.data.distance_matrix import DistanceMatrixData
+from aiida_gudhi.calculations.h0 import get_condensed
+from aiida_gudhi.persistence import (threshold_components, sub_matrix,
+                                     merge_barcodes, FIELD_CHARACTERISTIC)
+
+ArrayData = DataFactory('array')
+
+
+def component_linkname(index):
+    return 'component_{}'.format(index)
+
+
+@make_inline
+def split_distance_matrix_inline(distance_matrix, parameters):
+    """Split distance matrix into connected components at max-edge-length.
+
+    Usage: ``calc, res = split_distance_matrix_inline(distance_matrix=d,
+    parameters=p)``
+
+    :param distance_matrix: DistanceMatrixData or SinglefileData
+    :param parameters: RipsDistanceMatrixParameters
+    :returns: dict with key 'labels' (ArrayData with component label of each
+        point) and keys 'component_<i>' (DistanceMatrixData) for components
+        of more than one point
+    """
+    condensed = get_condensed(distance_matrix)
+    labels = threshold_components(condensed,
+                                  parameters.get_dict()['max-edge-length'])
+
+    labels_data = ArrayData()
+    labels_data.set_array('labels', labels)
+    result = {'labels': labels_data}
+
+    order = np.argsort(labels, kind='stable')
+    sizes = np.bincount(labels)
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    for label in np.flatnonzero(sizes > 1):
+        indices = order[starts[label]:starts[label + 1]]
+        result[component_linkname(label)] = DistanceMatrixData(
+            condensed=sub_matrix(condensed, indices),
+            dtype=condensed.dtype)
+
+    return result
+
+
+@make_inline
+def merge_barcodes_inline(labels, parameters, **barcodes):
+    """Merge barcodes of connected components.
+
+    :param labels: ArrayData from split_distance_matrix_inline
+    :param parameters: RipsDistanceMatrixParameters
+    :param barcodes: BarcodeData of components with more than one point
+    :returns: dict with key 'barcode'
+    """
+    sizes = np.bincount(labels.get_array('labels'))
+    parameters_dict = parameters.get_dict()
+
+    barcode = merge_barcodes(
+        [b.get_barcode() for _link, b in sorted(barcodes.items())],
+        num_singletons=int(np.sum(sizes == 1)),
+        field=parameters_dict.get('field-charac', FIELD_CHARACTERISTIC))
+
+    barcode_data = BarcodeData(barcode=barcode)
+    barcode_data.set_threshold(parameters_dict['max-edge-length'])
+    return {'barcode': barcode_data}
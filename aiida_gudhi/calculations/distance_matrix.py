@@ -0,0 +1,57 @@
+"""
+Inline calculations computing distance matrices
+
+Distances are computed by aiida_gudhi.distance in blocks of rows, so the
+full matrix is never held in memory.
+"""
+
+import numpy as np
+from aiida.orm.calculation.inline import make_inline
+from aiida_gudhi.data.distance_matrix import DistanceMatrixData
+from aiida_gudhi.distance import BLOCK_SIZE
+
+
+def structure_distance_matrix(structure,
+                              block_size=BLOCK_SIZE,
+                              dtype=np.float64):
+    """Compute distance matrix between sites of structure.
+
+    For periodic structures, distances follow the minimum image convention
+    (valid for triclinic cells).
+
+    :param structure: StructureData with periodic boundary conditions either
+        in all or in no direction
+    :param block_size: maximum number of matrix entries computed at a time
+    :param dtype: floating point type used to store distances
+    :returns: DistanceMatrixData (unstored)
+    """
+    if all(structure.pbc):
+        cell = np.array(structure.cell)
+    elif not any(structure.pbc):
+        cell = None
+    else:
+        raise ValueError("Mixed periodic boundary conditions not supported")
+
+    positions = np.array([site.position for site in structure.sites])
+    return DistanceMatrixData.from_point_cloud(
+        positions, cell=cell, dtype=dtype, block_size=block_size)
+
+
+@make_inline
+def distance_matrix_inline(structure, parameters=None):
+    """Compute distance matrix between sites of structure, with provenance.
+
+    Usage: ``calc, res = distance_matrix_inline(structure=s, parameters=p)``
+
+    :param structure: StructureData
+    :param parameters: ParameterData with optional keys 'block_size' and
+        'dtype' ('float32' or 'float64')
+    :returns: dict with key 'distance_matrix'
+    """
+    options = parameters.get_dict() if parameters is not None else {}
+    distance_matrix = structure_distance_matrix(
+        structure,
+        block_size=options.get('block_size', BLOCK_SIZE),
+        dtype=np.dtype(options.get('dtype', 'float64')))
+
+    return {'distance_matrix': distance_matrix}
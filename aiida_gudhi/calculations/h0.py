@@ -0,0 +1,55 @@
+"""
+Inline calculation of 0-dimensional persistence
+
+H0 barcodes are computed in-process by aiida_gudhi.persistence, without
+submitting a GUDHI job.
+"""
+
+from aiida.orm import DataFactory
+from aiida.orm.calculation.inline import make_inline
+from aiida_gudhi.data.barcode import BarcodeData
+from aiida_gudhi.data.distance_matrix import DistanceMatrixData
+from aiida_gudhi.distance import read_gudhi_matrix
+from aiida_gudhi.persistence import h0_barcode, FIELD_CHARACTERISTIC
+
+SinglefileData = DataFactory('singlefile')
+
+
+def get_condensed(distance_matrix):
+    """Condensed distance matrix of node.
+
+    :param distance_matrix: DistanceMatrixData or SinglefileData (GUDHI
+        text format)
+    :returns: numpy array (np.memmap for DistanceMatrixData)
+    """
+    if isinstance(distance_matrix, DistanceMatrixData):
+        return distance_matrix.get_condensed()
+    elif isinstance(distance_matrix, SinglefileData):
+        return read_gudhi_matrix(distance_matrix.get_file_abs_path())
+
+    raise ValueError("Unsupported distance matrix type {}".format(
+        type(distance_matrix)))
+
+
+@make_inline
+def h0_barcode_inline(distance_matrix, parameters):
+    """Compute 0-dimensional barcode of Rips filtration, with provenance.
+
+    Usage: ``calc, res = h0_barcode_inline(distance_matrix=d, parameters=p)``
+
+    :param distance_matrix: DistanceMatrixData or SinglefileData
+    :param parameters: RipsDistanceMatrixParameters ('cpx-dimension' and
+        'output-file' are ignored)
+    :returns: dict with key 'barcode'
+    """
+    parameters_dict = parameters.get_dict()
+    max_edge_length = parameters_dict['max-edge-length']
+    barcode = h0_barcode(
+        get_condensed(distance_matrix),
+        max_edge_length=max_edge_length,
+        min_persistence=parameters_dict.get('min-persistence', 0.),
+        field=parameters_dict.get('field-charac', FIELD_CHARACTERISTIC))
+
+    barcode_data = BarcodeData(barcode=barcode)
+    barcode_data.set_threshold(max_edge_length)
+    return {'barcode': barcode_data}
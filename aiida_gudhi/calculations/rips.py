@@ -4,24 +4,48 @@ Calculations provided by plugin
 Register calculations via the "aiida.calculations" entry point in setup.json.
 """
 
+import os
+import re
+from voluptuous import Invalid
 from aiida.orm.calculation.job import JobCalculation
 from aiida.common.utils import classproperty
 from aiida.common.exceptions import (InputValidationError, ValidationError)
-from aiida.common.datastructures import (CalcInfo, CodeInfo)
+from aiida.common.datastructures import (CalcInfo, CodeInfo,
+                                         code_run_modes)
 from aiida.orm import DataFactory
+from aiida_gudhi.data.rips import settings_schema
+from aiida_gudhi import compression
+from aiida_gudhi.distance import validate_gudhi_matrix
+from aiida_gudhi.summary import summary_file_name, SUMMARY_TOP_K
 
 ParameterData = DataFactory('parameter')
 SinglefileData = DataFactory('singlefile')
 RemoteData = DataFactory('remote')
+ArrayData = DataFactory('array')
 RipsDistanceMatrixParameters = DataFactory('gudhi.rdm')
+DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+EdgeListData = DataFactory('gudhi.edge_list')
 
 
 class RipsDistanceMatrixCalculation(JobCalculation):
     """
     Calculating persistence homology diagram from distance matrix.
+
+    Besides the main ``parameters``, variants of the parameters can be added
+    with ``use_variant(parameters, label)``. The distance matrix is staged
+    once and GUDHI runs on it once per variant, writing to
+    ``<label>.barcode`` (outputs are linked as ``rips_complex_<label>``).
     """
 
     _REMOTE_FOLDER_LINK = 'remote_folder/'
+    _DISTANCE_MATRIX_FILE = 'distance.matrix'
+    _DISTANCE_SCRIPT = 'distance.py'
+    _SUMMARY_SCRIPT = 'summary.py'
+    _EDGE_LIST_FILES = ['indices.npy', 'lengths.npy']
+    _REMOTE_PYTHON = 'python'
+    _LABEL_REGEX = re.compile(r'^[A-Za-z0-9_]+$')
+    # suffixes of output links derived from a barcode link
+    _RESERVED_LABEL_REGEX = re.compile(r'(^|_)(barcode|summary|sweep_[0-9]+)$')
 
     def _init_internal_params(self):
         """
@@ -32,6 +56,10 @@ class RipsDistanceMatrixCalculation(JobCalculation):
 
         self._default_parser = 'gudhi.rdm'
 
+    @classmethod
+    def _get_linkname_variant(cls, label):
+        return 'parameters_{}'.format(label)
+
     @classproperty
     def _use_methods(cls):
         """
@@ -48,11 +76,33 @@ class RipsDistanceMatrixCalculation(JobCalculation):
                 'linkname': 'parameters',
                 'docstring': 'add command line parameters',
             },
+            "variant": {
+                'valid_types': RipsDistanceMatrixParameters,
+                'additional_parameter': 'label',
+                'linkname': cls._get_linkname_variant,
+                'docstring': 'add further command line parameters, run on '
+                'the same distance matrix',
+            },
             "distance_matrix": {
-                'valid_types': SinglefileData,
+                'valid_types': (SinglefileData, DistanceMatrixData,
+                                EdgeListData),
                 'additional_parameter': None,
                 'linkname': 'distance_matrix',
-                'docstring': "distance matrix of point cloud",
+                'docstring': "distance matrix of point cloud (dense or "
+                "sparse)",
+            },
+            "point_cloud": {
+                'valid_types': ArrayData,
+                'additional_parameter': None,
+                'linkname': 'point_cloud',
+                'docstring': "point coordinates ('positions' array) and "
+                "optionally cell vectors ('cell' array)",
+            },
+            "settings": {
+                'valid_types': ParameterData,
+                'additional_parameter': None,
+                'linkname': 'settings',
+                'docstring': "additional settings (see settings_schema)",
             },
             "remote_folder": {
                 'valid_types': RemoteData,
@@ -63,6 +113,75 @@ class RipsDistanceMatrixCalculation(JobCalculation):
         })
         return use_dict
 
+    def get_variants(self):
+        """Parameter variants, from the input links.
+
+        :returns: dictionary {label: parameters}
+        """
+        prefix = self._get_linkname_variant('')
+        return {
+            link[len(prefix):]: node
+            for link, node in self.get_inputs_dict().items()
+            if link.startswith(prefix)
+        }
+
+    @staticmethod
+    def variant_output_file(label):
+        """Name of barcode file of parameter variant."""
+        return '{}.barcode'.format(label)
+
+    @staticmethod
+    def variant_output_link(parameters, label):
+        """Name of output link of parameter variant."""
+        return '{}_{}'.format(parameters.output_links[0], label)
+
+    def get_barcode_outputs(self):
+        """Output files of main parameters and variants.
+
+        :returns: list of tuples (file name, link name, parameters)
+        """
+        parameters = self.get_inputs_dict()['parameters']
+        outputs = list(
+            zip(parameters.output_files, parameters.output_links,
+                [parameters] * len(parameters.output_files)))
+        for label, variant in sorted(self.get_variants().items()):
+            outputs.append((self.variant_output_file(label),
+                            self.variant_output_link(variant, label),
+                            variant))
+        return outputs
+
+    def _validate_variants(self, inputdict, parameters):
+        """Pop and validate parameter variants.
+
+        :returns: dictionary {label: parameters}
+        """
+        prefix = self._get_linkname_variant('')
+        variants = {
+            link[len(prefix):]: inputdict.pop(link)
+            for link in list(inputdict) if link.startswith(prefix)
+        }
+
+        for label, variant in variants.items():
+            if not self._LABEL_REGEX.match(label):
+                raise InputValidationError(
+                    "Invalid label '{}' (use letters, digits and _)".format(
+                        label))
+            if self._RESERVED_LABEL_REGEX.search(label):
+                raise InputValidationError(
+                    "Invalid label '{}' (must not end in barcode, summary "
+                    "or sweep_<n>)".format(label))
+            if not isinstance(variant, RipsDistanceMatrixParameters):
+                raise InputValidationError(
+                    "variant '{}' not of type "
+                    "RipsDistanceMatrixParameters".format(label))
+
+        output_files = [self.variant_output_file(label) for label in variants]
+        if set(parameters.output_files) & set(output_files):
+            raise InputValidationError(
+                "output-file of parameters clashes with variant output")
+
+        return variants
+
     def _validate_inputs(self, inputdict):
         """ Validate input links.
         """
@@ -82,38 +201,164 @@ class RipsDistanceMatrixCalculation(JobCalculation):
             raise InputValidationError("No code specified for this "
                                        "calculation")
 
-        # Check input files
-        try:
-            distance_matrix = inputdict.pop(
-                self.get_linkname('distance_matrix'))
-            if not isinstance(distance_matrix, SinglefileData):
-                raise InputValidationError(
-                    "distance_matrix not of type SinglefileData")
-            symlink = None
+        variants = self._validate_variants(inputdict, parameters)
 
-        except KeyError:
-            distance_matrix = None
+        # Check input files (exactly one source of the distance matrix)
+        distance_matrix = inputdict.pop(
+            self.get_linkname('distance_matrix'), None)
+        point_cloud = inputdict.pop(self.get_linkname('point_cloud'), None)
+        remote_folder = inputdict.pop(
+            self.get_linkname('remote_folder'), None)
+
+        sources = [distance_matrix, point_cloud, remote_folder]
+        if len([n for n in sources if n is not None]) != 1:
+            raise InputValidationError(
+                "Need to provide exactly one of distance_matrix, point_cloud "
+                "or remote_folder")
+
+        matrix_types = (SinglefileData, DistanceMatrixData, EdgeListData)
+        if distance_matrix is not None and not isinstance(
+                distance_matrix, matrix_types):
+            raise InputValidationError(
+                "distance_matrix not of type SinglefileData, "
+                "DistanceMatrixData or EdgeListData")
 
+        if isinstance(distance_matrix, SinglefileData):
+            # fail at submission rather than after queueing
             try:
-                remote_folder = inputdict.pop(
-                    self.get_linkname('remote_folder'))
-                if not isinstance(remote_folder, RemoteData):
-                    raise InputValidationError(
-                        "remote_folder is not of type RemoteData")
+                num_points = validate_gudhi_matrix(
+                    distance_matrix.get_file_abs_path())
+            except ValueError as exc:
+                raise InputValidationError(
+                    "Invalid distance matrix: {}".format(exc))
+            self.logger.info(
+                "Distance matrix of {} points".format(num_points))
+
+        thresholds = [p.threshold for p in [parameters] + variants.values()]
+        if isinstance(distance_matrix, EdgeListData) and \
+                max(thresholds) > distance_matrix.threshold:
+            raise InputValidationError(
+                "max-edge-length exceeds threshold of edge list")
 
-                comp_uuid = remote_folder.get_computer().uuid
-                remote_path = remote_folder.get_remote_path()
-                symlink = (comp_uuid, remote_path, self._REMOTE_FOLDER_LINK)
+        if point_cloud is not None:
+            if not isinstance(point_cloud, ArrayData):
+                raise InputValidationError(
+                    "point_cloud not of type ArrayData")
+            if 'positions' not in point_cloud.get_arraynames():
+                raise InputValidationError(
+                    "point_cloud does not contain 'positions' array")
 
-            except KeyError:
+        symlink = None
+        if remote_folder is not None:
+            if not isinstance(remote_folder, RemoteData):
                 raise InputValidationError(
-                    "Need to provide either distance_matrix or remote_folder")
+                    "remote_folder is not of type RemoteData")
+
+            comp_uuid = remote_folder.get_computer().uuid
+            remote_path = remote_folder.get_remote_path()
+            symlink = (comp_uuid, remote_path, self._REMOTE_FOLDER_LINK)
+
+        settings = inputdict.pop(self.get_linkname('settings'), None)
+        settings_dict = self._validate_settings(settings, parameters)
+        for variant in variants.values():
+            self._validate_settings(settings, variant)
 
         # Check that nothing is left unparsed
         if inputdict:
             raise ValidationError("Unrecognized inputs: {}".format(inputdict))
 
-        return parameters, code, distance_matrix, symlink
+        return parameters, variants, code, distance_matrix, point_cloud, \
+            symlink, settings_dict
+
+    @staticmethod
+    def _validate_settings(settings, parameters):
+        """Validate settings input.
+
+        :returns: settings dictionary with defaults
+        """
+        if settings is None:
+            settings_dict = {}
+        elif not isinstance(settings, ParameterData):
+            raise InputValidationError("settings not of type ParameterData")
+        else:
+            settings_dict = settings.get_dict()
+
+        try:
+            settings_dict = settings_schema(settings_dict)
+        except Invalid as exc:
+            raise InputValidationError("Invalid settings: {}".format(exc))
+
+        # truncating the barcode of the largest threshold is exact only
+        # if no intervals were dropped for low persistence
+        thresholds = settings_dict['threshold_sweep']
+        pm_dict = parameters.get_dict()
+        if thresholds:
+            if max(thresholds) > pm_dict['max-edge-length']:
+                raise InputValidationError(
+                    "threshold_sweep values must not exceed max-edge-length")
+            if pm_dict['min-persistence'] > 0:
+                raise InputValidationError(
+                    "threshold_sweep requires min-persistence 0")
+            if settings_dict['retrieve'] == 'summary':
+                raise InputValidationError(
+                    "threshold_sweep requires retrieving the barcode")
+
+        return settings_dict
+
+    @staticmethod
+    def _get_distance_script():
+        """Return path to python script computing the distance matrix."""
+        import aiida_gudhi.distance
+        return os.path.splitext(aiida_gudhi.distance.__file__)[0] + '.py'
+
+    @staticmethod
+    def _get_summary_script():
+        """Return path to python script summarizing barcodes."""
+        import aiida_gudhi.summary
+        return os.path.splitext(aiida_gudhi.summary.__file__)[0] + '.py'
+
+    def _summary_command(self, output_file, parameters, settings):
+        """Return command summarizing barcode file on the remote."""
+        command = [
+            self._REMOTE_PYTHON, self._SUMMARY_SCRIPT, output_file,
+            summary_file_name(output_file), '--threshold',
+            repr(parameters.threshold), '--top-k',
+            str(settings.get('summary_top_k', SUMMARY_TOP_K))
+        ]
+        if 'summary_grid' in settings:
+            command += ['--grid'] + [repr(t) for t in settings['summary_grid']]
+        if not settings['keep_barcode']:
+            command.append('--remove')
+        return ' '.join(command)
+
+    @staticmethod
+    def _point_cloud_files(point_cloud):
+        """Return .npy files of point cloud to be uploaded."""
+        names = ['positions']
+        if 'cell' in point_cloud.get_arraynames():
+            names.append('cell')
+        return ['{}.npy'.format(name) for name in names]
+
+    def _point_cloud_command(self, point_cloud):
+        """Return command computing the distance matrix on the remote."""
+        files = self._point_cloud_files(point_cloud)
+        command = [
+            self._REMOTE_PYTHON, self._DISTANCE_SCRIPT, 'points', files[0],
+            self._DISTANCE_MATRIX_FILE
+        ]
+        if len(files) > 1:
+            command += ['--cell', files[1]]
+        return ' '.join(command)
+
+    def _edge_list_command(self, edge_list):
+        """Return command expanding the edge list on the remote."""
+        command = [self._REMOTE_PYTHON, self._DISTANCE_SCRIPT, 'edges'] + \
+            self._EDGE_LIST_FILES + [
+                self._DISTANCE_MATRIX_FILE,
+                '--num-points', str(edge_list.num_points),
+                '--sentinel', repr(edge_list.sentinel)
+            ]
+        return ' '.join(command)
 
     def _prepare_for_submission(self, tempfolder, inputdict):
         """
@@ -124,32 +369,123 @@ class RipsDistanceMatrixCalculation(JobCalculation):
             :param inputdict: dictionary of the input nodes as they would
                 be returned by get_inputs_dict
         """
-        parameters, code, distance_matrix, symlink = \
-                self._validate_inputs(inputdict)
+        parameters, variants, code, distance_matrix, point_cloud, symlink, \
+            settings = self._validate_inputs(inputdict)
+        compress = settings.get('compression')
 
         # Prepare CalcInfo to be returned to aiida
         calcinfo = CalcInfo()
         calcinfo.uuid = self.uuid
         calcinfo.remote_copy_list = []
-        calcinfo.retrieve_list = parameters.output_files
+        runs = [(fname, parameters) for fname in parameters.output_files] + [
+            (self.variant_output_file(label), variants[label])
+            for label in sorted(variants)
+        ]
+        output_files = [fname for fname, _parameters in runs]
+        calcinfo.retrieve_list = [
+            compression.compressed_name(fname, compress)
+            for fname in output_files
+        ]
 
-        codeinfo = CodeInfo()
-        codeinfo.code_uuid = code.uuid
-
-        if distance_matrix is not None:
+        if isinstance(distance_matrix, DistanceMatrixData):
+            # text format is produced only here, block by block
+            fname = distance_matrix.filename
+            with compression.open_writer(
+                    tempfolder.get_abs_path(
+                        compression.compressed_name(fname, compress)),
+                    compress) as handle:
+                distance_matrix.write_gudhi(handle)
+            if compress:
+                calcinfo.prepend_text = compression.decompress_command(
+                    fname, compress)
+            calcinfo.local_copy_list = []
+            matrix_args = {
+                'distance_matrix_file_name': distance_matrix.filename
+            }
+        elif isinstance(distance_matrix, EdgeListData):
+            # only edges up to the threshold are uploaded (binary),
+            # the dense text matrix is built on the remote
+            calcinfo.local_copy_list = [
+                [distance_matrix.get_abs_path(fname), fname]
+                for fname in self._EDGE_LIST_FILES
+            ]
+            calcinfo.local_copy_list.append(
+                [self._get_distance_script(), self._DISTANCE_SCRIPT])
+            calcinfo.prepend_text = self._edge_list_command(distance_matrix)
+            matrix_args = {
+                'distance_matrix_file_name': self._DISTANCE_MATRIX_FILE
+            }
+        elif distance_matrix is not None and compress:
+            # compressed copy is uploaded, decompressed on the remote
+            fname = distance_matrix.filename
+            compression.compress_file(
+                distance_matrix.get_file_abs_path(),
+                tempfolder.get_abs_path(
+                    compression.compressed_name(fname, compress)), compress)
+            calcinfo.prepend_text = compression.decompress_command(
+                fname, compress)
+            calcinfo.local_copy_list = []
+            matrix_args = {'distance_matrix_file_name': fname}
+        elif distance_matrix is not None:
             calcinfo.local_copy_list = [
                 [
                     distance_matrix.get_file_abs_path(),
                     distance_matrix.filename
                 ],
             ]
-            codeinfo.cmdline_params = parameters.cmdline_params(
-                distance_matrix_file_name=distance_matrix.filename)
+            matrix_args = {
+                'distance_matrix_file_name': distance_matrix.filename
+            }
+        elif point_cloud is not None:
+            # only coordinates are uploaded, matrix is built on the remote
+            calcinfo.local_copy_list = [
+                [point_cloud.get_abs_path(fname), fname]
+                for fname in self._point_cloud_files(point_cloud)
+            ]
+            calcinfo.local_copy_list.append(
+                [self._get_distance_script(), self._DISTANCE_SCRIPT])
+            calcinfo.prepend_text = self._point_cloud_command(point_cloud)
+            matrix_args = {
+                'distance_matrix_file_name': self._DISTANCE_MATRIX_FILE
+            }
         else:
             calcinfo.remote_symlink_list = [symlink]
-            codeinfo.cmdline_params = parameters.cmdline_params(
-                remote_folder_path=self._REMOTE_FOLDER_LINK)
+            calcinfo.local_copy_list = []
+            matrix_args = {'remote_folder_path': self._REMOTE_FOLDER_LINK}
 
+        codeinfo = CodeInfo()
+        codeinfo.code_uuid = code.uuid
+        codeinfo.cmdline_params = parameters.cmdline_params(**matrix_args)
         calcinfo.codes_info = [codeinfo]
 
+        # variants run one after the other on the staged distance matrix
+        for label in sorted(variants):
+            codeinfo = CodeInfo()
+            codeinfo.code_uuid = code.uuid
+            codeinfo.cmdline_params = variants[label].cmdline_params(
+                output_file_name=self.variant_output_file(label),
+                **matrix_args)
+            calcinfo.codes_info.append(codeinfo)
+        calcinfo.codes_run_mode = code_run_modes.SERIAL
+
+        append = []
+        if settings['retrieve'] == 'summary':
+            # only the summaries come back, barcodes stay on the remote
+            calcinfo.local_copy_list.append(
+                [self._get_summary_script(), self._SUMMARY_SCRIPT])
+            append += [
+                self._summary_command(fname, run_parameters, settings)
+                for fname, run_parameters in runs
+            ]
+            calcinfo.retrieve_list = [
+                summary_file_name(fname) for fname in output_files
+            ]
+
+        # barcodes are compressed on the remote before retrieval
+        # (unless removed after summarizing)
+        if compress and (settings['retrieve'] == 'barcode'
+                         or settings['keep_barcode']):
+            append.append(compression.compress_command(output_files, compress))
+        calcinfo.append_text = '\n'.join(append)
+
         return calcinfo
@@ -0,0 +1,95 @@
+"""
+Inline calculation reducing distance matrices and point clouds to landmarks
+
+Use the outputs as ``distance_matrix`` or ``point_cloud`` input of
+RipsDistanceMatrixCalculation to bound the size of the Rips complex.
+"""
+
+from functools import partial
+import numpy as np
+from voluptuous import Schema, Optional, Any, Invalid
+from aiida.orm import DataFactory
+from aiida.orm.calculation.inline import make_inline
+from aiida.common.exceptions import InputValidationError
+from aiida_gudhi.data.distance_matrix import DistanceMatrixData
+from aiida_gudhi.calculations.h0 import get_condensed
+from aiida_gudhi.persistence import sub_matrix
+from aiida_gudhi.distance import num_points_from_size
+from aiida_gudhi.subsample import (condensed_row, point_cloud_row,
+                                   farthest_point_sampling, random_landmarks)
+
+ArrayData = DataFactory('array')
+
+#: Schema of 'parameters' input of landmarks_inline
+landmarks_schema = Schema({
+    'num_landmarks': int,
+    Optional('method', default='farthest'): Any('farthest', 'random'),
+    # first landmark of farthest-point sampling
+    Optional('start', default=0): int,
+    # seed of random landmark selection
+    Optional('seed'): int,
+})
+
+
+@make_inline
+def landmarks_inline(parameters, distance_matrix=None, point_cloud=None):
+    """Reduce distance matrix or point cloud to landmark points.
+
+    Usage: ``calc, res = landmarks_inline(parameters=p, point_cloud=c)``
+
+    :param parameters: ParameterData (see landmarks_schema)
+    :param distance_matrix: DistanceMatrixData or SinglefileData
+    :param point_cloud: ArrayData with 'positions' and optionally 'cell'
+    :returns: dict with key 'landmarks' (ArrayData with sorted 'indices'
+        array and 'covering_radius' attribute) and key 'distance_matrix' or
+        'point_cloud' of the landmarks
+    """
+    try:
+        options = landmarks_schema(parameters.get_dict())
+    except Invalid as exc:
+        raise InputValidationError("Invalid parameters: {}".format(exc))
+
+    if (distance_matrix is None) == (point_cloud is None):
+        raise InputValidationError(
+            "Need to provide exactly one of distance_matrix or point_cloud")
+
+    if distance_matrix is not None:
+        condensed = get_condensed(distance_matrix)
+        num_points = num_points_from_size(len(condensed))
+        distance_row = partial(condensed_row, condensed)
+    else:
+        positions = point_cloud.get_array('positions')
+        cell = None
+        if 'cell' in point_cloud.get_arraynames():
+            cell = point_cloud.get_array('cell')
+        num_points = len(positions)
+        distance_row = partial(point_cloud_row, positions, cell=cell)
+
+    if options['method'] == 'farthest':
+        indices, radius = farthest_point_sampling(
+            num_points, distance_row, options['num_landmarks'],
+            start=options['start'])
+    else:
+        indices, radius = random_landmarks(
+            num_points, distance_row, options['num_landmarks'],
+            seed=options.get('seed'))
+
+    # landmarks keep the order of the original points
+    indices = np.sort(indices)
+    landmarks = ArrayData()
+    landmarks.set_array('indices', indices)
+    landmarks._set_attr('covering_radius', radius)  # pylint: disable=protected-access
+    result = {'landmarks': landmarks}
+
+    if distance_matrix is not None:
+        result['distance_matrix'] = DistanceMatrixData(
+            condensed=sub_matrix(condensed, indices),
+            dtype=condensed.dtype)
+    else:
+        reduced = ArrayData()
+        reduced.set_array('positions', positions[indices])
+        if cell is not None:
+            reduced.set_array('cell', cell)
+        result['point_cloud'] = reduced
+
+    return result
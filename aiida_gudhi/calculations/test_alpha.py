@@ -0,0 +1,53 @@
+""" Tests for alpha complex calculation
+
+"""
+import numpy as np
+import aiida_gudhi.tests as gt
+
+
+class TestAlpha(gt.PluginTestCase):
+    def setUp(self):
+        self.code = gt.get_code(entry_point='gudhi.alpha')
+
+    def test_write_off(self):
+        """Test writing point coordinates in OFF format"""
+        from StringIO import StringIO
+        from aiida_gudhi.calculations.alpha import write_off
+
+        positions = np.array([[0., 0., 0.], [1., 0.5, 0.25]])
+        handle = StringIO()
+        write_off(handle, positions)
+
+        lines = handle.getvalue().splitlines()
+        self.assertEqual(lines[:2], ['OFF', '2 0 0'])
+        np.testing.assert_allclose(
+            np.loadtxt(lines[2:], ndmin=2), positions)
+
+    def test_submit_alpha(self):
+        """Test submitting a calculation"""
+        code = self.code
+
+        # set up calculation
+        calc = code.new_calc()
+        calc.label = "compute alpha complex from point cloud"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        # Prepare input parameters
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.alpha')
+        parameters = Parameters(dict={'max-alpha-square': 0.25})
+        calc.use_parameters(parameters)
+
+        ArrayData = DataFactory('array')
+        point_cloud = ArrayData()
+        point_cloud.set_array('positions',
+                              np.random.RandomState(0).rand(50, 3))
+        calc.use_point_cloud(point_cloud)
+
+        calc.store_all()
+        folder, _script = calc.submit_test(folder=gt.get_temp_folder())
+
+        with open(folder.get_abs_path('points.off')) as handle:
+            self.assertEqual(handle.readline().strip(), 'OFF')
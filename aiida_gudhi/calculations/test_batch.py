@@ -0,0 +1,47 @@
+""" Tests for batched calculations
+
+"""
+import os
+import aiida_gudhi.tests as gt
+
+
+class TestBatch(gt.PluginTestCase):
+    def setUp(self):
+        self.code = gt.get_code(entry_point='gudhi.rdm_batch')
+
+    def test_submit_batch(self):
+        """Test submitting a batch of two distance matrices"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips for batch of distance matrices"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 2})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        ParameterData = DataFactory('parameter')
+        calc.use_shared_parameters(Parameters(dict={'max-edge-length': 4.2}))
+        calc.use_parameters(
+            Parameters(dict={'max-edge-length': 3.0}), label='b')
+        calc.use_settings(ParameterData(dict={'mode': 'parallel'}))
+
+        SinglefileData = DataFactory('singlefile')
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        filename = os.path.join(gt.TEST_DIR, 'sample_distance.matrix')
+        calc.use_distance_matrix(SinglefileData(file=filename), label='a')
+        calc.use_distance_matrix(
+            DistanceMatrixData.from_file(filename), label='b')
+
+        calc.store_all()
+        folder, _script = calc.submit_test(folder=gt.get_temp_folder())
+
+        with open(folder.get_abs_path('batch.sh')) as handle:
+            driver = handle.read()
+        self.assertIn('MAX_JOBS=2', driver)
+        self.assertIn('--output-file a.barcode', driver)
+        self.assertIn('--max-edge-length 3.0', driver)
+        self.assertIn('BASH_VERSINFO', driver)
+        for fname in ['a.matrix', 'b.matrix']:
+            self.assertTrue(os.path.isfile(folder.get_abs_path(fname)))
@@ -0,0 +1,30 @@
+""" Tests for splitting distance matrices into components
+
+"""
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestComponents(gt.PluginTestCase):
+    def test_split_distance_matrix(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.calculations.components import \
+            split_distance_matrix_inline
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        Parameters = DataFactory('gudhi.rdm')
+
+        # two clusters far apart and one isolated point
+        positions = np.concatenate((np.random.RandomState(0).rand(10, 3),
+                                    np.random.RandomState(1).rand(5, 3) + 10,
+                                    [[20., 20., 20.]]))
+        distance_matrix = DistanceMatrixData.from_point_cloud(positions)
+        parameters = Parameters(dict={'max-edge-length': 2.0})
+
+        _calc, result = split_distance_matrix_inline(
+            distance_matrix=distance_matrix, parameters=parameters)
+        npt.assert_equal(result['labels'].get_array('labels'),
+                         [0] * 10 + [1] * 5 + [2])
+        self.assertEqual(
+            sorted(result), ['component_0', 'component_1', 'labels'])
+        self.assertEqual(result['component_1'].num_points, 5)
@@ -0,0 +1,36 @@
+""" Tests for distance matrix calculations
+
+"""
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestDistanceMatrix(gt.PluginTestCase):
+    def test_triclinic_minimum_image(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.calculations.distance_matrix import \
+            distance_matrix_inline
+        StructureData = DataFactory('structure')
+        ParameterData = DataFactory('parameter')
+
+        cell = np.array([[10., 0., 0.], [7., 6., 0.], [3., 2., 5.]])
+        frac = np.random.RandomState(0).rand(30, 3)
+        structure = StructureData(cell=cell.tolist())
+        for position in np.dot(frac, cell):
+            structure.append_atom(position=position, symbols='C')
+
+        parameters = ParameterData(dict={'block_size': 100})
+        _calc, result = distance_matrix_inline(
+            structure=structure, parameters=parameters)
+        condensed = result['distance_matrix'].get_condensed()
+
+        # brute force: search images within -2..2 cells
+        shifts = np.array([[i, j, k] for i in range(-2, 3)
+                           for j in range(-2, 3) for k in range(-2, 3)])
+        positions = np.dot(frac, cell)
+        diff = positions[:, None, None, :] - positions[None, :, None, :] \
+            + np.dot(shifts, cell)[None, None, :, :]
+        matrix = np.sqrt((diff**2).sum(axis=-1)).min(axis=-1)
+
+        npt.assert_almost_equal(condensed, matrix[np.tril_indices(30, -1)])
@@ -0,0 +1,35 @@
+""" Tests for inline H0 calculation
+
+"""
+import os
+import tempfile
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestH0(gt.PluginTestCase):
+    def test_h0_barcode_inline(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.calculations.h0 import h0_barcode_inline
+        from aiida_gudhi.parsers.barcode import BarcodeParser, write_barcode
+        SinglefileData = DataFactory('singlefile')
+        Parameters = DataFactory('gudhi.rdm')
+
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        _calc, result = h0_barcode_inline(
+            distance_matrix=distance_matrix, parameters=parameters)
+        barcode = result['barcode']
+        self.assertEqual(barcode.threshold, 4.2)
+        npt.assert_equal(barcode.dimensions(), [0])
+
+        # text output reads back with BarcodeParser
+        data = barcode.get_barcode()
+        handle, filename = tempfile.mkstemp(suffix='.barcode')
+        with os.fdopen(handle, 'w') as out:
+            write_barcode(out, data)
+        parsed = BarcodeParser.parse(filename)
+        os.remove(filename)
+        npt.assert_equal(parsed['field'], data['field'])
+        npt.assert_almost_equal(parsed['death'], data['death'], decimal=5)
@@ -34,3 +34,319 @@ class TestRips(gt.PluginTestCase):
         calc.store_all()
         #calc.submit()
         calc.submit_test(folder=gt.get_temp_folder())
+
+    def test_submit_rips_distance_matrix_data(self):
+        """Test submitting a calculation with binary distance matrix"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips from binary distance matrix"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        calc.use_parameters(parameters)
+
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        distance_matrix = DistanceMatrixData.from_file(
+            os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        calc.use_distance_matrix(distance_matrix)
+
+        calc.store_all()
+        folder, _script = calc.submit_test(folder=gt.get_temp_folder())
+
+        with open(folder.get_abs_path(distance_matrix.filename)) as handle:
+            written = handle.read()
+        with open(os.path.join(gt.TEST_DIR, 'sample_distance.matrix')) as handle:
+            self.assertEqual(written, handle.read())
+
+    def test_submit_rips_point_cloud(self):
+        """Test submitting a calculation with point cloud"""
+        import numpy as np
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips from point cloud"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        calc.use_parameters(parameters)
+
+        ArrayData = DataFactory('array')
+        point_cloud = ArrayData()
+        point_cloud.set_array('positions', np.random.rand(20, 3) * 10.0)
+        point_cloud.set_array('cell', np.eye(3) * 10.0)
+        calc.use_point_cloud(point_cloud)
+
+        calc.store_all()
+        folder, _script = calc.submit_test(folder=gt.get_temp_folder())
+
+        for fname in ['positions.npy', 'cell.npy', 'distance.py']:
+            self.assertTrue(os.path.isfile(folder.get_abs_path(fname)))
+
+    def test_submit_rips_edge_list(self):
+        """Test submitting a calculation with sparse edge list"""
+        import numpy as np
+        from aiida.common.exceptions import InputValidationError
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips from edge list"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        calc.use_parameters(parameters)
+
+        EdgeListData = DataFactory('gudhi.edge_list')
+        edge_list = EdgeListData.from_point_cloud(
+            np.random.rand(20, 3) * 10.0, 4.2)
+        calc.use_distance_matrix(edge_list)
+
+        calc.store_all()
+        folder, _script = calc.submit_test(folder=gt.get_temp_folder())
+
+        for fname in ['indices.npy', 'lengths.npy', 'distance.py']:
+            self.assertTrue(os.path.isfile(folder.get_abs_path(fname)))
+
+        # edge list must contain all edges up to max-edge-length
+        short = EdgeListData.from_point_cloud(np.random.rand(20, 3), 1.0)
+        with self.assertRaises(InputValidationError):
+            calc._validate_inputs({  # pylint: disable=protected-access
+                'parameters': parameters,
+                'code': code,
+                'distance_matrix': short
+            })
+
+    def test_submit_rips_variants(self):
+        """Test submitting a calculation with parameter variants"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips with several parameter sets"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        calc.use_parameters(Parameters(dict={'max-edge-length': 4.2}))
+        calc.use_variant(
+            Parameters(dict={
+                'max-edge-length': 4.2,
+                'field-charac': 2
+            }),
+            label='z2')
+        calc.use_variant(
+            Parameters(dict={
+                'max-edge-length': 4.2,
+                'min-persistence': 0.5
+            }),
+            label='cutoff')
+
+        SinglefileData = DataFactory('singlefile')
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        calc.use_distance_matrix(distance_matrix)
+
+        calc.store_all()
+        folder, script = calc.submit_test(folder=gt.get_temp_folder())
+
+        # matrix staged once, one GUDHI run per parameter set
+        self.assertEqual(
+            [f for f in folder.get_content_list() if f.endswith('.matrix')],
+            [distance_matrix.filename])
+        with open(folder.get_abs_path(script)) as handle:
+            content = handle.read()
+        for fname in ['out.barcode', 'z2.barcode', 'cutoff.barcode']:
+            self.assertIn(fname, content)
+
+        links = [link for _f, link, _p in calc.get_barcode_outputs()]
+        self.assertEqual(
+            links,
+            ['rips_complex', 'rips_complex_cutoff', 'rips_complex_z2'])
+
+    def test_reserved_variant_labels(self):
+        """Test that variant links cannot clash with derived outputs"""
+        from aiida.orm import DataFactory
+        from aiida.common.exceptions import InputValidationError
+        Parameters = DataFactory('gudhi.rdm')
+        SinglefileData = DataFactory('singlefile')
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+
+        for label in ['barcode', 'summary', 'sweep_0', 'x_barcode']:
+            calc = self.code.new_calc()
+            calc.set_resources({
+                "num_machines": 1,
+                "num_mpiprocs_per_machine": 1
+            })
+            calc.use_parameters(Parameters(dict={'max-edge-length': 4.2}))
+            calc.use_variant(
+                Parameters(dict={'max-edge-length': 4.2}), label=label)
+            calc.use_distance_matrix(distance_matrix)
+            calc.store_all()
+            with self.assertRaises(InputValidationError):
+                calc.submit_test(folder=gt.get_temp_folder())
+
+    def test_submit_rips_compressed(self):
+        """Test submitting a calculation with compressed transfer"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips with compressed transfer"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        calc.use_parameters(Parameters(dict={'max-edge-length': 4.2}))
+        ParameterData = DataFactory('parameter')
+        calc.use_settings(ParameterData(dict={'compression': 'gzip'}))
+
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        distance_matrix = DistanceMatrixData.from_file(
+            os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        calc.use_distance_matrix(distance_matrix)
+
+        calc.store_all()
+        folder, script = calc.submit_test(folder=gt.get_temp_folder())
+
+        from aiida_gudhi.distance import read_gudhi_matrix
+        from aiida_gudhi.compression import open_compressed
+        compressed = folder.get_abs_path('distance.matrix.gz')
+        uploaded = os.path.join(folder.abspath, 'uploaded.matrix')
+        with open_compressed(compressed) as src, open(uploaded, 'wb') as dest:
+            dest.write(src.read())
+        self.assertEqual(len(read_gudhi_matrix(uploaded)),
+                         len(distance_matrix.get_condensed()))
+
+        with open(folder.get_abs_path(script)) as handle:
+            content = handle.read()
+        self.assertIn('gzip -df distance.matrix.gz', content)
+        self.assertIn('gzip -f out.barcode', content)
+
+    def test_submit_rips_compressed_barcode_not_kept(self):
+        """Test that keep_barcode does not apply to retrieved barcodes"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips with compressed barcode"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        calc.use_parameters(Parameters(dict={'max-edge-length': 4.2}))
+        ParameterData = DataFactory('parameter')
+        calc.use_settings(
+            ParameterData(dict={
+                'compression': 'zstd',
+                'keep_barcode': False
+            }))
+
+        SinglefileData = DataFactory('singlefile')
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        calc.use_distance_matrix(distance_matrix)
+
+        calc.store_all()
+        folder, script = calc.submit_test(folder=gt.get_temp_folder())
+
+        with open(folder.get_abs_path(script)) as handle:
+            content = handle.read()
+        self.assertIn('zstd -qf --rm out.barcode', content)
+
+    def test_submit_rips_summary_only(self):
+        """Test submitting a calculation retrieving only summaries"""
+        code = self.code
+
+        calc = code.new_calc()
+        calc.label = "compute rips and retrieve summary"
+        calc.set_max_wallclock_seconds(1 * 60)
+        calc.set_withmpi(False)
+        calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+
+        from aiida.orm import DataFactory
+        Parameters = DataFactory('gudhi.rdm')
+        calc.use_parameters(Parameters(dict={'max-edge-length': 4.2}))
+        ParameterData = DataFactory('parameter')
+        calc.use_settings(
+            ParameterData(dict={
+                'retrieve': 'summary',
+                'keep_barcode': False
+            }))
+
+        SinglefileData = DataFactory('singlefile')
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        calc.use_distance_matrix(distance_matrix)
+
+        calc.store_all()
+        folder, script = calc.submit_test(folder=gt.get_temp_folder())
+
+        self.assertTrue(os.path.isfile(folder.get_abs_path('summary.py')))
+        with open(folder.get_abs_path(script)) as handle:
+            content = handle.read()
+        self.assertIn('python summary.py out.barcode out.barcode.summary.json',
+                      content)
+        self.assertIn('--remove', content)
+
+    def test_validate_distance_matrix_file(self):
+        """Test that malformed distance matrices fail at submission"""
+        from aiida.orm import DataFactory
+        from aiida.common.exceptions import InputValidationError
+        from aiida_gudhi.distance import (validate_gudhi_matrix, count_rows,
+                                          read_gudhi_matrix)
+
+        self.assertEqual(
+            validate_gudhi_matrix(
+                os.path.join(gt.TEST_DIR, 'sample_distance.matrix')), 100)
+
+        Parameters = DataFactory('gudhi.rdm')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        SinglefileData = DataFactory('singlefile')
+        folder = gt.get_temp_folder()
+
+        # GUDHI stops reading at the first empty line
+        trailing_blank = folder.get_abs_path('trailing_blank.matrix')
+        with open(trailing_blank, 'w') as handle:
+            handle.write('\n1.0;\n2.0;3.0;\n\n')
+        self.assertEqual(validate_gudhi_matrix(trailing_blank), 3)
+        self.assertEqual(count_rows(trailing_blank), 3)
+        self.assertEqual(len(read_gudhi_matrix(trailing_blank)), 3)
+
+        malformed = {
+            'row_length.matrix': ('\n1.0;\n2.0;\n', 'line 3, column 5'),
+            'nan.matrix': ('\n1.0;\n2.0;nan;\n', 'line 3, column 5'),
+            'negative.matrix': ('\n-1.0;\n2.0;3.0;\n', 'line 2, column 1'),
+            'token.matrix': ('\n1.0;\n2.0;3,5;\n', 'line 3, column 5'),
+            'after_end.matrix': ('\n1.0;\n\n2.0;3.0;\n', 'line 4, column 1'),
+            # read by GUDHI as a row
+            'whitespace.matrix': ('\n1.0;\n  \n', 'line 3, column 1'),
+        }
+        calc = self.code.new_calc()
+        for fname, (content, location) in malformed.items():
+            path = folder.get_abs_path(fname)
+            with open(path, 'w') as handle:
+                handle.write(content)
+
+            with self.assertRaises(InputValidationError) as context:
+                calc._validate_inputs({  # pylint: disable=protected-access
+                    'parameters': parameters,
+                    'code': self.code,
+                    'distance_matrix': SinglefileData(file=path)
+                })
+            self.assertIn(location, str(context.exception))
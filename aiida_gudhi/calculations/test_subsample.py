@@ -0,0 +1,37 @@
+""" Tests for landmark subsampling
+
+"""
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestLandmarks(gt.PluginTestCase):
+    def test_landmarks_inline(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.calculations.subsample import landmarks_inline
+        ArrayData = DataFactory('array')
+        ParameterData = DataFactory('parameter')
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+
+        positions = np.random.RandomState(0).rand(100, 3) * 10.0
+        point_cloud = ArrayData()
+        point_cloud.set_array('positions', positions)
+        distance_matrix = DistanceMatrixData.from_point_cloud(positions)
+        parameters = ParameterData(dict={'num_landmarks': 10})
+
+        _calc, from_cloud = landmarks_inline(
+            parameters=parameters, point_cloud=point_cloud)
+        _calc, from_matrix = landmarks_inline(
+            parameters=parameters, distance_matrix=distance_matrix)
+
+        indices = from_cloud['landmarks'].get_array('indices')
+        npt.assert_equal(indices,
+                         from_matrix['landmarks'].get_array('indices'))
+        self.assertGreater(
+            from_cloud['landmarks'].get_attr('covering_radius'), 0)
+
+        reduced = DistanceMatrixData.from_point_cloud(
+            from_cloud['point_cloud'].get_array('positions'))
+        npt.assert_almost_equal(reduced.get_condensed(),
+                                from_matrix['distance_matrix'].get_condensed())
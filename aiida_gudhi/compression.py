@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Compressed transfer of distance matrices and barcodes.
+
+Distance matrices are compressed locally before upload and decompressed on
+the remote by the command line tools (``gzip``, ``zstd``); barcode files are
+compressed on the remote before retrieval. Reading detects the format from
+the leading bytes, so compressed and uncompressed files can be mixed.
+
+zstd in Python requires the ``zstandard`` package.
+"""
+import io
+import gzip
+import shutil
+from contextlib import contextmanager
+
+#: Supported formats: file extension, magic bytes, remote tool
+FORMATS = {
+    'gzip': {
+        'extension': '.gz',
+        'magic': b'\x1f\x8b',
+        'tool': 'gzip',
+    },
+    'zstd': {
+        'extension': '.zst',
+        'magic': b'\x28\xb5\x2f\xfd',
+        'tool': 'zstd',
+    },
+}
+
+
+def compressed_name(filename, compression):
+    """Name of compressed file (unchanged if compression is None)."""
+    if compression is None:
+        return filename
+    return filename + FORMATS[compression]['extension']
+
+
+def detect_compression(filename):
+    """Compression format of file from its leading bytes.
+
+    :returns: key of FORMATS or None for uncompressed files
+    """
+    with open(filename, 'rb') as handle:
+        start = handle.read(4)
+    for compression, spec in FORMATS.items():
+        if start.startswith(spec['magic']):
+            return compression
+    return None
+
+
+class _ChunkReader(io.RawIOBase):
+    """Raw stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        super(_ChunkReader, self).__init__()
+        self._chunks = chunks
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+@contextmanager
+def open_compressed(filename):
+    """Open (possibly compressed) file for reading in binary mode.
+
+    :returns: context manager of a file object
+    """
+    compression = detect_compression(filename)
+    with open(filename, 'rb') as handle:
+        if compression == 'gzip':
+            with gzip.GzipFile(fileobj=handle, mode='rb') as reader:
+                yield reader
+        elif compression == 'zstd':
+            import zstandard
+            chunks = zstandard.ZstdDecompressor().read_to_iter(handle)
+            yield io.BufferedReader(_ChunkReader(chunks))
+        else:
+            yield handle
+
+
+@contextmanager
+def open_writer(filename, compression):
+    """Open file for writing in binary mode, compressed if requested.
+
+    :param compression: key of FORMATS or None
+    :returns: context manager of a file object
+    """
+    with open(filename, 'wb') as handle:
+        if compression is None:
+            yield handle
+        elif compression == 'gzip':
+            # fast level: the link, not the CPU, is the bottleneck
+            with gzip.GzipFile(
+                    fileobj=handle, mode='wb', compresslevel=1) as writer:
+                yield writer
+        else:
+            import zstandard
+            with zstandard.ZstdCompressor().stream_writer(handle) as writer:
+                yield writer
+
+
+def compress_file(source, destination, compression):
+    """Copy file, compressing it on the way."""
+    with open(source, 'rb') as src, \
+            open_writer(destination, compression) as dest:
+        shutil.copyfileobj(src, dest)
+
+
+def decompress_command(filename, compression):
+    """Shell command decompressing file on the remote (replaces it).
+
+    :param filename: name of the uncompressed file
+    """
+    tool = FORMATS[compression]['tool']
+    flags = '-qdf --rm' if compression == 'zstd' else '-df'
+    return '{} {} {}'.format(tool, flags,
+                             compressed_name(filename, compression))
+
+
+def compress_command(filenames, compression):
+    """Shell command compressing files on the remote (replaces them)."""
+    tool = FORMATS[compression]['tool']
+    flags = '-qf --rm' if compression == 'zstd' else '-f'
+    return '{} {} {}'.format(tool, flags, ' '.join(filenames))
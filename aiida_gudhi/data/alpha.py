@@ -0,0 +1,75 @@
+"""
+Alpha complex data types
+"""
+
+from voluptuous import Schema, Optional
+from aiida.orm.data.parameter import ParameterData
+
+cmdline_parameters = {
+    Optional('output-file', default='out.barcode'): str,
+    # filtration values of the alpha complex are squared radii
+    Optional('max-alpha-square'): float,
+    Optional('field-charac'): int,
+    Optional('min-persistence', default=0): float,
+}
+
+
+class AlphaComplexParameters(ParameterData):
+    """
+    Input parameters for alpha_complex_persistence calculation.
+    """
+    schema = Schema(cmdline_parameters)
+
+    # pylint: disable=redefined-builtin, too-many-function-args
+    def __init__(self, dict=None, **kwargs):
+        """
+        Constructor for the data class
+
+        Usage: ``AlphaComplexParameters(dict={'max-alpha-square': 9.0})``
+
+        .. note:: As of 2017-09, the constructor must also support a single dbnode
+          argument (to reconstruct the object from a database node).
+          For this reason, positional arguments are not allowed.
+        """
+        if 'dbnode' in kwargs:
+            super(AlphaComplexParameters, self).__init__(**kwargs)
+        else:
+            # set dictionary of ParameterData
+            dict = self.validate(dict)
+            super(AlphaComplexParameters, self).__init__(dict=dict, **kwargs)
+
+    def validate(self, parameters_dict):
+        """validate parameters"""
+        return AlphaComplexParameters.schema(parameters_dict)
+
+    def cmdline_params(self, points_file_name='points.off'):
+        """Synthesize command line parameters
+
+        e.g. [ ['--output-file', 'out.barcode'], ['points.off']]
+
+        :param points_file_name: Name of OFF file with point coordinates
+        """
+        parameters = []
+
+        pm_dict = self.get_dict()
+        for k, v in pm_dict.iteritems():
+            parameters += ['--' + k, v]
+
+        parameters += [points_file_name]
+
+        return map(str, parameters)
+
+    @property
+    def threshold(self):
+        """Maximum filtration value (None if unbounded)."""
+        return self.get_dict().get('max-alpha-square')
+
+    @property
+    def output_files(self):
+        """Return list of output files to be retrieved"""
+        return [self.get_dict()['output-file']]
+
+    @property
+    def output_links(self):
+        """Return list of output link names"""
+        return ['alpha_complex']
@@ -0,0 +1,52 @@
+"""
+Array data types with lazily loaded, memory-mapped arrays
+"""
+
+import numpy as np
+from aiida.orm.data.array import ArrayData
+
+
+class MemmapArrayData(ArrayData):
+    """
+    ArrayData whose arrays are memory-mapped instead of read into memory.
+
+    Opening a node only reads the ``.npy`` header; data is paged in from the
+    repository when (and where) the array is accessed.
+    """
+
+    def get_array(self, name):
+        """Return read-only memory map of the array with given name.
+
+        :param name: name of the array
+        """
+        try:
+            return self._memmaps[name]
+        except AttributeError:
+            self._memmaps = {}
+        except KeyError:
+            pass
+
+        fname = '{}.npy'.format(name)
+        if fname not in self.get_folder_list():
+            raise KeyError("Array with name '{}' not found".format(name))
+
+        array = np.load(self.get_abs_path(fname), mmap_mode='r')
+        self._memmaps[name] = array
+        return array
+
+    def set_array(self, name, array):
+        """Store array with given name (see ArrayData.set_array)."""
+        getattr(self, '_memmaps', {}).pop(name, None)
+        super(MemmapArrayData, self).set_array(name, array)
+
+    def set_array_file(self, name, filename):
+        """Store array from .npy file without loading it into memory.
+
+        :param name: name of the array
+        :param filename: path to .npy file
+        """
+        array = np.load(filename, mmap_mode='r')
+        getattr(self, '_memmaps', {}).pop(name, None)
+        self.add_path(filename, '{}.npy'.format(name))
+        self._set_attr('{}{}'.format(self.array_prefix, name),
+                       list(array.shape))
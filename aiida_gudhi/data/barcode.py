@@ -0,0 +1,112 @@
+"""
+Barcode data types
+"""
+
+import numpy as np
+from aiida_gudhi.data.array import MemmapArrayData
+from aiida_gudhi.parsers.barcode import BARCODE_DTYPE, read_barcode
+
+
+class BarcodeData(MemmapArrayData):
+    """
+    Persistence barcode stored as binary arrays.
+
+    Intervals are sorted by homology dimension and stored column-wise in the
+    ``life_lines`` array of shape (2, n) (births, deaths).
+    The intervals of dimension ``dimensions[i]`` are found at
+    ``offsets[i]:offsets[i+1]``, which are stored as attributes.
+    """
+
+    def __init__(self, barcode=None, dtype=np.float64, **kwargs):
+        """
+        Constructor for the data class
+
+        Usage: ``BarcodeData(barcode=BarcodeParser.parse('out.barcode'))``
+
+        :param barcode: numpy array of dtype BARCODE_DTYPE
+        :param dtype: floating point type used to store births and deaths
+        """
+        super(BarcodeData, self).__init__(**kwargs)
+
+        if barcode is not None:
+            self.set_barcode(barcode, dtype=dtype)
+
+    @classmethod
+    def from_file(cls, filename, dtype=np.float64):
+        """Create BarcodeData from barcode file produced by GUDHI."""
+        return cls(barcode=read_barcode(filename), dtype=dtype)
+
+    def set_barcode(self, barcode, dtype=np.float64):
+        """Store barcode.
+
+        :param barcode: numpy array of dtype BARCODE_DTYPE
+        :param dtype: floating point type used to store births and deaths
+        """
+        # stable sort keeps the order of intervals within each dimension
+        order = np.argsort(barcode['dim'], kind='stable')
+        dims = barcode['dim'][order]
+        dimensions, starts = np.unique(dims, return_index=True)
+
+        life_lines = np.empty((2, len(order)), dtype=dtype)
+        life_lines[0] = barcode['birth'][order]
+        life_lines[1] = barcode['death'][order]
+        self.set_array('life_lines', life_lines)
+
+        fields = np.unique(barcode['field'])
+        if len(fields) > 1:
+            raise ValueError("Barcode contains several field characteristics")
+        if len(fields) == 1:
+            self._set_attr('field', int(fields[0]))
+
+        self._set_attr('dimensions', [int(d) for d in dimensions])
+        self._set_attr('offsets', [int(s) for s in starts] + [len(dims)])
+
+    def set_threshold(self, threshold):
+        """Set filtration value up to which the barcode was computed."""
+        self._set_attr('threshold', float(threshold))
+
+    @property
+    def threshold(self):
+        """Filtration value up to which the barcode was computed."""
+        return self.get_attr('threshold', None)
+
+    @property
+    def field(self):
+        """Characteristic of the coefficient field."""
+        return self.get_attr('field', None)
+
+    def dimensions(self):
+        """Return homology dimensions present in the barcode."""
+        return np.array(self.get_attr('dimensions'), dtype=np.int32)
+
+    def _get_range(self, dimension):
+        """Return (start, stop) of intervals of given dimension."""
+        dimensions = self.get_attr('dimensions')
+        if dimension not in dimensions:
+            return 0, 0
+        i = dimensions.index(dimension)
+        offsets = self.get_attr('offsets')
+        return offsets[i], offsets[i + 1]
+
+    def get_life_lines(self, dimension):
+        """Return (birth, death) pairs of given dimension.
+
+        The result is a read-only view of shape (n, 2) into the memory-mapped
+        array (no data is read until it is accessed).
+        """
+        start, stop = self._get_range(dimension)
+        return self.get_array('life_lines')[:, start:stop].T
+
+    def get_barcode(self):
+        """Return barcode as numpy array of dtype BARCODE_DTYPE."""
+        life_lines = self.get_array('life_lines')
+        barcode = np.empty(life_lines.shape[1], dtype=BARCODE_DTYPE)
+        barcode['field'] = self.field or 0
+        barcode['birth'] = life_lines[0]
+        barcode['death'] = life_lines[1]
+
+        offsets = self.get_attr('offsets')
+        for i, dimension in enumerate(self.get_attr('dimensions')):
+            barcode['dim'][offsets[i]:offsets[i + 1]] = dimension
+
+        return barcode
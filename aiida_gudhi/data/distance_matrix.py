@@ -0,0 +1,163 @@
+"""
+Distance matrix data types
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from aiida_gudhi.data.array import MemmapArrayData
+from aiida_gudhi import distance
+
+
+@contextmanager
+def _condensed_memmap(num_points, dtype):
+    """Temporary .npy file memory-mapped as condensed array.
+
+    :returns: context manager yielding (path, np.memmap)
+    """
+    handle, npy = tempfile.mkstemp(suffix='.npy')
+    os.close(handle)
+
+    try:
+        condensed = np.lib.format.open_memmap(
+            npy,
+            mode='w+',
+            dtype=dtype,
+            shape=(distance.condensed_size(num_points), ))
+        yield npy, condensed
+        del condensed
+    finally:
+        os.remove(npy)
+
+
+class DistanceMatrixData(MemmapArrayData):
+    """
+    Symmetric distance matrix stored as binary condensed lower triangle.
+
+    The ``condensed`` array holds the n(n-1)/2 entries below the diagonal,
+    row by row, i.e. in the order of the GUDHI text format.
+    The text format is produced only when needed (see ``write_gudhi``).
+    """
+
+    #: name of the text file passed to GUDHI
+    filename = 'distance.matrix'
+
+    def __init__(self, matrix=None, condensed=None, dtype=np.float64,
+                 **kwargs):
+        """
+        Constructor for the data class
+
+        Usage: ``DistanceMatrixData(matrix=np.array([[0, 1], [1, 0]]))``
+
+        :param matrix: square distance matrix
+        :param condensed: condensed lower triangle
+        :param dtype: floating point type used to store distances
+        """
+        super(DistanceMatrixData, self).__init__(**kwargs)
+
+        if matrix is not None:
+            self.set_matrix(matrix, dtype=dtype)
+        elif condensed is not None:
+            self.set_condensed(condensed, dtype=dtype)
+
+    @classmethod
+    def from_file(cls, filename, dtype=np.float64):
+        """Create DistanceMatrixData from GUDHI distance matrix file.
+
+        The file is read row by row into a memory-mapped temporary file,
+        i.e. the matrix is never held in memory.
+        """
+        num_points = distance.count_rows(filename)
+        with _condensed_memmap(num_points, dtype) as (npy, condensed):
+            distance.read_gudhi_matrix(filename, out=condensed)
+            condensed.flush()
+            node = cls()
+            node.set_condensed_file(npy)
+
+        return node
+
+    @classmethod
+    def from_point_cloud(cls,
+                         positions,
+                         cell=None,
+                         dtype=np.float64,
+                         block_size=distance.BLOCK_SIZE):
+        """Create DistanceMatrixData from point coordinates.
+
+        Distances are computed in blocks of rows and streamed into a
+        memory-mapped temporary file, i.e. the matrix is never held in memory.
+
+        :param positions: array of point coordinates (n, d)
+        :param cell: array of cell vectors for periodic systems (optional)
+        :param block_size: maximum number of entries computed at a time
+        """
+        with _condensed_memmap(len(positions), dtype) as (npy, condensed):
+            for start, stop, values in distance.iter_distance_blocks(
+                    positions, cell=cell, block_size=block_size):
+                condensed[distance.row_offset(start):
+                          distance.row_offset(stop)] = values
+            condensed.flush()
+            node = cls()
+            node.set_condensed_file(npy)
+
+        return node
+
+    def set_matrix(self, matrix, dtype=np.float64):
+        """Store lower triangle of square distance matrix."""
+        matrix = np.asarray(matrix)
+        num_points = len(matrix)
+        if matrix.shape != (num_points, num_points):
+            raise ValueError("Distance matrix must be square")
+
+        condensed = np.empty(distance.condensed_size(num_points), dtype=dtype)
+        for i in range(num_points):
+            condensed[distance.row_offset(i):distance.row_offset(i + 1)] = \
+                    matrix[i, :i]
+
+        self.set_condensed(condensed, dtype=dtype)
+
+    def set_condensed(self, condensed, dtype=np.float64):
+        """Store condensed lower triangle."""
+        condensed = np.asarray(condensed, dtype=dtype)
+        num_points = distance.num_points_from_size(len(condensed))
+
+        self.set_array('condensed', condensed)
+        self._set_attr('num_points', num_points)
+
+    def set_condensed_file(self, filename):
+        """Store condensed lower triangle from .npy file without loading it."""
+        condensed = np.load(filename, mmap_mode='r')
+        num_points = distance.num_points_from_size(len(condensed))
+
+        self.set_array_file('condensed', filename)
+        self._set_attr('num_points', num_points)
+
+    @property
+    def num_points(self):
+        """Number of points."""
+        return self.get_attr('num_points')
+
+    def get_condensed(self):
+        """Return read-only memory map of the condensed lower triangle."""
+        return self.get_array('condensed')
+
+    def get_matrix(self):
+        """Return full square distance matrix (requires n^2 memory)."""
+        num_points = self.num_points
+        condensed = self.get_condensed()
+        matrix = np.zeros((num_points, num_points), dtype=condensed.dtype)
+        rows, cols = np.tril_indices(num_points, -1)
+        matrix[rows, cols] = condensed
+        matrix[cols, rows] = condensed
+        return matrix
+
+    def write_gudhi(self, handle, block_size=distance.BLOCK_SIZE, fmt=None):
+        """Write distance matrix in GUDHI text format.
+
+        Rows are exported in blocks of at most ``block_size`` entries.
+
+        :param handle: writable file handle
+        """
+        distance.write_gudhi_matrix(
+            handle, self.get_condensed(), block_size=block_size, fmt=fmt)
@@ -0,0 +1,143 @@
+"""
+Sparse edge list data type
+"""
+
+import numpy as np
+from aiida_gudhi.data.array import MemmapArrayData
+from aiida_gudhi import distance
+
+
+class EdgeListData(MemmapArrayData):
+    """
+    Sparse distance matrix keeping only pairs up to a threshold.
+
+    Edges are stored in the ``indices`` array (positions in the condensed
+    lower triangle, sorted) and the ``lengths`` array. Rips complexes with
+    max-edge-length up to ``threshold`` are unaffected by the missing pairs.
+    """
+
+    def __init__(self,
+                 condensed=None,
+                 threshold=None,
+                 dtype=np.float64,
+                 **kwargs):
+        """
+        Constructor for the data class
+
+        Usage: ``EdgeListData(condensed=c, threshold=4.2)``
+
+        :param condensed: condensed distance matrix (may be a np.memmap)
+        :param threshold: maximum edge length kept
+        :param dtype: floating point type used to store edge lengths
+        """
+        super(EdgeListData, self).__init__(**kwargs)
+
+        if condensed is not None:
+            self.set_condensed(condensed, threshold, dtype=dtype)
+
+    @classmethod
+    def from_distance_matrix(cls, distance_matrix, threshold):
+        """Create EdgeListData from DistanceMatrixData."""
+        condensed = distance_matrix.get_condensed()
+        return cls(condensed=condensed, threshold=threshold,
+                   dtype=condensed.dtype)
+
+    @classmethod
+    def from_point_cloud(cls,
+                         positions,
+                         threshold,
+                         cell=None,
+                         dtype=np.float64,
+                         block_size=distance.BLOCK_SIZE):
+        """Create EdgeListData from point coordinates.
+
+        Distances are computed in blocks of rows and only edges up to the
+        threshold are kept, i.e. the dense matrix is never held in memory.
+
+        :param positions: array of point coordinates (n, d)
+        :param threshold: maximum edge length kept
+        :param cell: array of cell vectors for periodic systems (optional)
+        :param block_size: maximum number of entries computed at a time
+        """
+        blocks = distance.iter_distance_blocks(
+            positions, cell=cell, block_size=block_size)
+        node = cls()
+        node.set_edges(
+            len(positions), threshold,
+            *distance.select_edges(blocks, threshold, dtype=dtype))
+        return node
+
+    def set_condensed(self,
+                      condensed,
+                      threshold,
+                      dtype=np.float64,
+                      block_size=distance.BLOCK_SIZE):
+        """Store edges of condensed distance matrix up to threshold."""
+        blocks = distance.iter_condensed_blocks(condensed, block_size)
+        self.set_edges(
+            distance.num_points_from_size(len(condensed)), threshold,
+            *distance.select_edges(blocks, threshold, dtype=dtype))
+
+    def set_edges(self, num_points, threshold, indices, lengths):
+        """Store edges.
+
+        :param num_points: number of points
+        :param threshold: maximum edge length kept
+        :param indices: sorted condensed indices of the edges
+        :param lengths: edge lengths
+        """
+        self.set_array('indices', np.asarray(indices))
+        self.set_array('lengths', np.asarray(lengths))
+        self._set_attr('num_points', int(num_points))
+        self._set_attr('threshold', float(threshold))
+
+    @property
+    def num_points(self):
+        """Number of points."""
+        return self.get_attr('num_points')
+
+    @property
+    def threshold(self):
+        """Maximum edge length kept."""
+        return self.get_attr('threshold')
+
+    @property
+    def num_edges(self):
+        """Number of edges."""
+        return len(self.get_array('lengths'))
+
+    @property
+    def sentinel(self):
+        """Distance written for pairs not in the edge list."""
+        return distance.sentinel_distance(self.threshold)
+
+    def get_condensed(self, fill=np.inf):
+        """Return dense condensed distance matrix.
+
+        :param fill: value of pairs not in the edge list
+        """
+        lengths = self.get_array('lengths')
+        condensed = np.full(
+            distance.condensed_size(self.num_points), fill,
+            dtype=lengths.dtype)
+        condensed[self.get_array('indices')] = lengths
+        return condensed
+
+    def write_gudhi(self, handle, block_size=distance.BLOCK_SIZE, fmt=None):
+        """Write distance matrix in GUDHI text format.
+
+        Pairs not in the edge list are written as ``sentinel``.
+
+        :param handle: writable file handle
+        """
+        lengths = self.get_array('lengths')
+        if fmt is None:
+            fmt = distance.default_format(lengths.dtype)
+        distance.write_edge_list_matrix(
+            handle,
+            self.num_points,
+            self.get_array('indices'),
+            lengths,
+            self.sentinel,
+            block_size=block_size,
+            fmt=fmt)
@@ -2,7 +2,7 @@
 Rips data types
 """
 
-from voluptuous import Schema, Optional
+from voluptuous import Schema, Optional, Any
 from aiida.orm.data.parameter import ParameterData
 
 cmdline_parameters = {
@@ -13,6 +13,22 @@ cmdline_parameters = {
     Optional('min-persistence', default=0): float,
 }
 
+#: Schema of 'settings' input of RipsDistanceMatrixCalculation
+settings_schema = Schema({
+    # derive barcodes for these max-edge-length values from a single run
+    Optional('threshold_sweep', default=[]): [float],
+    # filtration values at which summary Betti numbers are evaluated
+    Optional('summary_grid'): [float],
+    # compress distance matrix for upload and barcodes for retrieval
+    Optional('compression'): Any('gzip', 'zstd'),
+    # number of longest intervals listed per dimension in summaries
+    Optional('summary_top_k'): int,
+    # summarize barcodes on the remote and retrieve only the summaries
+    Optional('retrieve', default='barcode'): Any('barcode', 'summary'),
+    # keep barcode files on the remote when retrieving summaries
+    Optional('keep_barcode', default=True): bool,
+})
+
 
 class RipsDistanceMatrixParameters(ParameterData):
     """
@@ -45,18 +61,22 @@ class RipsDistanceMatrixParameters(ParameterData):
 
     def cmdline_params(self,
                        distance_matrix_file_name='distance.matrix',
-                       remote_folder_path=None):
+                       remote_folder_path=None,
+                       output_file_name=None):
         """Synthesize command line parameters
 
         e.g. [ ['--output-file', 'out.barcode'], ['distance_matrix.file']]
 
         :param distance_matrix_file_name: Name of distance matrix file
         :param remote_folder_path: Path to remote folder containing distance matrix file
+        :param output_file_name: Overrides 'output-file' parameter
 
         """
         parameters = []
 
         pm_dict = self.get_dict()
+        if output_file_name is not None:
+            pm_dict['output-file'] = output_file_name
         for k, v in pm_dict.iteritems():
             parameters += ['--' + k, v]
 
@@ -68,6 +88,11 @@ class RipsDistanceMatrixParameters(ParameterData):
 
         return map(str, parameters)
 
+    @property
+    def threshold(self):
+        """Maximum filtration value."""
+        return self.get_dict()['max-edge-length']
+
     @property
     def output_files(self):
         """Return list of output files to be retrieved"""
@@ -0,0 +1,30 @@
+""" Tests for barcode data type
+
+"""
+import os
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.parsers.barcode import BarcodeParser
+
+
+class TestBarcodeData(gt.PluginTestCase):
+    def test_life_lines(self):
+        from aiida.orm import DataFactory, load_node
+        BarcodeData = DataFactory('gudhi.barcode')
+
+        filename = os.path.join(gt.TEST_DIR, 'sample.barcode')
+        parser = BarcodeParser(filename=filename)
+        barcode = BarcodeData.from_file(filename)
+        barcode.store()
+
+        barcode = load_node(barcode.pk)
+        npt.assert_equal(barcode.dimensions(), [0, 1, 2])
+        for dim in barcode.dimensions():
+            npt.assert_equal(
+                barcode.get_life_lines(dim), parser.get_life_lines(dim))
+        self.assertIsInstance(barcode.get_array('life_lines'), np.memmap)
+
+        npt.assert_equal(
+            np.sort(barcode.get_barcode(), order=['dim', 'birth', 'death']),
+            np.sort(parser.data, order=['dim', 'birth', 'death']))
@@ -0,0 +1,33 @@
+""" Tests for distance matrix data type
+
+"""
+import os
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestDistanceMatrixData(gt.PluginTestCase):
+    def test_roundtrip(self):
+        from aiida.orm import DataFactory
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+
+        filename = os.path.join(gt.TEST_DIR, 'sample_distance.matrix')
+        distance_matrix = DistanceMatrixData.from_file(filename)
+        self.assertEqual(distance_matrix.num_points, 100)
+        self.assertIsInstance(distance_matrix.get_condensed(), np.memmap)
+
+        matrix = distance_matrix.get_matrix()
+        npt.assert_equal(matrix, matrix.T)
+        npt.assert_almost_equal(matrix[1, 0], 12.0051)
+
+        # small blocks exercise the block-wise export
+        exported = gt.get_temp_folder().get_abs_path('distance.matrix')
+        with open(exported, 'w') as handle:
+            distance_matrix.write_gudhi(handle, block_size=50)
+        with open(exported) as handle, open(filename) as original:
+            self.assertEqual(handle.read(), original.read())
+
+        copy = DistanceMatrixData(matrix=matrix, dtype=np.float32)
+        npt.assert_almost_equal(copy.get_condensed(),
+                                distance_matrix.get_condensed(), decimal=5)
@@ -0,0 +1,41 @@
+""" Tests for sparse edge list data type
+
+"""
+import os
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+
+
+class TestEdgeListData(gt.PluginTestCase):
+    def test_edge_list(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.distance import read_gudhi_matrix
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        EdgeListData = DataFactory('gudhi.edge_list')
+
+        filename = os.path.join(gt.TEST_DIR, 'sample_distance.matrix')
+        distance_matrix = DistanceMatrixData.from_file(filename)
+        edge_list = EdgeListData.from_distance_matrix(distance_matrix, 4.2)
+        condensed = distance_matrix.get_condensed()
+        self.assertEqual(edge_list.num_points, 100)
+        self.assertEqual(edge_list.num_edges, np.sum(condensed <= 4.2))
+        self.assertGreater(edge_list.sentinel, 4.2)
+
+        # same edge list computed from point cloud (in blocks)
+        positions = np.random.RandomState(0).rand(50, 3) * 5.0
+        sparse = EdgeListData.from_point_cloud(
+            positions, 1.0, block_size=100)
+        dense = DistanceMatrixData.from_point_cloud(positions)
+        expected = dense.get_condensed()
+        npt.assert_almost_equal(
+            sparse.get_condensed(),
+            np.where(expected <= 1.0, expected, np.inf))
+
+        # pairs beyond the threshold are written as sentinel
+        exported = gt.get_temp_folder().get_abs_path('distance.matrix')
+        with open(exported, 'w') as handle:
+            edge_list.write_gudhi(handle, block_size=50)
+        npt.assert_equal(
+            read_gudhi_matrix(exported),
+            np.where(condensed <= 4.2, condensed, edge_list.sentinel))
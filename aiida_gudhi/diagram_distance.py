@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Wasserstein and bottleneck distances between persistence diagrams.
+
+Points are compared in the L-infinity norm and may be matched to the
+diagonal, at cost half their persistence (as in GUDHI). Infinite intervals
+are matched among themselves by sorted births; diagrams with different
+numbers of infinite intervals are at infinite distance.
+
+Wasserstein distances require scipy (``pip install aiida-gudhi[distances]``);
+bottleneck distances use numpy only.
+
+Usage::
+
+    diagrams = diagrams_from_barcodes(barcodes, dimension=1, infinity=None)
+    matrix = pairwise_distances(diagrams, p=2, output='w2.npy', n_jobs=8)
+"""
+from functools import partial
+import numpy as np
+
+#: Number of diagrams per side of a tile of pairs
+TILE_SIZE = 64
+
+
+def _split(diagram):
+    """Split diagram into finite intervals and sorted births of infinite
+    ones."""
+    diagram = np.asarray(diagram, dtype=np.float64).reshape(-1, 2)
+    infinite = np.isinf(diagram[:, 1])
+    return diagram[~infinite], np.sort(diagram[infinite, 0])
+
+
+def _norm(values, p):
+    if not len(values):
+        return 0.
+    if np.isinf(p):
+        return values.max()
+    return np.sum(values**p)**(1. / p)
+
+
+def _cost_matrix(a, b):
+    """Augmented cost matrix of matching a and b including the diagonal.
+
+    Rows: points of a, then diagonal copies of b.
+    Columns: points of b, then diagonal copies of a.
+    """
+    n, m = len(a), len(b)
+    cost = np.zeros((n + m, n + m))
+    cost[:n, :m] = np.maximum(
+        np.abs(a[:, None, 0] - b[None, :, 0]),
+        np.abs(a[:, None, 1] - b[None, :, 1]))
+    # point to diagonal, other assignments are forbidden
+    cost[:n, m:] = np.inf
+    cost[n:, :m] = np.inf
+    cost[np.arange(n), m + np.arange(n)] = (a[:, 1] - a[:, 0]) / 2
+    cost[n + np.arange(m), np.arange(m)] = (b[:, 1] - b[:, 0]) / 2
+    return cost
+
+
+def _essential_distance(births_a, births_b, p):
+    """Distance between infinite intervals (matched by sorted births)."""
+    if len(births_a) != len(births_b):
+        return np.inf
+    return _norm(np.abs(births_a - births_b), p)
+
+
+def _combine(finite, essential, p):
+    if np.isinf(p):
+        return max(finite, essential)
+    return (finite**p + essential**p)**(1. / p)
+
+
+def wasserstein_distance(a, b, p=1.):
+    """Wasserstein-p distance between diagrams (optimal assignment).
+
+    :param a, b: arrays (n, 2) of births and deaths
+    :param p: order (np.inf for the bottleneck distance)
+    """
+    if np.isinf(p):
+        return bottleneck_distance(a, b)
+    from scipy.optimize import linear_sum_assignment
+
+    (a, essential_a), (b, essential_b) = _split(a), _split(b)
+    finite = 0.
+    if len(a) or len(b):
+        cost = _cost_matrix(a, b)**p
+        # forbidden assignments must stay finite for linear_sum_assignment,
+        # but cost more than any allowed assignment
+        forbidden = np.isinf(cost)
+        cost[forbidden] = cost[~forbidden].sum() + 1
+        rows, cols = linear_sum_assignment(cost)
+        finite = cost[rows, cols].sum()**(1. / p)
+
+    return _combine(finite, _essential_distance(essential_a, essential_b, p),
+                    p)
+
+
+def has_perfect_matching(adjacency):
+    """Whether a bipartite graph has a perfect matching (Hopcroft-Karp).
+
+    Matchings are augmented along vertex-disjoint paths found in the BFS
+    layering of the graph, which takes O(E sqrt(V)).
+
+    :param adjacency: boolean array (n, n); rows and columns are the two
+        sides of the graph
+    """
+    size = len(adjacency)
+    neighbours = [np.flatnonzero(row) for row in adjacency]
+    match_row = [-1] * size  # column matched to row
+    match_col = [-1] * size  # row matched to column
+
+    while True:
+        # BFS layers of rows, starting from unmatched rows
+        layer = [-1] * size
+        queue = [row for row in range(size) if match_row[row] < 0]
+        for row in queue:
+            layer[row] = 0
+        augmentable = False
+        for row in queue:
+            for col in neighbours[row]:
+                matched = match_col[col]
+                if matched < 0:
+                    augmentable = True
+                elif layer[matched] < 0:
+                    layer[matched] = layer[row] + 1
+                    queue.append(matched)
+        if not augmentable:
+            break
+
+        # DFS along the layers (iterative), rows used once per phase
+        position = [0] * size
+        for root in range(size):
+            if match_row[root] >= 0:
+                continue
+            rows, cols = [root], []
+            while rows:
+                row = rows[-1]
+                if position[row] == len(neighbours[row]):
+                    layer[row] = -1
+                    rows.pop()
+                    if cols:
+                        cols.pop()
+                    continue
+                col = neighbours[row][position[row]]
+                position[row] += 1
+                matched = match_col[col]
+                if matched < 0:
+                    for path_row, path_col in zip(rows, cols + [col]):
+                        match_row[path_row] = path_col
+                        match_col[path_col] = path_row
+                    break
+                elif layer[matched] == layer[row] + 1:
+                    rows.append(matched)
+                    cols.append(col)
+
+    return all(col >= 0 for col in match_row)
+
+
+def bottleneck_distance(a, b):
+    """Bottleneck distance between diagrams.
+
+    Binary search over the entries of the cost matrix for the smallest
+    value admitting a perfect matching.
+
+    :param a, b: arrays (n, 2) of births and deaths
+    """
+    (a, essential_a), (b, essential_b) = _split(a), _split(b)
+    finite = 0.
+    if len(a) or len(b):
+        cost = _cost_matrix(a, b)
+        candidates = np.unique(cost[np.isfinite(cost)])
+
+        lower, upper = 0, len(candidates) - 1
+        while lower < upper:
+            middle = (lower + upper) // 2
+            if has_perfect_matching(cost <= candidates[middle]):
+                upper = middle
+            else:
+                lower = middle + 1
+        finite = candidates[lower]
+
+    return _combine(finite,
+                    _essential_distance(essential_a, essential_b, np.inf),
+                    np.inf)
+
+
+def lower_bound(a, b, p=1.):
+    """Cheap lower bound of the Wasserstein-p distance.
+
+    Any matched pair of points (or point and diagonal) costs at least the
+    difference of their half-persistences, hence the distance is at least
+    the difference of the p-norms of the half-persistences.
+    """
+    (a, essential_a), (b, essential_b) = _split(a), _split(b)
+    if len(essential_a) != len(essential_b):
+        return np.inf
+    return abs(
+        _norm((a[:, 1] - a[:, 0]) / 2, p) - _norm((b[:, 1] - b[:, 0]) / 2, p))
+
+
+def _tile_distances(task, p, cutoff):
+    """Distances of one tile of pairs.
+
+    :param task: tuple (i0, j0, diagrams_i, diagrams_j)
+    :returns: tuple (i0, j0, distances)
+    """
+    i0, j0, diagrams_i, diagrams_j = task
+    distances = np.empty((len(diagrams_i), len(diagrams_j)))
+    for i, a in enumerate(diagrams_i):
+        for j, b in enumerate(diagrams_j):
+            if i0 + i >= j0 + j:
+                # lower triangle is filled by symmetry
+                distances[i, j] = np.nan
+            elif cutoff is not None and lower_bound(a, b, p) > cutoff:
+                distances[i, j] = np.inf
+            else:
+                distances[i, j] = wasserstein_distance(a, b, p)
+    return i0, j0, distances
+
+
+def pairwise_distances(diagrams,
+                       p=1.,
+                       output=None,
+                       cutoff=None,
+                       tile_size=TILE_SIZE,
+                       n_jobs=1):
+    """Matrix of Wasserstein-p (or bottleneck) distances between diagrams.
+
+    Pairs are processed in square tiles, optionally in a process pool.
+    With ``output``, the matrix is a .npy file updated after every tile;
+    uncomputed entries are NaN, and calling again with the same file
+    computes only the missing tiles.
+
+    :param diagrams: list of arrays (n_i, 2) of births and deaths
+    :param p: order of Wasserstein distance (np.inf: bottleneck)
+    :param output: path to .npy file (optional)
+    :param cutoff: distances above cutoff may be reported as inf, if the
+        lower bound already exceeds it
+    :param tile_size: number of diagrams per side of a tile
+    :param n_jobs: number of processes
+    :returns: array (n, n) (np.memmap if output is given)
+    """
+    num = len(diagrams)
+    if output is None:
+        matrix = np.full((num, num), np.nan)
+    else:
+        import os
+        if os.path.exists(output):
+            matrix = np.load(output, mmap_mode='r+')
+            if matrix.shape != (num, num):
+                raise ValueError("{} has shape {}, expected {}".format(
+                    output, matrix.shape, (num, num)))
+        else:
+            matrix = np.lib.format.open_memmap(
+                output, mode='w+', dtype=np.float64, shape=(num, num))
+            matrix[:] = np.nan
+    np.fill_diagonal(matrix, 0)
+
+    starts = range(0, num, tile_size)
+    tasks = [(i0, j0, diagrams[i0:i0 + tile_size],
+              diagrams[j0:j0 + tile_size]) for i0 in starts for j0 in starts
+             if j0 >= i0 and np.isnan(
+                 matrix[i0:i0 + tile_size, j0:j0 + tile_size]).any()]
+
+    function = partial(_tile_distances, p=p, cutoff=cutoff)
+    if n_jobs == 1:
+        results = (function(task) for task in tasks)
+    else:
+        from multiprocessing import Pool
+        pool = Pool(n_jobs)
+        results = pool.imap_unordered(function, tasks)
+
+    try:
+        for i0, j0, distances in results:
+            upper = ~np.isnan(distances)
+            block = matrix[i0:i0 + tile_size, j0:j0 + tile_size]
+            block[upper] = distances[upper]
+            block_t = matrix[j0:j0 + tile_size, i0:i0 + tile_size]
+            block_t[upper.T] = distances.T[upper.T]
+            if output is not None:
+                matrix.flush()
+    finally:
+        if n_jobs != 1:
+            pool.close()
+            pool.join()
+
+    return matrix
+
+
+def barcode_distances(barcodes,
+                      dimensions,
+                      p=1.,
+                      output_prefix=None,
+                      **kwargs):
+    """Pairwise diagram distances of barcodes for several dimensions.
+
+    :param barcodes: list of numpy arrays of dtype BARCODE_DTYPE or
+        BarcodeParser objects
+    :param dimensions: list of homology dimensions
+    :param output_prefix: write matrix of dimension d to
+        '<output_prefix>_dim<d>.npy' (optional)
+    :param kwargs: passed on to pairwise_distances
+    :returns: dictionary {dimension: distance matrix}
+    """
+    from aiida_gudhi.vectorize import diagrams_from_barcodes
+
+    matrices = {}
+    for dim in dimensions:
+        output = None
+        if output_prefix is not None:
+            output = '{}_dim{}.npy'.format(output_prefix, dim)
+        matrices[dim] = pairwise_distances(
+            diagrams_from_barcodes(barcodes, dim, infinity=np.inf),
+            p=p,
+            output=output,
+            **kwargs)
+    return matrices
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""
+Distance matrices in the lower-triangular text format read by GUDHI.
+
+Row i of the text file contains the i distances d(i, 0), ..., d(i, i-1),
+each terminated by a semicolon (the first row is empty). As for GUDHI, an
+empty line after the first ends the matrix. Lines holding only whitespace
+are not empty: GUDHI reads them as a row.
+In memory, the same entries are kept row by row in a flat "condensed" array
+of length n(n-1)/2.
+
+This module depends only on numpy, so that it can be copied to and run on
+the compute node.
+"""
+import os
+import numpy as np
+
+#: Maximum number of matrix entries computed or formatted at a time
+BLOCK_SIZE = 2**20
+
+
+def condensed_size(num_points):
+    """Number of entries in the condensed lower triangle."""
+    return num_points * (num_points - 1) // 2
+
+
+def row_offset(row):
+    """Index in the condensed array of the first entry of given row."""
+    return row * (row - 1) // 2
+
+
+def num_points_from_size(size):
+    """Number of points of a condensed lower triangle with given size."""
+    num_points = int(round((1 + np.sqrt(1 + 8 * size)) / 2))
+    if condensed_size(num_points) != size:
+        raise ValueError(
+            "{} is not a valid size of a lower triangle".format(size))
+    return num_points
+
+
+def iter_row_blocks(num_points, block_size=BLOCK_SIZE):
+    """Split rows into contiguous blocks of at most block_size entries.
+
+    Blocks contain at least one row.
+
+    :returns: generator of (start, stop) row ranges
+    """
+    start = 0
+    while start < num_points:
+        stop = start + 1
+        while stop < num_points and \
+                row_offset(stop + 1) - row_offset(start) <= block_size:
+            stop += 1
+        yield start, stop
+        start = stop
+
+
+def parse_gudhi_row(line, dtype=np.float64):
+    """Parse one line of a GUDHI distance matrix file.
+
+    :param line: line of text, e.g. '15.1013;13.1884;'
+    :returns: numpy array of distances
+    """
+    tokens = line.strip().split(';')
+    if tokens[-1] == '':
+        tokens.pop()
+    return np.array(tokens, dtype=dtype)
+
+
+def iter_matrix_lines(handle, name):
+    """Lines of the rows of a GUDHI distance matrix file.
+
+    Stops at the end of the matrix (an empty line after the first); only
+    blank lines may follow it.
+
+    :param handle: file handle open for reading
+    :param name: name of the file used in error messages
+    :returns: generator of (line index, line)
+    """
+    end = None
+    for i, line in enumerate(handle):
+        if end is None:
+            if i > 0 and not line.rstrip('\r\n'):
+                end = i
+            else:
+                yield i, line
+        elif line.strip():
+            raise ValueError(
+                "{}, line {}, column 1: row after end of matrix "
+                "(empty line {})".format(name, i + 1, end + 1))
+
+
+def count_rows(filename):
+    """Count rows (i.e. points) of a GUDHI distance matrix file."""
+    name = os.path.basename(filename)
+    with open(filename, 'r') as handle:
+        return sum(1 for _line in iter_matrix_lines(handle, name))
+
+
+def _token_column(line, index):
+    """Character column (1-based) of entry ``index`` in a matrix line."""
+    stripped = line.strip()
+    column = line.index(stripped) if stripped else 0
+    for token in stripped.split(';')[:index]:
+        column += len(token) + 1
+    return column + 1
+
+
+def validate_gudhi_matrix(filename, num_points=None):
+    """Check GUDHI distance matrix file, streaming it row by row.
+
+    Rows are parsed as arrays (as in read_gudhi_matrix) and kept in memory
+    one at a time. Raises on the first malformed row, naming line and
+    character column of the offending entry.
+    Rows end at the end of the matrix (see iter_matrix_lines).
+
+    :param filename: path to distance matrix file
+    :param num_points: expected number of points (optional)
+    :returns: number of points
+    """
+    name = os.path.basename(filename)
+    count = 0
+    with open(filename, 'r') as handle:
+        for i, line in iter_matrix_lines(handle, name):
+            count += 1
+            try:
+                row = parse_gudhi_row(line)
+            except ValueError:
+                # locate the culprit (slow path, error case only)
+                for j, token in enumerate(line.strip().split(';')):
+                    try:
+                        float(token)
+                    except ValueError:
+                        break
+                raise ValueError(
+                    "{}, line {}, column {}: invalid entry '{}'".format(
+                        name, i + 1, _token_column(line, j), token))
+
+            if len(row) != i:
+                column = _token_column(line, min(len(row), i))
+                raise ValueError(
+                    "{}, line {}, column {}: row has {} entries, expected {}".
+                    format(name, i + 1, column, len(row), i))
+
+            with np.errstate(invalid='ignore'):
+                invalid = np.flatnonzero(np.isnan(row) | (row < 0))
+            if len(invalid):
+                j = invalid[0]
+                kind = 'NaN' if np.isnan(row[j]) else 'negative'
+                raise ValueError("{}, line {}, column {}: {} distance".format(
+                    name, i + 1, _token_column(line, j), kind))
+
+    if not count:
+        raise ValueError("{}: empty distance matrix".format(name))
+    if num_points is not None and count != num_points:
+        raise ValueError("{}: {} points, expected {}".format(
+            name, count, num_points))
+
+    return count
+
+
+def read_gudhi_matrix(filename, dtype=np.float64, out=None):
+    """Read GUDHI distance matrix file into condensed array, row by row.
+
+    :param filename: path to distance matrix file
+    :param dtype: floating point type of the condensed array
+    :param out: preallocated condensed array to fill (e.g. a np.memmap)
+    :returns: condensed array
+    """
+    num_points = count_rows(filename)
+    if out is None:
+        out = np.empty(condensed_size(num_points), dtype=dtype)
+    elif len(out) != condensed_size(num_points):
+        raise ValueError("Output array has wrong size for {} points".format(
+            num_points))
+
+    name = os.path.basename(filename)
+    with open(filename, 'r') as handle:
+        for i, line in iter_matrix_lines(handle, name):
+            row = parse_gudhi_row(line, dtype=out.dtype)
+            if len(row) != i:
+                raise ValueError("Row {} of {} has {} entries, expected {}".
+                                 format(i, filename, len(row), i))
+            out[row_offset(i):row_offset(i + 1)] = row
+
+    return out
+
+
+def default_format(dtype):
+    """Default %-format of distances of given floating point type.
+
+    Uses the number of significant digits resolved by the type (7 for
+    float32, 12 for float64).
+    """
+    if np.dtype(dtype) == np.float32:
+        return '%.7g'
+    return '%.12g'
+
+
+def write_gudhi_rows(handle, values, start, stop, fmt='%.12g'):
+    """Write rows start..stop-1 of distance matrix in GUDHI format.
+
+    All rows of the block are formatted in a single string formatting call.
+
+    :param handle: writable file handle
+    :param values: condensed entries of rows start..stop-1
+    :param start: index of first row
+    :param stop: index after last row
+    :param fmt: %-format of a single distance
+    """
+    entry = fmt + ';'
+    template = ''.join(entry * i + '\n' for i in range(start, stop))
+    handle.write(template % tuple(np.asarray(values).tolist()))
+
+
+def write_gudhi_matrix(handle, condensed, block_size=BLOCK_SIZE, fmt=None):
+    """Write condensed distance matrix in GUDHI format, block by block.
+
+    Memory usage is bounded by the block size (not the matrix size).
+
+    :param handle: writable file handle
+    :param condensed: condensed array (may be a np.memmap)
+    :param block_size: maximum number of entries formatted at a time
+    :param fmt: %-format of a single distance
+    """
+    if fmt is None:
+        fmt = default_format(condensed.dtype)
+    num_points = num_points_from_size(len(condensed))
+
+    for start, stop in iter_row_blocks(num_points, block_size):
+        values = condensed[row_offset(start):row_offset(stop)]
+        write_gudhi_rows(handle, values, start, stop, fmt=fmt)
+
+
+#: Shifts to 13 of the 26 neighbouring images (in units of cell vectors),
+#: the other 13 are their negatives
+_IMAGE_SHIFTS = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                 for k in (-1, 0, 1) if (i, j, k) > (0, 0, 0)]
+
+
+def is_orthogonal(cell):
+    """Whether cell vectors are mutually orthogonal."""
+    metric = np.dot(cell, np.transpose(cell))
+    return np.allclose(metric, np.diag(np.diag(metric)))
+
+
+def minimum_image(diff, cell):
+    """Apply minimum image convention to difference vectors.
+
+    Differences are wrapped to the [-0.5, 0.5) range in fractional
+    coordinates. This is the shortest image only for orthogonal cells,
+    see periodic_distances for the general case.
+
+    :param diff: array of cartesian difference vectors (..., 3)
+    :param cell: array of cell vectors (rows)
+    """
+    frac = np.dot(diff, np.linalg.inv(cell))
+    frac -= np.round(frac)
+    return np.dot(frac, cell)
+
+
+def periodic_distances(positions_a, positions_b, cell):
+    """Minimum-image distances between two sets of points in a periodic cell.
+
+    After wrapping fractional differences to [-0.5, 0.5), the shortest image
+    of a triclinic cell is among the 27 neighbouring images, which are
+    checked one by one (keeping memory at a single (n_a, n_b) array).
+    For orthogonal cells, the wrapped difference is already the shortest.
+
+    :param positions_a: array of cartesian coordinates (n_a, 3)
+    :param positions_b: array of cartesian coordinates (n_b, 3)
+    :param cell: array of cell vectors (rows)
+    :returns: array of distances (n_a, n_b)
+    """
+    cell = np.asarray(cell, dtype=np.float64)
+    diff = positions_a[:, None, :] - positions_b[None, :, :]
+    diff = minimum_image(diff, cell)
+    norm2 = np.einsum('ijk,ijk->ij', diff, diff)
+    dist2 = norm2.copy()
+
+    if not is_orthogonal(cell):
+        # |d +- t|^2 = |d|^2 + |t|^2 +- 2 d.t  with  t = s.cell
+        projections = 2 * np.einsum('ijk,lk->lij', diff, cell)
+        for shift in _IMAGE_SHIFTS:
+            translation = np.dot(shift, cell)
+            base = norm2 + np.dot(translation, translation)
+            cross = sum(s * p for s, p in zip(shift, projections) if s)
+            np.minimum(dist2, base + cross, out=dist2)
+            np.minimum(dist2, base - cross, out=dist2)
+
+    return np.sqrt(dist2)
+
+
+def iter_distance_blocks(positions, cell=None, block_size=BLOCK_SIZE):
+    """Compute condensed distance matrix of point cloud, block by block.
+
+    Row blocks are computed against all preceding points using numpy
+    broadcasting, so memory usage scales with block_size, not n^2.
+
+    :param positions: array of point coordinates (n, d)
+    :param cell: array of cell vectors for periodic systems (optional)
+    :param block_size: maximum number of entries computed at a time
+    :returns: generator of (start, stop, values) with condensed entries of
+        rows start..stop-1
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+
+    for start, stop in iter_row_blocks(len(positions), block_size):
+        if cell is None:
+            diff = positions[start:stop, None, :] - positions[None, :stop, :]
+            dist = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        else:
+            dist = periodic_distances(positions[start:stop],
+                                      positions[:stop], cell)
+
+        # keep entries below the diagonal, row by row
+        rows = np.arange(start, stop)[:, None]
+        cols = np.arange(stop)[None, :]
+        yield start, stop, dist[cols < rows]
+
+
+def write_point_cloud_matrix(handle,
+                             positions,
+                             cell=None,
+                             block_size=BLOCK_SIZE,
+                             fmt='%.12g'):
+    """Write distance matrix of point cloud in GUDHI format.
+
+    The matrix is computed and written block by block.
+
+    :param handle: writable file handle
+    :param positions: array of point coordinates (n, d)
+    :param cell: array of cell vectors for periodic systems (optional)
+    """
+    for start, stop, values in iter_distance_blocks(positions, cell,
+                                                    block_size):
+        write_gudhi_rows(handle, values, start, stop, fmt=fmt)
+
+
+def index_dtype(num_points):
+    """Smallest integer type holding condensed indices of num_points."""
+    if condensed_size(num_points) < 2**31:
+        return np.int32
+    return np.int64
+
+
+def sentinel_distance(threshold):
+    """Distance written for pairs missing from a sparse edge list.
+
+    GUDHI ignores pairs farther apart than max-edge-length, so any value
+    above the threshold will do; a power of ten keeps the text short.
+    """
+    if threshold <= 0:
+        return 1.
+    return 10.**(int(np.floor(np.log10(threshold))) + 1)
+
+
+def iter_condensed_blocks(condensed, block_size=BLOCK_SIZE):
+    """Iterate over condensed distance matrix in blocks of rows.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :returns: generator of (start, stop, values) with condensed entries of
+        rows start..stop-1
+    """
+    num_points = num_points_from_size(len(condensed))
+    for start, stop in iter_row_blocks(num_points, block_size):
+        yield start, stop, np.asarray(
+            condensed[row_offset(start):row_offset(stop)])
+
+
+def select_edges(blocks, threshold, dtype=np.float64):
+    """Collect entries <= threshold from blocks of a condensed matrix.
+
+    :param blocks: iterable of (start, stop, values), e.g. from
+        iter_condensed_blocks or iter_distance_blocks
+    :param threshold: maximum edge length
+    :returns: tuple (indices, lengths) of edges, sorted by condensed index
+    """
+    indices = []
+    lengths = []
+    num_points = 0
+    for start, stop, values in blocks:
+        selected = np.flatnonzero(values <= threshold)
+        indices.append(selected + row_offset(start))
+        lengths.append(values[selected].astype(dtype))
+        num_points = stop
+
+    itype = index_dtype(num_points)
+    if not indices:
+        return np.empty(0, dtype=itype), np.empty(0, dtype=dtype)
+    return np.concatenate(indices).astype(itype), np.concatenate(lengths)
+
+
+def iter_sparse_blocks(num_points,
+                       indices,
+                       lengths,
+                       sentinel,
+                       block_size=BLOCK_SIZE):
+    """Expand sparse edge list into condensed distance matrix, block by block.
+
+    :param num_points: number of points
+    :param indices: sorted condensed indices of the edges
+    :param lengths: edge lengths
+    :param sentinel: value of entries not in the edge list
+    :returns: generator of (start, stop, values) with condensed entries of
+        rows start..stop-1
+    """
+    for start, stop in iter_row_blocks(num_points, block_size):
+        offset = row_offset(start)
+        values = np.full(row_offset(stop) - offset, sentinel,
+                         dtype=np.asarray(lengths).dtype)
+        lower, upper = np.searchsorted(indices, [offset, row_offset(stop)])
+        values[np.asarray(indices[lower:upper]) - offset] = \
+            lengths[lower:upper]
+        yield start, stop, values
+
+
+def write_edge_list_matrix(handle,
+                           num_points,
+                           indices,
+                           lengths,
+                           sentinel,
+                           block_size=BLOCK_SIZE,
+                           fmt='%.12g'):
+    """Write distance matrix of sparse edge list in GUDHI format.
+
+    :param handle: writable file handle
+    :param num_points: number of points
+    :param indices: sorted condensed indices of the edges
+    :param lengths: edge lengths
+    :param sentinel: value of entries not in the edge list
+    """
+    for start, stop, values in iter_sparse_blocks(
+            num_points, indices, lengths, sentinel, block_size):
+        write_gudhi_rows(handle, values, start, stop, fmt=fmt)
+
+
+def main(argv=None):
+    """Write GUDHI distance matrix from point cloud or sparse edge list
+    stored in .npy files."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        '--block-size',
+        type=int,
+        default=BLOCK_SIZE,
+        help='maximum number of matrix entries computed at a time')
+    subparsers = parser.add_subparsers(dest='input')
+
+    points = subparsers.add_parser('points', help='point cloud')
+    points.add_argument('positions', help='.npy file with coordinates (n, d)')
+    points.add_argument('output', help='distance matrix file to write')
+    points.add_argument('--cell', help='.npy file with cell vectors (rows)')
+
+    edges = subparsers.add_parser('edges', help='sparse edge list')
+    edges.add_argument('indices', help='.npy file with condensed indices')
+    edges.add_argument('lengths', help='.npy file with edge lengths')
+    edges.add_argument('output', help='distance matrix file to write')
+    edges.add_argument('--num-points', type=int, required=True)
+    edges.add_argument(
+        '--sentinel',
+        type=float,
+        required=True,
+        help='distance of pairs not in the edge list')
+    args = parser.parse_args(argv)
+
+    with open(args.output, 'w') as handle:
+        if args.input == 'points':
+            positions = np.load(args.positions, mmap_mode='r')
+            cell = None if args.cell is None else np.load(args.cell)
+            write_point_cloud_matrix(
+                handle, positions, cell=cell, block_size=args.block_size)
+        else:
+            lengths = np.load(args.lengths, mmap_mode='r')
+            write_edge_list_matrix(
+                handle,
+                args.num_points,
+                np.load(args.indices, mmap_mode='r'),
+                lengths,
+                args.sentinel,
+                block_size=args.block_size,
+                fmt=default_format(lengths.dtype))
+
+
+if __name__ == '__main__':
+    main()
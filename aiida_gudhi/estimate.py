@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Estimate size, memory and runtime of Rips persistence calculations.
+
+A k-simplex of the Rips complex is a (k+1)-clique of the graph of edges up
+to max-edge-length. Its count is estimated from the degree histogram of
+this graph and its clustering coefficient C (the probability that two
+neighbours of a point are neighbours of each other)::
+
+    n_k ~ 1/(k+1) sum_v binom(d_v, k) C^(k-1)
+
+which is exact for edges (k=1) and triangles (k=2). For higher dimensions,
+each further vertex is taken to be adjacent to the others with probability
+C. In geometric graphs this overestimates counts by some 30%; assuming
+independent edges instead, C^(k(k-1)/2), underestimates them by a similar
+amount.
+Memory and runtime are linear in the number of matrix entries and of
+simplices, with constants fitted by benchmarks/calibrate_estimator.py.
+Distance matrices, point clouds and edge lists are supported.
+
+Usage::
+
+    estimate = size_calculation(calc)  # sets resources, wallclock, memory
+"""
+from functools import partial
+import numpy as np
+from aiida_gudhi.distance import (BLOCK_SIZE, row_offset, condensed_size,
+                                  num_points_from_size, iter_condensed_blocks,
+                                  iter_distance_blocks)
+from aiida_gudhi.persistence import condensed_to_pairs, sub_matrix
+from aiida_gudhi.subsample import condensed_row, point_cloud_row
+
+# Fitted with benchmarks/calibrate_estimator.py --backend python (GUDHI
+# 3.13.0 Python module, 1000-4000 random points in the unit cube,
+# max-edge-length 0.1-0.2, cpx-dimension 3, one core of an Intel Xeon,
+# 2026-10). Simplex counts are the estimated ones, so their bias is
+# absorbed. The per-entry constants include the Python lists holding the
+# matrix and overestimate the command line tool.
+
+#: Bytes per distance matrix entry
+BYTES_PER_ENTRY = 35
+#: Bytes per (estimated) simplex
+BYTES_PER_SIMPLEX = 42
+#: Memory of process independent of input size
+BASE_BYTES = 42 * 1024**2
+#: Seconds per distance matrix entry (parsing of text file)
+SECONDS_PER_ENTRY = 5e-7
+#: Seconds per (estimated) simplex
+SECONDS_PER_SIMPLEX = 1.4e-6
+
+#: Number of points sampled to estimate the clustering coefficient
+CLUSTERING_SAMPLES = 200
+#: Maximum number of neighbours per sampled point
+CLUSTERING_NEIGHBOURS = 200
+
+
+def block_degrees(num_points, blocks, threshold):
+    """Number of neighbours of each point within threshold.
+
+    :param blocks: iterable of (start, stop, values) with condensed entries
+        of rows start..stop-1, e.g. from iter_condensed_blocks or
+        iter_distance_blocks
+    :param threshold: maximum edge length
+    :returns: integer array (n, )
+    """
+    counts = np.zeros(num_points, dtype=np.int64)
+    for start, _stop, values in blocks:
+        rows, cols = condensed_to_pairs(
+            np.flatnonzero(values <= threshold) + row_offset(start))
+        counts += np.bincount(rows, minlength=num_points)
+        counts += np.bincount(cols, minlength=num_points)
+    return counts
+
+
+def degrees(condensed, threshold, block_size=BLOCK_SIZE):
+    """Number of neighbours of each point within threshold.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param threshold: maximum edge length
+    :returns: integer array (n, )
+    """
+    return block_degrees(
+        num_points_from_size(len(condensed)),
+        iter_condensed_blocks(condensed, block_size), threshold)
+
+
+def clustering_coefficient(distance_row, distances_among, threshold, degree,
+                           seed=0):
+    """Estimate fraction of neighbour pairs that are neighbours themselves.
+
+    Samples CLUSTERING_SAMPLES points (weighted by number of neighbour
+    pairs) and up to CLUSTERING_NEIGHBOURS neighbours of each.
+
+    :param distance_row: function returning distances from point i to all
+        points
+    :param distances_among: function returning the condensed distance
+        matrix of a sorted array of points
+    :param degree: number of neighbours of each point (see ``degrees``)
+    :returns: clustering coefficient (1 if there are no neighbour pairs)
+    """
+    pairs = degree * (degree - 1) / 2.
+    if not pairs.sum():
+        return 1.
+
+    random = np.random.RandomState(seed)
+    sample = random.choice(
+        len(degree), CLUSTERING_SAMPLES, p=pairs / pairs.sum())
+
+    connected = 0.
+    total = 0.
+    for index in sample:
+        row = distance_row(index)
+        row[index] = np.inf
+        neighbours = np.flatnonzero(row <= threshold)
+        if len(neighbours) > CLUSTERING_NEIGHBOURS:
+            neighbours = np.sort(
+                random.choice(neighbours, CLUSTERING_NEIGHBOURS,
+                              replace=False))
+        distances = distances_among(neighbours)
+        connected += np.sum(distances <= threshold)
+        total += len(distances)
+
+    return connected / total
+
+
+def simplex_counts(degree, clustering, max_dimension):
+    """Estimate number of simplices of each dimension.
+
+    :param degree: number of neighbours of each point
+    :param clustering: clustering coefficient
+    :param max_dimension: maximum simplex dimension (cpx-dimension)
+    :returns: list of estimated counts for dimensions 0..max_dimension
+    """
+    histogram = np.bincount(degree).astype(np.float64)
+    values = np.arange(len(histogram), dtype=np.float64)
+
+    counts = [float(len(degree))]
+    binomial = np.ones_like(values)
+    for k in range(1, max_dimension + 1):
+        # binom(d, k) = binom(d, k-1) (d - k + 1) / k
+        binomial *= np.maximum(values - k + 1, 0) / k
+        counts.append(
+            np.dot(histogram, binomial) * clustering**(k - 1) /
+            (k + 1))
+    return counts
+
+
+def _resources(num_points, degree, clustering, cpx_dimension):
+    """Estimated size, memory and runtime from the neighbour graph."""
+    simplices = simplex_counts(degree, clustering, cpx_dimension)
+    total = sum(simplices)
+    # GUDHI reads the dense matrix, whatever the input of the calculation
+    entries = condensed_size(num_points)
+
+    return {
+        'num_points': num_points,
+        'num_edges': int(degree.sum() // 2),
+        'clustering': float(clustering),
+        'simplices': [float(n) for n in simplices],
+        'memory_bytes': float(BASE_BYTES + BYTES_PER_ENTRY * entries +
+                              BYTES_PER_SIMPLEX * total),
+        'seconds': float(SECONDS_PER_ENTRY * entries +
+                         SECONDS_PER_SIMPLEX * total),
+    }
+
+
+def estimate_resources(condensed, max_edge_length, cpx_dimension=3):
+    """Estimate size, memory and runtime of Rips persistence calculation.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param max_edge_length: maximum edge length of the filtration
+    :param cpx_dimension: maximum simplex dimension
+    :returns: dict with 'num_points', 'num_edges', 'clustering',
+        'simplices' (per dimension), 'memory_bytes' and 'seconds'
+    """
+    degree = degrees(condensed, max_edge_length)
+    clustering = clustering_coefficient(
+        partial(condensed_row, condensed), partial(sub_matrix, condensed),
+        max_edge_length, degree)
+    return _resources(len(degree), degree, clustering, cpx_dimension)
+
+
+def estimate_point_cloud(positions, max_edge_length, cpx_dimension=3,
+                         cell=None):
+    """Estimate resources of Rips calculation on a point cloud.
+
+    Distances are computed block by block, the dense matrix is never held
+    in memory.
+
+    :param positions: array of point coordinates (n, d)
+    :param cell: array of cell vectors for periodic systems (optional)
+    :returns: dict as returned by estimate_resources
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+
+    def distances_among(indices):
+        blocks = iter_distance_blocks(positions[indices], cell=cell)
+        return np.concatenate([np.empty(0)] +
+                              [values for _start, _stop, values in blocks])
+
+    degree = block_degrees(
+        len(positions), iter_distance_blocks(positions, cell=cell),
+        max_edge_length)
+    clustering = clustering_coefficient(
+        partial(point_cloud_row, positions, cell=cell), distances_among,
+        max_edge_length, degree)
+    return _resources(len(positions), degree, clustering, cpx_dimension)
+
+
+def estimate_edge_list(num_points, indices, lengths, max_edge_length,
+                       cpx_dimension=3):
+    """Estimate resources of Rips calculation on a sparse edge list.
+
+    :param num_points: number of points
+    :param indices: sorted condensed indices of the edges
+    :param lengths: edge lengths (complete up to max_edge_length)
+    :returns: dict as returned by estimate_resources
+    """
+    indices = np.asarray(indices)
+    lengths = np.asarray(lengths)
+    edges = indices[lengths <= max_edge_length]
+    rows, cols = condensed_to_pairs(edges)
+    degree = np.bincount(rows, minlength=num_points) + \
+        np.bincount(cols, minlength=num_points)
+
+    # neighbours of each point (both directions), grouped by point
+    ends = np.concatenate((rows, cols))
+    order = np.argsort(ends, kind='stable')
+    others = np.concatenate((cols, rows))[order]
+    starts = np.concatenate(([0], np.cumsum(degree)))
+
+    def distance_row(index):
+        row = np.full(num_points, np.inf)
+        row[others[starts[index]:starts[index + 1]]] = max_edge_length
+        return row
+
+    def distances_among(points):
+        # pairs that are edges count as within max_edge_length
+        pair_rows, pair_cols = np.tril_indices(len(points), -1)
+        wanted = row_offset(points[pair_rows]) + points[pair_cols]
+        found = np.minimum(np.searchsorted(edges, wanted), len(edges) - 1)
+        return np.where(edges[found] == wanted, max_edge_length, np.inf)
+
+    clustering = clustering_coefficient(distance_row, distances_among,
+                                        max_edge_length, degree)
+    return _resources(num_points, degree, clustering, cpx_dimension)
+
+
+def estimate_input(node, max_edge_length, cpx_dimension=3):
+    """Estimate resources of Rips calculation from its input node.
+
+    :param node: distance_matrix input (SinglefileData, DistanceMatrixData
+        or EdgeListData) or point_cloud input (ArrayData)
+    :returns: dict as returned by estimate_resources
+    """
+    from aiida.orm import DataFactory
+    from aiida_gudhi.calculations.h0 import get_condensed
+    ArrayData = DataFactory('array')
+    SinglefileData = DataFactory('singlefile')
+    DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+    EdgeListData = DataFactory('gudhi.edge_list')
+
+    if isinstance(node, EdgeListData):
+        return estimate_edge_list(node.num_points, node.get_array('indices'),
+                                  node.get_array('lengths'), max_edge_length,
+                                  cpx_dimension)
+    elif isinstance(node, (SinglefileData, DistanceMatrixData)):
+        return estimate_resources(
+            get_condensed(node), max_edge_length, cpx_dimension)
+    elif isinstance(node, ArrayData):
+        cell = None
+        if 'cell' in node.get_arraynames():
+            cell = node.get_array('cell')
+        return estimate_point_cloud(
+            node.get_array('positions'), max_edge_length, cpx_dimension,
+            cell=cell)
+    raise ValueError("Cannot estimate resources for input of type {}".format(
+        type(node)))
+
+
+def calculation_options(estimate, safety=2.0, min_seconds=60):
+    """Scheduler options for estimated calculation.
+
+    GUDHI runs serially, so a single process is requested.
+
+    :param estimate: dict returned by estimate_resources
+    :param safety: factor applied to estimated memory and runtime
+    :param min_seconds: lower bound of wallclock time
+    :returns: dict with 'resources', 'max_wallclock_seconds' and
+        'max_memory_kb'
+    """
+    return {
+        'resources': {
+            'num_machines': 1,
+            'num_mpiprocs_per_machine': 1
+        },
+        'max_wallclock_seconds':
+        int(max(min_seconds, safety * estimate['seconds'])),
+        'max_memory_kb':
+        int(safety * estimate['memory_bytes'] / 1024),
+    }
+
+
+def size_calculation(calc, safety=2.0, min_seconds=60):
+    """Set resources, wallclock time and memory of a Rips calculation.
+
+    :param calc: unstored RipsDistanceMatrixCalculation with parameters and
+        distance_matrix or point_cloud inputs
+    :returns: dict returned by estimate_resources
+    """
+    inputs = calc.get_inputs_dict()
+    parameters = inputs['parameters'].validate(inputs['parameters'].get_dict())
+    for linkname in ['distance_matrix', 'point_cloud']:
+        if linkname in inputs:
+            estimate = estimate_input(inputs[linkname],
+                                      parameters['max-edge-length'],
+                                      parameters['cpx-dimension'])
+            break
+    else:
+        raise ValueError(
+            "Resources can only be estimated for calculations with a "
+            "distance_matrix or point_cloud input")
+
+    options = calculation_options(estimate, safety, min_seconds)
+    calc.set_resources(options['resources'])
+    calc.set_max_wallclock_seconds(options['max_wallclock_seconds'])
+    calc.set_max_memory_kb(options['max_memory_kb'])
+
+    return estimate
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk export of barcodes into a columnar dataset
+
+A dataset is a directory with a ``manifest.json`` and chunks of columns::
+
+    structure_id  int32    index into manifest['entries']
+    dim           int8     homology dimension
+    birth         float64
+    death         float64
+
+Each export appends chunks holding the barcodes not yet exported. Chunks
+are stored as .npy files (memory-mappable) or as compressed .npz files
+(read into memory when loaded).
+
+Usage::
+
+    export_barcodes('campaign', group_barcode_sources('screening'), n_jobs=8)
+    data = load_dataset('campaign')  # dict of columns
+"""
+import os
+import json
+import tempfile
+import numpy as np
+from aiida_gudhi.parsers.barcode import read_barcode
+
+#: Columns of dataset and their types
+COLUMNS = [
+    ('structure_id', np.int32),
+    ('dim', np.int8),
+    ('birth', np.float64),
+    ('death', np.float64),
+]
+
+MANIFEST = 'manifest.json'
+
+#: Default number of barcodes per chunk written by export_barcodes
+CHUNK_SIZE = 10000
+
+
+def _is_node(source):
+    return hasattr(source, 'get_barcode')
+
+
+def barcode_source(node):
+    """Barcode behind node, as file path or BarcodeData.
+
+    :param node: RipsDistanceMatrixCalculation, BarcodeData or
+        SinglefileData (barcode file)
+    :returns: tuple (uuid of node, str path or BarcodeData)
+    """
+    from aiida.orm import DataFactory
+    from aiida.orm.calculation.job import JobCalculation
+    SinglefileData = DataFactory('singlefile')
+    BarcodeData = DataFactory('gudhi.barcode')
+
+    if isinstance(node, JobCalculation):
+        outputs = node.get_outputs_dict()
+        link = node.inp.parameters.output_links[0]
+        if link not in outputs:
+            raise ValueError("Calculation {} has no output '{}'".format(
+                node.pk, link))
+        node_source = outputs[link]
+    else:
+        node_source = node
+
+    if isinstance(node_source, BarcodeData):
+        return node.uuid, node_source
+    elif isinstance(node_source, SinglefileData):
+        return node.uuid, str(node_source.get_file_abs_path())
+    raise ValueError("No barcode found for node {}".format(node.pk))
+
+
+def group_barcode_sources(group_name):
+    """Barcode sources of all nodes in group (see barcode_source)."""
+    from aiida.orm import Group
+    group = Group.get_from_string(group_name)
+    return [barcode_source(node) for node in group.nodes]
+
+
+def _load_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), 'r') as handle:
+            return json.load(handle)
+    except (IOError, OSError):
+        return {'entries': [], 'chunks': [], 'next_chunk': 0}
+
+
+def _new_chunk(manifest):
+    """Name of a new chunk."""
+    name = 'chunk_{:05d}'.format(manifest['next_chunk'])
+    manifest['next_chunk'] += 1
+    return name
+
+
+def _save_manifest(path, manifest):
+    """Write manifest atomically (after the chunk files)."""
+    handle, tmp = tempfile.mkstemp(dir=path)
+    with os.fdopen(handle, 'w') as tmp_handle:
+        json.dump(manifest, tmp_handle)
+    os.rename(tmp, os.path.join(path, MANIFEST))
+
+
+def _write_chunk(path, manifest, new, barcodes, compress):
+    """Write barcodes of new sources as one chunk and update manifest."""
+    first_id = len(manifest['entries'])
+    lengths = [len(b) for b in barcodes]
+    columns = {
+        'structure_id':
+        np.repeat(np.arange(first_id, first_id + len(new)), lengths),
+    }
+    stacked = np.concatenate(barcodes)
+    for name in ['dim', 'birth', 'death']:
+        columns[name] = stacked[name]
+    columns = {
+        name: columns[name].astype(dtype, copy=False)
+        for name, dtype in COLUMNS
+    }
+
+    chunk = _new_chunk(manifest)
+    if compress:
+        np.savez_compressed(os.path.join(path, chunk + '.npz'), **columns)
+    else:
+        os.makedirs(os.path.join(path, chunk))
+        for name, values in columns.items():
+            np.save(os.path.join(path, chunk, name + '.npy'), values)
+
+    manifest['chunks'].append({
+        'name': chunk,
+        'rows': int(sum(lengths)),
+        'compressed': compress,
+    })
+    manifest['entries'] += [{'uuid': uuid} for uuid, _source in new]
+    _save_manifest(path, manifest)
+
+
+def export_barcodes(path,
+                    sources,
+                    compress=False,
+                    n_jobs=1,
+                    chunk_size=CHUNK_SIZE):
+    """Append barcodes to columnar dataset.
+
+    Sources whose uuid is already in the dataset are skipped. New sources
+    are parsed and written in groups of ``chunk_size``, one chunk per group,
+    so only one group of barcodes is held in memory at a time.
+
+    Compressed chunks (.npz) cannot be memory-mapped: iter_chunks and
+    load_dataset read them into memory. Use consolidate to turn a dataset
+    into a single memory-mappable chunk.
+
+    :param path: dataset directory (created if needed)
+    :param sources: list of (uuid, source) tuples, where source is a path to
+        a GUDHI barcode file or a BarcodeData node (see barcode_source)
+    :param compress: store chunks as compressed .npz instead of .npy
+    :param n_jobs: number of processes parsing barcode files
+    :param chunk_size: number of barcodes per chunk
+    :returns: number of exported barcodes
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    manifest = _load_manifest(path)
+
+    exported = set(entry['uuid'] for entry in manifest['entries'])
+    new = [(uuid, source) for uuid, source in sources
+           if uuid not in exported]
+    if not new:
+        return 0
+
+    if n_jobs != 1:
+        from multiprocessing import Pool
+        pool = Pool(n_jobs)
+
+    try:
+        for start in range(0, len(new), chunk_size):
+            group = new[start:start + chunk_size]
+            files = [
+                source for _uuid, source in group if not _is_node(source)
+            ]
+            if n_jobs == 1:
+                parsed = (read_barcode(f) for f in files)
+            else:
+                parsed = pool.imap(read_barcode, files)
+            barcodes = [
+                source.get_barcode() if _is_node(source) else next(parsed)
+                for _uuid, source in group
+            ]
+            _write_chunk(path, manifest, group, barcodes, compress)
+    finally:
+        if n_jobs != 1:
+            pool.close()
+            pool.join()
+
+    return len(new)
+
+
+def iter_chunks(path, mmap_mode='r'):
+    """Iterate over chunks of dataset.
+
+    :param mmap_mode: memory-map uncompressed chunks (None to read them)
+    :returns: generator of dicts of columns
+    """
+    manifest = _load_manifest(path)
+    for chunk in manifest['chunks']:
+        if chunk['compressed']:
+            with np.load(os.path.join(path, chunk['name'] + '.npz')) as data:
+                yield {name: data[name] for name, _dtype in COLUMNS}
+        else:
+            yield {
+                name: np.load(
+                    os.path.join(path, chunk['name'], name + '.npy'),
+                    mmap_mode=mmap_mode)
+                for name, _dtype in COLUMNS
+            }
+
+
+def load_dataset(path, mmap_mode='r'):
+    """Load all columns of dataset.
+
+    A dataset consisting of a single uncompressed chunk (see consolidate)
+    is memory-mapped without copying.
+
+    :returns: dict of columns, with 'uuid' array of exported nodes indexed
+        by structure_id
+    """
+    chunks = list(iter_chunks(path, mmap_mode))
+    if len(chunks) == 1:
+        columns = chunks[0]
+    else:
+        columns = {
+            name: np.concatenate([c[name] for c in chunks]) if chunks else
+            np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS
+        }
+
+    columns['uuid'] = np.array(
+        [entry['uuid'] for entry in _load_manifest(path)['entries']])
+    return columns
+
+
+def consolidate(path):
+    """Merge all chunks of dataset into one uncompressed chunk."""
+    import shutil
+
+    manifest = _load_manifest(path)
+    if len(manifest['chunks']) < 2 and not any(
+            c['compressed'] for c in manifest['chunks']):
+        return
+
+    chunk = _new_chunk(manifest)
+    os.makedirs(os.path.join(path, chunk))
+    chunks = list(iter_chunks(path))
+    for name, dtype in COLUMNS:
+        # written column by column into a memory map
+        rows = sum(len(c[name]) for c in chunks)
+        out = np.lib.format.open_memmap(
+            os.path.join(path, chunk, name + '.npy'),
+            mode='w+',
+            dtype=dtype,
+            shape=(rows, ))
+        start = 0
+        for columns in chunks:
+            out[start:start + len(columns[name])] = columns[name]
+            start += len(columns[name])
+        out.flush()
+        del out
+
+    old = manifest['chunks']
+    manifest['chunks'] = [{
+        'name': chunk,
+        'rows': sum(c['rows'] for c in old),
+        'compressed': False,
+    }]
+    _save_manifest(path, manifest)
+
+    for c in old:
+        if c['compressed']:
+            os.remove(os.path.join(path, c['name'] + '.npz'))
+        else:
+            shutil.rmtree(os.path.join(path, c['name']))
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Fingerprint index of barcodes for near-duplicate detection
+
+The fingerprint of a barcode is a binned persistence histogram: for each
+homology dimension, the log-counts of intervals on a grid of (birth,
+persistence). Fingerprints are hashed with p-stable locality-sensitive
+hashing [1]: nearby fingerprints share buckets with high probability, so
+nearest-neighbour queries only compare against a few candidates.
+
+The index also maps cache keys of distance matrix and Rips parameters (see
+aiida_gudhi.cache) to barcodes, to skip exact duplicates before submission.
+
+[1] M. Datar et al., Proc. 20th Symp. Comput. Geom., 253 (2004)
+
+Usage::
+
+    index = FingerprintIndex(max_value=10.0)
+    index.add(barcode_node, distance_matrices=matrix, parameters=params)
+    index.nearest(other_barcode_node, k=5)  # [(uuid, distance), ...]
+    index.find_duplicate(new_matrix, params)  # uuid of barcode or None
+"""
+import os
+import json
+import tempfile
+import numpy as np
+
+#: Extra of a BarcodeData node holding its fingerprint and settings
+FINGERPRINT_EXTRA = 'gudhi_fingerprint'
+
+
+def persistence_histogram(data, max_value, dimensions=(0, 1, 2), bins=8):
+    """Binned persistence histogram of barcode.
+
+    Births and persistences are binned on [0, max_value]; larger values
+    (including infinite deaths) go to the last bin.
+
+    :param data: numpy array of dtype BARCODE_DTYPE
+    :param max_value: upper end of bins (e.g. max-edge-length)
+    :param dimensions: homology dimensions included
+    :param bins: number of bins per axis
+    :returns: float array (len(dimensions) * bins**2, ) of log(1 + counts)
+    """
+    edges = np.linspace(0, max_value, bins + 1)
+    edges[-1] = np.inf
+
+    histograms = []
+    for dim in dimensions:
+        intervals = data[data['dim'] == dim]
+        births = np.minimum(intervals['birth'], max_value)
+        persistence = np.minimum(intervals['death'] - intervals['birth'],
+                                 max_value)
+        counts, _x, _y = np.histogram2d(
+            births, persistence, bins=[edges, edges])
+        histograms.append(counts.ravel())
+
+    return np.log1p(np.concatenate(histograms))
+
+
+class LSHTables(object):
+    """
+    p-stable locality-sensitive hash tables for Euclidean distance.
+
+    Each of ``num_tables`` tables hashes a vector v to the tuple of
+    ``num_hashes`` values floor((a.v + b) / width) with Gaussian a and
+    uniform b, combined into one integer key.
+    """
+
+    def __init__(self,
+                 num_features,
+                 num_tables=8,
+                 num_hashes=4,
+                 width=4.0,
+                 seed=0):
+        random = np.random.RandomState(seed)
+        self.projections = random.normal(
+            size=(num_tables, num_hashes, num_features))
+        self.offsets = random.uniform(0, width, size=(num_tables, num_hashes))
+        self.width = width
+        # odd multipliers combining the hashes of a table into one key
+        self.multipliers = random.randint(
+            1, 2**30, size=num_hashes).astype(np.int64) * 2 + 1
+        self.buckets = [{} for _table in range(num_tables)]
+
+    def keys(self, vectors):
+        """Bucket keys of vectors.
+
+        :param vectors: array (n, num_features)
+        :returns: integer array (n, num_tables)
+        """
+        hashes = np.floor(
+            (np.einsum('thf,nf->nth', self.projections, vectors) +
+             self.offsets[None]) / self.width).astype(np.int64)
+        return np.dot(hashes, self.multipliers)
+
+    def add(self, ids, vectors):
+        """Add vectors with given ids to the tables."""
+        for ident, keys in zip(ids, self.keys(vectors)):
+            for table, key in zip(self.buckets, keys):
+                table.setdefault(int(key), []).append(ident)
+
+    def candidates(self, vector):
+        """Ids sharing a bucket with vector in at least one table."""
+        found = set()
+        for table, key in zip(self.buckets, self.keys(vector[None])[0]):
+            found.update(table.get(int(key), []))
+        return found
+
+
+class FingerprintIndex(object):
+    """
+    Persistent index of barcode fingerprints.
+
+    The index lives in a directory containing an ``index.json`` (node uuids,
+    cache keys of their inputs and fingerprint settings) and a ``features.npy``
+    with the fingerprints. Hash tables are rebuilt when the index is opened.
+    """
+
+    def __init__(self,
+                 path=None,
+                 max_value=10.0,
+                 dimensions=(0, 1, 2),
+                 bins=8,
+                 **lsh_options):
+        """
+        :param path: index directory (default: gudhi_fingerprints in the
+            AiiDA configuration folder)
+        :param max_value: upper end of histogram bins
+        :param dimensions: homology dimensions included in fingerprints
+        :param bins: number of histogram bins per axis
+        :param lsh_options: passed on to LSHTables
+        """
+        if path is None:
+            from aiida.common.setup import AIIDA_CONFIG_FOLDER
+            path = os.path.join(
+                os.path.expanduser(AIIDA_CONFIG_FOLDER), 'gudhi_fingerprints')
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.path = path
+
+        config = {
+            'max_value': max_value,
+            'dimensions': list(dimensions),
+            'bins': bins,
+        }
+        self._index = self._load(config)
+        if self._index['config'] != config:
+            raise ValueError(
+                "Index at {} uses fingerprint settings {}".format(
+                    path, self._index['config']))
+
+        self.features = self._load_features()
+        self.tables = LSHTables(
+            len(dimensions) * bins**2, **lsh_options)
+        self.tables.add(range(len(self.features)), self.features)
+
+    @property
+    def _index_file(self):
+        return os.path.join(self.path, 'index.json')
+
+    @property
+    def _features_file(self):
+        return os.path.join(self.path, 'features.npy')
+
+    def _load(self, config):
+        try:
+            with open(self._index_file, 'r') as handle:
+                return json.load(handle)
+        except (IOError, OSError):
+            return {'config': config, 'uuids': [], 'input_keys': {}}
+
+    def _load_features(self):
+        if os.path.exists(self._features_file):
+            return np.load(self._features_file)
+        config = self._index['config']
+        return np.empty((0, len(config['dimensions']) * config['bins']**2))
+
+    def _save(self):
+        """Write index and features to disk atomically."""
+        for filename, write in [
+            (self._features_file, lambda h: np.save(h, self.features)),
+            (self._index_file, lambda h: h.write(
+                json.dumps(self._index).encode('utf-8'))),
+        ]:
+            handle, tmp = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(handle, 'wb') as tmp_handle:
+                write(tmp_handle)
+            os.rename(tmp, filename)
+
+    def __len__(self):
+        return len(self._index['uuids'])
+
+    def fingerprint(self, barcode):
+        """Fingerprint of barcode.
+
+        :param barcode: BarcodeData or numpy array of dtype BARCODE_DTYPE
+        """
+        if not isinstance(barcode, np.ndarray):
+            barcode = barcode.get_barcode()
+        config = self._index['config']
+        return persistence_histogram(barcode, config['max_value'],
+                                     config['dimensions'], config['bins'])
+
+    def add(self, barcodes, distance_matrices=None, parameters=None):
+        """Add stored BarcodeData nodes to the index.
+
+        The fingerprint (with the settings needed to compare it) is stored
+        in the FINGERPRINT_EXTRA extra of each node.
+
+        :param barcodes: BarcodeData node or list of nodes
+        :param distance_matrices: corresponding input distance matrices
+            (optional), for use with find_duplicate
+        :param parameters: RipsDistanceMatrixParameters used for the
+            barcodes (one node for all or a list; required with
+            distance_matrices)
+        """
+        from aiida_gudhi.cache import cache_key
+
+        if not isinstance(barcodes, (list, tuple)):
+            barcodes = [barcodes]
+            if distance_matrices is not None:
+                distance_matrices = [distance_matrices]
+        if distance_matrices is not None:
+            if parameters is None:
+                raise ValueError(
+                    "parameters are required with distance_matrices")
+            if not isinstance(parameters, (list, tuple)):
+                parameters = [parameters] * len(barcodes)
+
+        features = np.array([self.fingerprint(b) for b in barcodes])
+        ids = range(len(self.features), len(self.features) + len(barcodes))
+        self.features = np.concatenate((self.features, features))
+        self.tables.add(ids, features)
+
+        for barcode, vector in zip(barcodes, features):
+            self._index['uuids'].append(barcode.uuid)
+            barcode.set_extra(FINGERPRINT_EXTRA, {
+                'histogram': vector.tolist(),
+                'config': self._index['config'],
+            })
+
+        for barcode, matrix, matrix_parameters in zip(
+                barcodes, distance_matrices or [], parameters or []):
+            key = cache_key(matrix, matrix_parameters)
+            if key is not None:
+                self._index['input_keys'][key] = barcode.uuid
+
+        self._save()
+
+    def nearest(self, barcode, k=10):
+        """Barcodes with fingerprints closest to that of barcode.
+
+        Only candidates sharing an LSH bucket are compared, so neighbours
+        may be missed (with low probability).
+
+        :param barcode: BarcodeData or numpy array of dtype BARCODE_DTYPE
+        :returns: list of up to k tuples (uuid, fingerprint distance)
+        """
+        vector = self.fingerprint(barcode)
+        candidates = np.array(sorted(self.tables.candidates(vector)),
+                              dtype=np.int64)
+        if not len(candidates):
+            return []
+
+        distances = np.linalg.norm(self.features[candidates] - vector, axis=1)
+        order = np.argsort(distances, kind='stable')[:k]
+        return [(self._index['uuids'][candidates[i]], float(distances[i]))
+                for i in order]
+
+    def find_duplicate(self, distance_matrix, parameters):
+        """Look up barcode computed from identical inputs.
+
+        :param distance_matrix: node providing the distance matrix
+        :param parameters: RipsDistanceMatrixParameters
+        :returns: uuid of BarcodeData or None
+        """
+        from aiida_gudhi.cache import cache_key
+
+        key = cache_key(distance_matrix, parameters)
+        if key is None:
+            return None
+        return self._index['input_keys'].get(key)
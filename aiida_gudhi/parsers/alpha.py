@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from aiida.orm import CalculationFactory
+from aiida_gudhi.parsers.rips import RipsParser
+
+AlphaComplexCalculation = CalculationFactory('gudhi.alpha')
+
+
+class AlphaComplexParser(RipsParser):
+    """
+    Parser class for parsing alpha complex.
+
+    Output nodes are the same as for the rips complex. Without
+    'max-alpha-square', the threshold of the barcode is its largest finite
+    filtration value.
+    """
+
+    _calculation_class = AlphaComplexCalculation
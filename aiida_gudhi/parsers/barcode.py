@@ -1,8 +1,109 @@
 # -*- coding: utf-8 -*-
+import warnings
 import numpy as np
+from aiida_gudhi.compression import open_compressed
+# pylint: disable=unused-import
+from aiida_gudhi.summary import (BARCODE_DTYPE, SUMMARY_GRID_POINTS,
+                                 persistence_entropy, betti_numbers,
+                                 summarize_barcode)
+
+#: Number of barcode lines per chunk in iter_barcode
+CHUNK_SIZE = 2**20
+
+
+def read_barcode(filename):
+    """Read barcode file produced by GUDHI.
+
+    Parsing is done by the C reader of ``np.loadtxt``, which streams the file
+    in blocks straight into a structured array (no intermediate lists of
+    Python objects as in ``np.genfromtxt``).
+    Compressed files (gzip, zstd) are decompressed on the fly.
+
+    :param filename: path to barcode file
+    :returns: numpy array of dtype BARCODE_DTYPE
+    """
+    with open_compressed(filename) as handle, warnings.catch_warnings():
+        # loadtxt warns on empty files
+        warnings.simplefilter('ignore', UserWarning)
+        return np.loadtxt(handle, dtype=BARCODE_DTYPE, ndmin=1)
+
+
+def iter_barcode(filename, chunk_size=CHUNK_SIZE):
+    """Iterate over barcode file in chunks of bounded size.
+
+    :param filename: path to (possibly compressed) barcode file
+    :param chunk_size: number of lines per chunk
+    :returns: generator of numpy arrays of dtype BARCODE_DTYPE
+    """
+    with open_compressed(filename) as handle, warnings.catch_warnings():
+        # loadtxt warns when reaching the end of the file
+        warnings.simplefilter('ignore', UserWarning)
+        while True:
+            chunk = np.loadtxt(
+                handle, dtype=BARCODE_DTYPE, max_rows=chunk_size, ndmin=1)
+            if not chunk.size:
+                break
+            yield chunk
+
+
+def write_barcode(handle, data):
+    """Write barcode in the text format of GUDHI.
+
+    :param handle: writable file handle
+    :param data: numpy array of dtype BARCODE_DTYPE
+    """
+    template = '%d  %d %.6g %.6g \n' * len(data)
+    values = np.column_stack((data['field'], data['dim'], data['birth'],
+                              data['death'])).ravel()
+    handle.write(template % tuple(values.tolist()))
+
+
+def truncate_barcode(data, threshold):
+    """Barcode of the filtration truncated at given threshold.
+
+    For a Rips filtration computed up to T >= threshold, this is exactly the
+    barcode computed up to threshold: intervals born after the threshold
+    are dropped and deaths after the threshold become infinite.
+
+    :param data: numpy array of dtype BARCODE_DTYPE
+    :param threshold: filtration value (e.g. max-edge-length)
+    :returns: numpy array of dtype BARCODE_DTYPE
+    """
+    return sweep_barcode(data, [threshold])[0]
+
+
+def sweep_barcode(data, thresholds):
+    """Barcodes of the filtration truncated at several thresholds.
+
+    Intervals are sorted by birth once, then each truncated barcode is
+    a slice up to the threshold (see truncate_barcode).
+
+    :param data: numpy array of dtype BARCODE_DTYPE
+    :param thresholds: list of filtration values
+    :returns: list of numpy arrays of dtype BARCODE_DTYPE
+    """
+    order = np.argsort(data['birth'], kind='stable')
+    by_birth = data[order]
+    stops = np.searchsorted(by_birth['birth'], thresholds, side='right')
+
+    barcodes = []
+    for threshold, stop in zip(thresholds, stops):
+        barcode = by_birth[:stop].copy()
+        barcode['death'][barcode['death'] > threshold] = np.inf
+        barcodes.append(barcode)
+
+    return barcodes
 
 
 class BarcodeParser(object):
+    """
+    Barcode read from GUDHI output, with an index per homology dimension.
+
+    On setting ``data``, intervals are grouped by dimension (keeping their
+    order) and sorted births, deaths and lifetimes of each dimension are
+    computed once. Queries then cost O((n + g) log n) for g query values.
+    """
+
     def __init__(self, filename=None, max_life=None):
         self.filename = filename
         self.max_life = max_life
@@ -14,21 +115,117 @@ class BarcodeParser(object):
 
     @classmethod
     def parse(cls, filename, max_life=None):
-        """ Parse barcode from gudhi output. """
-        data = np.genfromtxt(filename)
-        #data = np.genfromtxt(filename, dtype= (int, int, float, float))
+        """ Parse barcode from gudhi output.
+
+        :returns: numpy array of dtype BARCODE_DTYPE
+        """
+        data = read_barcode(filename)
 
         if max_life is not None:
-            data[np.isinf(data)] = max_life
+            data['death'][np.isinf(data['death'])] = max_life
 
         return data
 
+    @property
+    def data(self):
+        """Barcode as numpy array of dtype BARCODE_DTYPE."""
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._index = None if data is None else self._build_index(data)
+
+    @staticmethod
+    def _index_intervals(intervals):
+        """Index of the intervals of one dimension.
+
+        :returns: dict with 'intervals', sorted 'births', 'deaths' and
+            'lifetimes', and 'by_lifetime' (argsort of lifetimes)
+        """
+        lifetimes = intervals['death'] - intervals['birth']
+        by_lifetime = np.argsort(lifetimes, kind='stable')
+        return {
+            'intervals': intervals,
+            'births': np.sort(intervals['birth']),
+            'deaths': np.sort(intervals['death']),
+            'lifetimes': lifetimes[by_lifetime],
+            'by_lifetime': by_lifetime,
+        }
+
+    @classmethod
+    def _build_index(cls, data):
+        """Group intervals by dimension (keeping their order) and index them.
+
+        :returns: dictionary {dimension: index of intervals}
+        """
+        order = np.argsort(data['dim'], kind='stable')
+        grouped = data[order]
+        dimensions, starts = np.unique(grouped['dim'], return_index=True)
+        stops = list(starts[1:]) + [len(grouped)]
+
+        return {
+            int(dim): cls._index_intervals(grouped[start:stop])
+            for dim, start, stop in zip(dimensions, starts, stops)
+        }
+
+    def _get_index(self, dimension):
+        """Index of dimension (empty for dimensions without intervals)."""
+        if self._index is None:
+            raise ValueError("no barcode loaded")
+        try:
+            return self._index[dimension]
+        except KeyError:
+            return self._index_intervals(np.empty(0, dtype=BARCODE_DTYPE))
+
     def dimensions(self):
-        return np.unique(self.data[:, 1])
+        if self._index is None:
+            raise ValueError("no barcode loaded")
+        return np.array(sorted(self._index), dtype=np.int32)
 
     def get_life_lines(self, dimension):
-        indices = np.where(self.data[:, 1] == dimension)[0]
-        return self.data[indices, 2:4]
+        data = self._get_index(dimension)['intervals']
+        return np.column_stack((data['birth'], data['death']))
+
+    def betti_curve(self, dimension, grid):
+        """Betti numbers of dimension at each value of grid.
+
+        :param grid: array of filtration values
+        :returns: integer array of same length as grid
+        """
+        index = self._get_index(dimension)
+        return betti_numbers(index['births'], index['deaths'], grid)
+
+    def betti_curves(self, grid):
+        """Betti curves of all dimensions.
+
+        :param grid: array of filtration values
+        :returns: integer array (number of dimensions, len(grid)), rows
+            ordered as ``dimensions()``
+        """
+        return np.array([self.betti_curve(d, grid) for d in self.dimensions()])
+
+    def count_intervals(self, dimension, min_persistence=0.):
+        """Number of intervals of dimension living longer than given value.
+
+        :param min_persistence: lifetime or array of lifetimes
+        :returns: integer or integer array (for array of lifetimes)
+        """
+        lifetimes = self._get_index(dimension)['lifetimes']
+        return len(lifetimes) - np.searchsorted(
+            lifetimes, min_persistence, side='right')
+
+    def top_persistent(self, dimension, k):
+        """Life lines of the k most persistent intervals of dimension.
+
+        :returns: array (min(k, n), 2) of births and deaths, ordered by
+            decreasing lifetime
+        """
+        index = self._get_index(dimension)
+        if k <= 0:
+            return np.empty((0, 2))
+        top = index['intervals'][index['by_lifetime'][::-1][:k]]
+        return np.column_stack((top['birth'], top['death']))
 
     def plot(self, dimension):
         """ Plot barcode using matplotlib. """
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from aiida.parsers.parser import Parser
+from aiida.parsers.exceptions import OutputParsingError
+
+from aiida.orm import CalculationFactory
+RipsBatchCalculation = CalculationFactory('gudhi.rdm_batch')
+
+
+class RipsBatchParser(Parser):
+    """
+    Parser class for parsing batched rips complexes.
+
+    Each entry gets its own outputs ``rips_complex_<label>`` (barcode file)
+    and ``rips_complex_<label>_barcode`` (BarcodeData).
+    """
+
+    def __init__(self, calculation):
+        """
+        Initialize Parser instance
+        """
+        super(RipsBatchParser, self).__init__(calculation)
+
+        # check for valid input
+        if not isinstance(calculation, RipsBatchCalculation):
+            raise OutputParsingError("Can only parse RipsBatchCalculation")
+
+    # pylint: disable=protected-access
+    def parse_with_retrieved(self, retrieved):
+        """
+        Parse output data folder, store results in database.
+
+        Entries whose barcode file is missing are reported and skipped.
+
+        :param retrieved: a dictionary of retrieved nodes, where
+          the key is the link name
+        :returns: a tuple with two values ``(bool, node_list)``,
+          where:
+
+          * ``bool``: variable to tell if the parsing succeeded
+          * ``node_list``: list of new nodes to be stored in the db
+            (as a list of tuples ``(link_name, node)``)
+        """
+        from aiida.orm.data.singlefile import SinglefileData
+        from aiida.orm.data.parameter import ParameterData
+        from aiida_gudhi.data.barcode import BarcodeData
+        from aiida_gudhi.parsers.barcode import read_barcode, summarize_barcode
+        from aiida_gudhi.summary import SUMMARY_TOP_K
+        node_list = []
+
+        # Check that the retrieved folder is there
+        try:
+            out_folder = retrieved['retrieved']
+        except KeyError:
+            self.logger.error("No retrieved folder found")
+            return False, node_list
+
+        list_of_files = out_folder.get_folder_list()
+        missing = []
+        for label in self._calc.get_labels():
+            fname = self._calc.output_file(label)
+            if fname not in list_of_files:
+                missing.append(label)
+                continue
+
+            path = out_folder.get_abs_path(fname)
+            link = 'rips_complex_{}'.format(label)
+            node_list.append((link, SinglefileData(file=path)))
+            data = read_barcode(path)
+            threshold = self._calc.get_parameters(label).get_dict()[
+                'max-edge-length']
+            barcode = BarcodeData(barcode=data)
+            barcode.set_threshold(threshold)
+            node_list.append(('{}_barcode'.format(link), barcode))
+            node_list.append(('{}_summary'.format(link),
+                              ParameterData(
+                                  dict=summarize_barcode(
+                                      data, threshold,
+                                      top_k=SUMMARY_TOP_K))))
+
+        if missing:
+            self.logger.error(
+                "No barcode found for entries {}".format(missing))
+
+        return not missing, node_list
@@ -11,6 +11,8 @@ class RipsParser(Parser):
     Parser class for parsing rips complex.
     """
 
+    _calculation_class = RipsDistanceMatrixCalculation
+
     def __init__(self, calculation):
         """
         Initialize Parser instance
@@ -18,9 +20,67 @@ class RipsParser(Parser):
         super(RipsParser, self).__init__(calculation)
 
         # check for valid input
-        if not isinstance(calculation, RipsDistanceMatrixCalculation):
-            raise OutputParsingError(
-                "Can only parse RipsDistanceMatrixCalculation")
+        if not isinstance(calculation, self._calculation_class):
+            raise OutputParsingError("Can only parse {}".format(
+                self._calculation_class.__name__))
+
+    def _get_settings(self):
+        """Return settings dictionary (empty, if no settings were given)."""
+        settings = self._calc.get_inputs_dict().get('settings')
+        if settings is None:
+            return {}
+        return settings.get_dict()
+
+    @staticmethod
+    def _barcode_nodes(path, link, parameters, settings):
+        """Output nodes of retrieved barcode file.
+
+        :returns: list of tuples (link name, node)
+        """
+        from aiida.orm.data.singlefile import SinglefileData
+        from aiida.orm.data.parameter import ParameterData
+        from aiida_gudhi.data.barcode import BarcodeData
+        from aiida_gudhi.parsers.barcode import (read_barcode, sweep_barcode,
+                                                 summarize_barcode)
+        from aiida_gudhi.summary import SUMMARY_TOP_K, finite_maximum
+        node_list = [(link, SinglefileData(file=path))]
+
+        data = read_barcode(path)
+        threshold = parameters.threshold
+        if threshold is None:
+            threshold = finite_maximum(data)
+        barcode = BarcodeData(barcode=data)
+        barcode.set_threshold(threshold)
+        node_list.append(('{}_barcode'.format(link), barcode))
+
+        # queryable statistics, no need to open the barcode later
+        summary = summarize_barcode(data, threshold,
+                                    settings.get('summary_grid'),
+                                    settings.get('summary_top_k',
+                                                 SUMMARY_TOP_K))
+        node_list.append(('{}_summary'.format(link),
+                          ParameterData(dict=summary)))
+
+        # barcodes at lower thresholds are truncations of this one
+        sweep = settings.get('threshold_sweep', [])
+        for i, truncated in enumerate(sweep_barcode(data, sweep)):
+            barcode = BarcodeData(barcode=truncated)
+            barcode.set_threshold(sweep[i])
+            node_list.append(('{}_sweep_{}'.format(link, i), barcode))
+
+        return node_list
+
+    @staticmethod
+    def _summary_nodes(path, link):
+        """Output nodes of summary file computed on the remote.
+
+        :returns: list of tuples (link name, node)
+        """
+        import json
+        from aiida.orm.data.parameter import ParameterData
+        with open(path) as handle:
+            summary = json.load(handle)
+        return [('{}_summary'.format(link), ParameterData(dict=summary))]
 
     # pylint: disable=protected-access
     def parse_with_retrieved(self, retrieved):
@@ -36,7 +96,8 @@ class RipsParser(Parser):
           * ``node_list``: list of new nodes to be stored in the db
             (as a list of tuples ``(link_name, node)``)
         """
-        from aiida.orm.data.singlefile import SinglefileData
+        from aiida_gudhi.compression import compressed_name
+        from aiida_gudhi.summary import summary_file_name
         success = False
         node_list = []
 
@@ -47,9 +108,21 @@ class RipsParser(Parser):
             self.logger.error("No retrieved folder found")
             return success, node_list
 
+        settings = self._get_settings()
+        summary_only = settings.get('retrieve') == 'summary'
+        outputs = []
+        for fname, link, parameters in self._calc.get_barcode_outputs():
+            if summary_only:
+                # barcode was reduced on the remote
+                fname = summary_file_name(fname)
+            else:
+                # barcode may have been compressed before retrieval
+                fname = compressed_name(fname, settings.get('compression'))
+            outputs.append((fname, link, parameters))
+
         # Check the folder content is as expected
         list_of_files = out_folder.get_folder_list()
-        output_files = self._calc.inp.parameters.output_files
+        output_files = [fname for fname, _link, _parameters in outputs]
         # Note: set(A) <= set(B) checks whether A is a subset
         if set(output_files) <= set(list_of_files):
             pass
@@ -59,11 +132,13 @@ class RipsParser(Parser):
                     output_files))
             return success, node_list
 
-        output_links = self._calc.inp.parameters.output_links
-        for fname, link in list(zip(output_files, output_links)):
-
-            parsed = SinglefileData(file=out_folder.get_abs_path(fname))
-            node_list.append((link, parsed))
+        for fname, link, parameters in outputs:
+            path = out_folder.get_abs_path(fname)
+            if summary_only:
+                node_list += self._summary_nodes(path, link)
+            else:
+                node_list += self._barcode_nodes(path, link, parameters,
+                                                 settings)
 
         success = True
         return success, node_list
@@ -2,9 +2,10 @@
 
 """
 import os
+import numpy as np
 import numpy.testing as npt
 import aiida_gudhi.tests as gt
-from aiida_gudhi.parsers.barcode import BarcodeParser
+from aiida_gudhi.parsers.barcode import BarcodeParser, BARCODE_DTYPE
 
 
 class TestBarcode(gt.PluginTestCase):
@@ -21,3 +22,101 @@ class TestBarcode(gt.PluginTestCase):
             parser.get_life_lines(1)[1], [4.06, max_life], decimal=2)
         npt.assert_almost_equal(
             parser.get_life_lines(2)[1], [4.02, max_life], decimal=2)
+
+    def test_no_barcode_loaded(self):
+
+        parser = BarcodeParser()
+        with self.assertRaises(ValueError):
+            parser.get_life_lines(0)
+        with self.assertRaises(ValueError):
+            parser.dimensions()
+
+    def test_barcode_dtype(self):
+
+        data = BarcodeParser.parse(
+            os.path.join(gt.TEST_DIR, 'sample.barcode'))
+
+        self.assertEqual(data.dtype, BARCODE_DTYPE)
+        self.assertEqual(len(data), 2352)
+        self.assertTrue((data['field'] == 11).all())
+        npt.assert_equal(np.unique(data['dim']), [0, 1, 2])
+        self.assertEqual(np.isinf(data['death']).sum(), 50)
+
+    def test_sweep_barcode(self):
+        from aiida_gudhi.parsers.barcode import sweep_barcode
+
+        data = BarcodeParser.parse(
+            os.path.join(gt.TEST_DIR, 'sample.barcode'))
+        thresholds = [2.0, 3.0, 4.2]
+
+        for threshold, truncated in zip(thresholds,
+                                        sweep_barcode(data, thresholds)):
+            expected = data[data['birth'] <= threshold].copy()
+            expected['death'][expected['death'] > threshold] = np.inf
+
+            order = ['dim', 'birth', 'death']
+            npt.assert_equal(
+                np.sort(truncated, order=order),
+                np.sort(expected, order=order))
+
+    def test_summarize_barcode(self):
+        from aiida_gudhi.parsers.barcode import summarize_barcode
+
+        data = BarcodeParser.parse(
+            os.path.join(gt.TEST_DIR, 'sample.barcode'))
+        summary = summarize_barcode(data, 4.2, grid=[0., 1., 4.2])
+
+        self.assertEqual(summary['dimensions'], [0, 1, 2])
+        self.assertEqual(summary['dim_0']['count'], 1786)
+        self.assertEqual(
+            sum(summary['dim_{}'.format(d)]['infinite'] for d in range(3)),
+            50)
+
+        # brute force Betti numbers and long-lived features
+        h1 = data[data['dim'] == 1]
+        for t, betti, persistent in zip(summary['grid'],
+                                        summary['dim_1']['betti'],
+                                        summary['dim_1']['persistent']):
+            alive = (h1['birth'] <= t) & (h1['death'] > t)
+            self.assertEqual(betti, alive.sum())
+            lifetimes = np.minimum(h1['death'], 4.2) - h1['birth']
+            self.assertEqual(persistent, (lifetimes > t).sum())
+
+    def test_betti_curves(self):
+        parser = BarcodeParser(
+            os.path.join(gt.TEST_DIR, 'sample.barcode'), max_life=5.0)
+        data = parser.data
+        grid = np.linspace(0, 5.0, 21)
+
+        curves = parser.betti_curves(grid)
+        self.assertEqual(curves.shape, (3, 21))
+        for dim, curve in zip(parser.dimensions(), curves):
+            intervals = data[data['dim'] == dim]
+            expected = [((intervals['birth'] <= t) &
+                         (intervals['death'] > t)).sum() for t in grid]
+            npt.assert_equal(curve, expected)
+
+        lifetimes = data['death'] - data['birth']
+        npt.assert_equal(
+            parser.count_intervals(1, [0., 1., 2.]),
+            [(lifetimes[data['dim'] == 1] > t).sum() for t in [0., 1., 2.]])
+
+        top = parser.top_persistent(1, 5)
+        npt.assert_almost_equal(top[:, 1] - top[:, 0],
+                                np.sort(lifetimes[data['dim'] == 1])[-5:][::-1])
+        self.assertEqual(parser.top_persistent(3, 5).shape, (0, 2))
+
+    def test_parse_compressed_barcode(self):
+        from aiida_gudhi.compression import compress_file
+        from aiida_gudhi.parsers.barcode import iter_barcode
+
+        barcode_file = os.path.join(gt.TEST_DIR, 'sample.barcode')
+        compressed = os.path.join(gt.get_temp_folder().abspath,
+                                  'sample.barcode.gz')
+        compress_file(barcode_file, compressed, 'gzip')
+
+        reference = BarcodeParser.parse(barcode_file)
+        npt.assert_equal(BarcodeParser.parse(compressed), reference)
+        npt.assert_equal(
+            np.concatenate(list(iter_barcode(compressed, chunk_size=100))),
+            reference)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+In-process persistent homology for cases that do not need GUDHI.
+
+The 0-dimensional persistence of a Rips filtration is single-linkage
+clustering: all points are born at 0 and, processing edges by increasing
+length, every edge joining two components kills one of them.
+"""
+import numpy as np
+from aiida_gudhi.parsers.barcode import BARCODE_DTYPE
+from aiida_gudhi.distance import (BLOCK_SIZE, num_points_from_size,
+                                  iter_row_blocks, row_offset)
+
+#: Default characteristic of the coefficient field (as in GUDHI)
+FIELD_CHARACTERISTIC = 11
+
+
+def condensed_to_pairs(indices):
+    """Convert indices of condensed array to (row, column) pairs.
+
+    :param indices: integer array of condensed indices
+    :returns: tuple (rows, cols) with cols < rows
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    rows = ((1 + np.sqrt(1 + 8 * indices.astype(np.float64))) // 2).astype(
+        np.int64)
+    # correct floating point round-off
+    rows -= row_offset(rows) > indices
+    rows += row_offset(rows + 1) <= indices
+    cols = indices - row_offset(rows)
+    return rows, cols
+
+
+def edges_below(condensed, threshold, block_size=BLOCK_SIZE):
+    """Edges of length <= threshold, sorted by length.
+
+    The condensed array is scanned in blocks, so only the selected edges are
+    held in memory.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param threshold: maximum edge length
+    :returns: tuple (lengths, rows, cols)
+    """
+    num_points = num_points_from_size(len(condensed))
+    selected = []
+    for start, stop in iter_row_blocks(num_points, block_size):
+        offset = row_offset(start)
+        block = np.asarray(condensed[offset:row_offset(stop)])
+        selected.append(np.flatnonzero(block <= threshold) + offset)
+
+    indices = np.concatenate(selected) if selected else np.empty(0, np.int64)
+    lengths = np.asarray(condensed[indices], dtype=np.float64)
+    order = np.argsort(lengths, kind='stable')
+    rows, cols = condensed_to_pairs(indices[order])
+
+    return lengths[order], rows, cols
+
+
+def single_linkage_deaths(num_points, lengths, rows, cols):
+    """Lengths of edges merging two components (Kruskal's algorithm).
+
+    :param num_points: number of points
+    :param lengths, rows, cols: edges sorted by length
+    :returns: array of merge lengths (at most num_points - 1)
+    """
+    parent = list(range(num_points))
+    deaths = []
+    merges_left = num_points - 1
+
+    for length, i, j in zip(lengths.tolist(), rows.tolist(), cols.tolist()):
+        # find roots with path halving
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        while parent[j] != j:
+            parent[j] = parent[parent[j]]
+            j = parent[j]
+
+        if i != j:
+            parent[i] = j
+            deaths.append(length)
+            merges_left -= 1
+            if not merges_left:
+                break
+
+    return np.array(deaths, dtype=np.float64)
+
+
+def h0_barcode(condensed,
+               max_edge_length=np.inf,
+               min_persistence=0.,
+               field=FIELD_CHARACTERISTIC):
+    """0-dimensional barcode of the Rips filtration of a distance matrix.
+
+    Follows the conventions of rips_distance_matrix_persistence:
+    components alive at max_edge_length have infinite death, and only
+    intervals longer than min_persistence are kept.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param max_edge_length: maximum edge length of the filtration
+    :param min_persistence: minimum length of reported intervals
+    :param field: characteristic of the coefficient field (reported only)
+    :returns: numpy array of dtype BARCODE_DTYPE
+    """
+    num_points = num_points_from_size(len(condensed))
+    lengths, rows, cols = edges_below(condensed, max_edge_length)
+    deaths = single_linkage_deaths(num_points, lengths, rows, cols)
+    num_infinite = num_points - len(deaths)
+    deaths = deaths[deaths > min_persistence]
+
+    barcode = np.zeros(len(deaths) + num_infinite, dtype=BARCODE_DTYPE)
+    barcode['field'] = field
+    barcode['death'][:num_infinite] = np.inf
+    # longest intervals first
+    barcode['death'][num_infinite:] = deaths[::-1]
+
+    return barcode
+
+
+def connected_components(num_points, rows, cols):
+    """Connected components of graph given by edge list.
+
+    Vectorized label propagation: each point takes the smallest label among
+    its neighbours, followed by pointer jumping, until nothing changes.
+
+    :param num_points: number of points
+    :param rows, cols: end points of edges
+    :returns: array of component labels 0, 1, ... (ordered by smallest point)
+    """
+    labels = np.arange(num_points)
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, rows, labels[cols])
+        np.minimum.at(new, cols, labels[rows])
+        # pointer jumping
+        new = new[new]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+
+    _roots, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def threshold_components(condensed, threshold, block_size=BLOCK_SIZE):
+    """Connected components of points at distance <= threshold.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param threshold: maximum edge length
+    :returns: array of component labels
+    """
+    num_points = num_points_from_size(len(condensed))
+    _lengths, rows, cols = edges_below(condensed, threshold, block_size)
+    return connected_components(num_points, rows, cols)
+
+
+def sub_matrix(condensed, indices):
+    """Condensed distance matrix between a subset of points.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param indices: sorted array of distinct point indices
+    :returns: condensed distance matrix of the subset
+    """
+    if np.any(np.diff(indices) <= 0):
+        raise ValueError("indices must be sorted and distinct")
+    rows, cols = np.tril_indices(len(indices), -1)
+    return np.asarray(condensed[row_offset(indices[rows]) + indices[cols]])
+
+
+def merge_barcodes(barcodes, num_singletons=0, field=FIELD_CHARACTERISTIC):
+    """Merge barcodes of disconnected components.
+
+    The Rips complex of a disjoint union is the disjoint union of the
+    complexes, hence its barcode is the union of the barcodes.
+    Each isolated point contributes an infinite H0 interval.
+
+    :param barcodes: list of numpy arrays of dtype BARCODE_DTYPE
+    :param num_singletons: number of isolated points
+    :param field: characteristic of the coefficient field of singletons
+    :returns: numpy array of dtype BARCODE_DTYPE, sorted by dimension
+    """
+    singletons = np.zeros(num_singletons, dtype=BARCODE_DTYPE)
+    singletons['field'] = field
+    singletons['death'] = np.inf
+
+    barcode = np.concatenate(list(barcodes) + [singletons])
+    order = np.argsort(barcode['dim'], kind='stable')
+    return barcode[order]
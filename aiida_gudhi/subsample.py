@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Landmark selection to bound the size of Rips complexes.
+
+Landmarks are chosen by farthest-point sampling or at random. Both methods
+keep, for every point, the distance to the nearest landmark chosen so far,
+which is updated with one row of distances per landmark, i.e. in O(n m).
+The covering radius is the largest of these distances: every point lies
+within this distance of a landmark.
+"""
+import numpy as np
+from aiida_gudhi.distance import row_offset, num_points_from_size, \
+    periodic_distances
+
+
+def condensed_row(condensed, index):
+    """Distances from one point to all points of a condensed matrix.
+
+    :param condensed: condensed distance matrix (may be a np.memmap)
+    :param index: index of the point
+    :returns: array of distances (n, )
+    """
+    num_points = num_points_from_size(len(condensed))
+    row = np.empty(num_points, dtype=np.float64)
+    row[:index] = condensed[row_offset(index):row_offset(index + 1)]
+    row[index] = 0
+    row[index + 1:] = condensed[row_offset(
+        np.arange(index + 1, num_points)) + index]
+    return row
+
+
+def point_cloud_row(positions, index, cell=None):
+    """Distances from one point to all points of a point cloud.
+
+    :param positions: array of point coordinates (n, d)
+    :param index: index of the point
+    :param cell: array of cell vectors for periodic systems (optional)
+    :returns: array of distances (n, )
+    """
+    if cell is not None:
+        return periodic_distances(positions[index:index + 1], positions,
+                                  cell)[0]
+    diff = positions - positions[index]
+    return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+
+def farthest_point_sampling(num_points, distance_row, num_landmarks,
+                            start=0):
+    """Choose landmarks by farthest-point sampling.
+
+    Each new landmark is the point farthest from all previous ones.
+    Sampling stops early once every point coincides with a landmark, so
+    landmarks are distinct even for duplicate points.
+
+    :param num_points: number of points
+    :param distance_row: function returning distances from point i to all
+        points
+    :param num_landmarks: maximum number of landmarks
+    :param start: index of first landmark
+    :returns: tuple (indices, covering_radius)
+    """
+    if num_points and not 0 <= start < num_points:
+        raise ValueError("start {} out of range for {} points".format(
+            start, num_points))
+    num_landmarks = min(num_landmarks, num_points)
+    indices = np.empty(num_landmarks, dtype=np.int64)
+    nearest = np.full(num_points, np.inf)
+
+    index = start
+    for i in range(num_landmarks):
+        indices[i] = index
+        np.minimum(nearest, distance_row(index), out=nearest)
+        index = np.argmax(nearest)
+        if nearest[index] == 0:
+            # landmarks already cover all points
+            indices = indices[:i + 1]
+            break
+
+    return indices, float(nearest.max()) if num_points else 0.
+
+
+def random_landmarks(num_points, distance_row, num_landmarks, seed=None):
+    """Choose landmarks uniformly at random.
+
+    :param num_points: number of points
+    :param distance_row: function returning distances from point i to all
+        points
+    :param num_landmarks: number of landmarks
+    :param seed: seed of random number generator
+    :returns: tuple (indices, covering_radius)
+    """
+    num_landmarks = min(num_landmarks, num_points)
+    indices = np.sort(
+        np.random.RandomState(seed).choice(
+            num_points, num_landmarks, replace=False))
+
+    nearest = np.full(num_points, np.inf)
+    for index in indices:
+        np.minimum(nearest, distance_row(index), out=nearest)
+
+    return indices, float(nearest.max()) if num_points else 0.
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Summary statistics of barcodes.
+
+Used by the parsers and, for calculations retrieving only summaries, run on
+the compute node after GUDHI::
+
+    python summary.py out.barcode out.barcode.summary.json --threshold 4.2
+
+This module depends only on numpy, so that it can be copied to and run on
+the compute node.
+"""
+import json
+import warnings
+import numpy as np
+
+#: Layout of one line of GUDHI barcode output:
+#: field characteristic, homology dimension, birth, death
+BARCODE_DTYPE = np.dtype([
+    ('field', np.int32),
+    ('dim', np.int32),
+    ('birth', np.float64),
+    ('death', np.float64),
+])
+
+#: Number of points of the default threshold grid of summarize_barcode
+SUMMARY_GRID_POINTS = 11
+
+#: Default number of longest intervals listed per dimension
+SUMMARY_TOP_K = 10
+
+
+def summary_file_name(barcode_file_name):
+    """Name of summary file written next to barcode file."""
+    return '{}.summary.json'.format(barcode_file_name)
+
+
+def finite_maximum(data):
+    """Largest finite filtration value of barcode (for unbounded runs)."""
+    values = np.concatenate((data['birth'], data['death']))
+    values = values[np.isfinite(values)]
+    return float(values.max()) if len(values) else 0.
+
+
+def persistence_entropy(lifetimes):
+    """Shannon entropy of the normalized interval lengths.
+
+    :param lifetimes: array of finite, non-negative interval lengths
+    """
+    lifetimes = lifetimes[lifetimes > 0]
+    if not len(lifetimes):
+        return 0.
+    probabilities = lifetimes / lifetimes.sum()
+    return float(-np.sum(probabilities * np.log(probabilities)))
+
+
+def betti_numbers(births, deaths, grid):
+    """Number of intervals alive (birth <= t < death) at each grid value t.
+
+    :param births: sorted array of births
+    :param deaths: sorted array of deaths
+    :param grid: array of filtration values
+    :returns: integer array of same length as grid
+    """
+    return np.searchsorted(births, grid, side='right') - \
+        np.searchsorted(deaths, grid, side='right')
+
+
+def top_bars(intervals, lifetimes, top_k):
+    """The top_k longest intervals as [birth, death] (death None if infinite).
+
+    :param intervals: numpy array of dtype BARCODE_DTYPE
+    :param lifetimes: lifetimes of the intervals
+    """
+    longest = intervals[np.argsort(-lifetimes, kind='stable')[:top_k]]
+    return [[birth, None if np.isinf(death) else death]
+            for birth, death in zip(longest['birth'].tolist(),
+                                    longest['death'].tolist())]
+
+
+def summarize_barcode(data, threshold, grid=None, top_k=0):
+    """Summary statistics of barcode per homology dimension.
+
+    Infinite deaths are cut at the threshold for lifetimes.
+    For each value t of the grid, ``betti`` counts intervals alive at t
+    (birth <= t < death) and ``persistent`` counts intervals living longer
+    than t. With top_k > 0, ``top`` lists the top_k longest intervals.
+
+    :param data: numpy array of dtype BARCODE_DTYPE
+    :param threshold: filtration value up to which the barcode was computed
+    :param grid: list of filtration values (default: SUMMARY_GRID_POINTS
+        values from 0 to threshold)
+    :param top_k: number of longest intervals to list per dimension
+    :returns: dictionary suitable for ParameterData, with keys 'threshold',
+        'grid', 'dimensions' and 'dim_<d>' for every dimension d
+    """
+    if grid is None:
+        grid = np.linspace(0, threshold, SUMMARY_GRID_POINTS)
+    grid = np.asarray(grid, dtype=np.float64)
+
+    dimensions = np.unique(data['dim'])
+    summary = {
+        'threshold': float(threshold),
+        'grid': grid.tolist(),
+        'dimensions': dimensions.tolist(),
+    }
+
+    for dim in dimensions:
+        intervals = data[data['dim'] == dim]
+        infinite = np.isinf(intervals['death'])
+        lifetimes = np.minimum(intervals['death'],
+                               threshold) - intervals['birth']
+        if top_k > 0:
+            top = top_bars(intervals, lifetimes, top_k)
+        lifetimes = np.sort(lifetimes)
+
+        alive = betti_numbers(
+            np.sort(intervals['birth']), np.sort(intervals['death']), grid)
+        persistent = len(lifetimes) - np.searchsorted(
+            lifetimes, grid, side='right')
+
+        summary['dim_{}'.format(dim)] = {
+            'count': len(intervals),
+            'infinite': int(infinite.sum()),
+            'total_persistence': float(lifetimes.sum()),
+            'max_persistence': float(lifetimes[-1]),
+            'entropy': persistence_entropy(lifetimes),
+            'betti': alive.tolist(),
+            'persistent': persistent.tolist(),
+        }
+        if top_k > 0:
+            summary['dim_{}'.format(dim)]['top'] = top
+
+    return summary
+
+
+def main(argv=None):
+    """Write summary of GUDHI barcode file as JSON."""
+    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('barcode', help='barcode file written by GUDHI')
+    parser.add_argument('output', help='JSON file to write')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        help='filtration value up to which the barcode was computed '
+        '(default: largest finite value)')
+    parser.add_argument(
+        '--grid', type=float, nargs='+', help='filtration values')
+    parser.add_argument('--top-k', type=int, default=SUMMARY_TOP_K)
+    parser.add_argument(
+        '--remove', action='store_true', help='delete barcode file')
+    args = parser.parse_args(argv)
+
+    with warnings.catch_warnings():
+        # loadtxt warns on empty files
+        warnings.simplefilter('ignore', UserWarning)
+        data = np.loadtxt(args.barcode, dtype=BARCODE_DTYPE, ndmin=1)
+
+    threshold = args.threshold
+    if threshold is None:
+        threshold = finite_maximum(data)
+
+    with open(args.output, 'w') as handle:
+        json.dump(
+            summarize_barcode(data, threshold, args.grid, args.top_k), handle)
+
+    if args.remove:
+        os.remove(args.barcode)
+
+
+if __name__ == '__main__':
+    main()
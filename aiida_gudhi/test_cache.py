@@ -0,0 +1,54 @@
+""" Tests for result cache
+
+"""
+import os
+import tempfile
+import aiida_gudhi.tests as gt
+
+
+class TestCache(gt.PluginTestCase):
+    def test_cache_key(self):
+        from aiida.orm import DataFactory
+        from aiida_gudhi.cache import cache_key
+        Parameters = DataFactory('gudhi.rdm')
+        SinglefileData = DataFactory('singlefile')
+
+        distance_matrix = SinglefileData(
+            file=os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        key = cache_key(distance_matrix,
+                        Parameters(dict={'max-edge-length': 4.2}))
+
+        # explicit defaults do not change the key
+        same = cache_key(distance_matrix,
+                         Parameters(dict={
+                             'max-edge-length': 4.2,
+                             'cpx-dimension': 3
+                         }))
+        other = cache_key(distance_matrix,
+                          Parameters(dict={'max-edge-length': 4.3}))
+        self.assertEqual(key, same)
+        self.assertNotEqual(key, other)
+
+        # settings change the outputs, defaults do not
+        ParameterData = DataFactory('parameter')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+        self.assertEqual(
+            cache_key(distance_matrix, parameters,
+                      ParameterData(dict={'retrieve': 'barcode'})), key)
+        self.assertNotEqual(
+            cache_key(distance_matrix, parameters,
+                      ParameterData(dict={'threshold_sweep': [1.0]})), key)
+
+    def test_lru_eviction(self):
+        from aiida_gudhi.cache import RipsCache
+        cache = RipsCache(path=tempfile.mkdtemp(), max_size=100)
+
+        index = {'entries': {}, 'hits': 0, 'misses': 0}
+        for i, key in enumerate(['a', 'b', 'c']):
+            with open(cache._file(key), 'w') as handle:  # pylint: disable=protected-access
+                handle.write('x' * 40)
+            index['entries'][key] = {'size': 40, 'last_used': i}
+        cache._evict(index)  # pylint: disable=protected-access
+
+        self.assertEqual(sorted(index['entries']), ['b', 'c'])
+        self.assertIsNone(cache.get_file('a'))
@@ -0,0 +1,77 @@
+""" Tests for distances between persistence diagrams
+
+"""
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.diagram_distance import (
+    wasserstein_distance, bottleneck_distance, has_perfect_matching,
+    lower_bound, pairwise_distances)
+
+
+class TestDiagramDistance(gt.PluginTestCase):
+    def test_distances(self):
+        a = np.array([[0., 1.], [0., 4.]])
+        b = np.array([[0., 4.2]])
+
+        # [0, 1] goes to the diagonal, [0, 4] to [0, 4.2]
+        self.assertAlmostEqual(wasserstein_distance(a, b, p=1), 0.7)
+        self.assertAlmostEqual(
+            wasserstein_distance(a, b, p=2), np.sqrt(0.25 + 0.04))
+        self.assertAlmostEqual(bottleneck_distance(a, b), 0.5)
+        self.assertAlmostEqual(wasserstein_distance(a, np.empty((0, 2))), 2.5)
+        self.assertLessEqual(lower_bound(a, b, p=1), 0.7)
+
+        # infinite intervals are matched among themselves
+        c = np.array([[0., np.inf], [0., 1.]])
+        d = np.array([[0.3, np.inf]])
+        self.assertAlmostEqual(wasserstein_distance(c, d), 0.8)
+        self.assertEqual(wasserstein_distance(c, b), np.inf)
+
+    def test_perfect_matching(self):
+        from itertools import permutations
+        random = np.random.RandomState(0)
+        for size in range(1, 6):
+            for _trial in range(20):
+                adjacency = random.rand(size, size) < 0.4
+                brute_force = any(
+                    all(adjacency[i, j] for i, j in enumerate(perm))
+                    for perm in permutations(range(size)))
+                self.assertEqual(
+                    has_perfect_matching(adjacency), brute_force)
+
+        # bottleneck distance equals the largest point-wise cost
+        a = np.array([[0., 2.], [1., 5.], [2., 2.5]])
+        b = np.array([[0.1, 2.3], [1.2, 4.]])
+        self.assertAlmostEqual(bottleneck_distance(a, b), 1.)
+
+    def test_pairwise_distances(self):
+        random = np.random.RandomState(0)
+        diagrams = []
+        for num in random.randint(0, 10, size=12):
+            births = random.rand(num)
+            diagrams.append(
+                np.column_stack((births, births + random.rand(num))))
+
+        matrix = pairwise_distances(diagrams, p=2, tile_size=5)
+        npt.assert_almost_equal(matrix, matrix.T)
+        self.assertAlmostEqual(matrix[2, 9],
+                               wasserstein_distance(
+                                   diagrams[2], diagrams[9], p=2))
+
+        # resume after losing a tile
+        output = gt.get_temp_folder().get_abs_path('distances.npy')
+        pairwise_distances(diagrams, p=2, output=output, tile_size=5)
+        partial = np.load(output, mmap_mode='r+')
+        partial[0:5, 5:10] = np.nan
+        partial.flush()
+        del partial
+        resumed = pairwise_distances(
+            diagrams, p=2, output=output, tile_size=5)
+        npt.assert_almost_equal(resumed, matrix)
+
+        # pruned pairs are reported as inf
+        pruned = pairwise_distances(diagrams, p=2, cutoff=0.3)
+        kept = np.isfinite(pruned)
+        npt.assert_almost_equal(pruned[kept], matrix[kept])
+        self.assertTrue(np.all(matrix[~kept] > 0.3))
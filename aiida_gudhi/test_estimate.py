@@ -0,0 +1,57 @@
+""" Tests for resource estimator
+
+"""
+import numpy as np
+import aiida_gudhi.tests as gt
+from aiida_gudhi.distance import iter_distance_blocks
+from aiida_gudhi.estimate import (degrees, estimate_resources,
+                                  estimate_point_cloud, estimate_edge_list,
+                                  calculation_options)
+
+
+class TestEstimate(gt.PluginTestCase):
+    def setUp(self):
+        num_points = 300
+        positions = np.random.RandomState(0).rand(num_points, 3)
+        self.condensed = np.concatenate(
+            [v for _start, _stop, v in iter_distance_blocks(positions)])
+        matrix = np.zeros((num_points, num_points))
+        matrix[np.tril_indices(num_points, -1)] = self.condensed
+        self.adjacency = (matrix + matrix.T <= 0.2) & \
+            ~np.eye(num_points, dtype=bool)
+
+    def test_degrees(self):
+        np.testing.assert_equal(
+            degrees(self.condensed, 0.2, block_size=1000),
+            self.adjacency.sum(axis=1))
+
+    def test_estimate(self):
+        result = estimate_resources(self.condensed, 0.2, cpx_dimension=2)
+        adjacency = self.adjacency.astype(np.float64)
+        triangles = np.trace(adjacency.dot(adjacency).dot(adjacency)) / 6
+
+        self.assertEqual(result['num_edges'], self.adjacency.sum() // 2)
+        self.assertEqual(result['simplices'][:2], [300, result['num_edges']])
+        # clustering coefficient is sampled
+        self.assertAlmostEqual(
+            result['simplices'][2] / triangles, 1, delta=0.2)
+
+        options = calculation_options(result, min_seconds=60)
+        self.assertEqual(options['max_wallclock_seconds'], 60)
+        self.assertGreater(options['max_memory_kb'], 0)
+
+    def test_estimate_inputs(self):
+        from aiida_gudhi.distance import select_edges
+        positions = np.random.RandomState(0).rand(300, 3)
+        reference = estimate_resources(self.condensed, 0.2, cpx_dimension=2)
+
+        # same graph from point cloud and from a (wider) edge list
+        indices, lengths = select_edges(iter_distance_blocks(positions), 0.3)
+        for result in [
+                estimate_point_cloud(positions, 0.2, cpx_dimension=2),
+                estimate_edge_list(300, indices, lengths, 0.2,
+                                   cpx_dimension=2),
+        ]:
+            self.assertEqual(result['simplices'], reference['simplices'])
+            self.assertEqual(result['memory_bytes'],
+                             reference['memory_bytes'])
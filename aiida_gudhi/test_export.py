@@ -0,0 +1,41 @@
+""" Tests for bulk export of barcodes
+
+"""
+import os
+import json
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.parsers.barcode import read_barcode
+from aiida_gudhi.export import export_barcodes, load_dataset, consolidate
+
+
+class TestExport(gt.PluginTestCase):
+    def test_export(self):
+        barcode_file = os.path.join(gt.TEST_DIR, 'sample.barcode')
+        reference = read_barcode(barcode_file)
+        path = os.path.join(gt.get_temp_folder().abspath, 'dataset')
+
+        self.assertEqual(
+            export_barcodes(
+                path, [('a', barcode_file), ('b', barcode_file)],
+                chunk_size=1), 2)
+        with open(os.path.join(path, 'manifest.json')) as handle:
+            self.assertEqual(len(json.load(handle)['chunks']), 2)
+        # incremental: 'a' is skipped
+        self.assertEqual(
+            export_barcodes(
+                path, [('a', barcode_file), ('c', barcode_file)],
+                compress=True), 1)
+
+        data = load_dataset(path)
+        npt.assert_equal(data['uuid'], ['a', 'b', 'c'])
+        self.assertEqual(len(data['dim']), 3 * len(reference))
+        npt.assert_equal(data['death'][data['structure_id'] == 2],
+                         reference['death'])
+
+        consolidate(path)
+        consolidated = load_dataset(path)
+        self.assertIsInstance(consolidated['birth'], np.memmap)
+        for name in ['structure_id', 'dim', 'birth', 'death']:
+            npt.assert_equal(consolidated[name], data[name])
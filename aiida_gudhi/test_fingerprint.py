@@ -0,0 +1,71 @@
+""" Tests for fingerprint index
+
+"""
+import os
+import numpy as np
+import aiida_gudhi.tests as gt
+from aiida_gudhi.parsers.barcode import read_barcode
+from aiida_gudhi.fingerprint import (persistence_histogram, LSHTables,
+                                     FingerprintIndex, FINGERPRINT_EXTRA)
+
+
+class TestFingerprint(gt.PluginTestCase):
+    def setUp(self):
+        self.barcode = read_barcode(
+            os.path.join(gt.TEST_DIR, 'sample.barcode'))
+
+    def test_persistence_histogram(self):
+        histogram = persistence_histogram(self.barcode, 10.0, bins=4)
+        self.assertEqual(histogram.shape, (3 * 16, ))
+        # every interval is counted once
+        self.assertAlmostEqual(
+            np.expm1(histogram).sum(), len(self.barcode), places=6)
+
+    def test_lsh_tables(self):
+        random = np.random.RandomState(0)
+        vectors = random.rand(500, 10) * 10
+        tables = LSHTables(10)
+        tables.add(range(500), vectors)
+
+        candidates = tables.candidates(vectors[42] + 0.01)
+        self.assertIn(42, candidates)
+        self.assertLess(len(candidates), 500)
+
+    def test_index(self):
+        from aiida.orm import DataFactory
+        BarcodeData = DataFactory('gudhi.barcode')
+        DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+        Parameters = DataFactory('gudhi.rdm')
+        parameters = Parameters(dict={'max-edge-length': 4.2})
+
+        barcodes = []
+        for scale in [0.5, 1.0, 1.5, 2.0]:
+            data = self.barcode.copy()
+            data['birth'] *= scale
+            data['death'] *= scale
+            barcodes.append(BarcodeData(barcode=data).store())
+        matrix = DistanceMatrixData.from_file(
+            os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+
+        path = gt.get_temp_folder().abspath
+        index = FingerprintIndex(path=path, max_value=10.0)
+        index.add(
+            barcodes[:1], distance_matrices=[matrix], parameters=parameters)
+        index.add(barcodes[1:])
+        extra = barcodes[0].get_extra(FINGERPRINT_EXTRA)
+        np.testing.assert_almost_equal(extra['histogram'],
+                                       index.fingerprint(barcodes[0]))
+
+        # reopened index finds the barcode itself first
+        index = FingerprintIndex(path=path, max_value=10.0)
+        self.assertEqual(len(index), 4)
+        uuid, distance = index.nearest(barcodes[2], k=1)[0]
+        self.assertEqual(uuid, barcodes[2].uuid)
+        self.assertEqual(distance, 0)
+
+        self.assertEqual(
+            index.find_duplicate(matrix, parameters), barcodes[0].uuid)
+        # same matrix, different parameters
+        self.assertIsNone(
+            index.find_duplicate(matrix,
+                                 Parameters(dict={'max-edge-length': 3.0})))
@@ -0,0 +1,82 @@
+""" Tests for in-process persistence
+
+"""
+import os
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.distance import read_gudhi_matrix
+from aiida_gudhi.persistence import (h0_barcode, condensed_to_pairs,
+                                     threshold_components, sub_matrix,
+                                     merge_barcodes)
+
+
+def mst_lengths(matrix):
+    """Edge lengths of minimum spanning tree (Prim's algorithm)."""
+    num_points = len(matrix)
+    in_tree = np.zeros(num_points, dtype=bool)
+    in_tree[0] = True
+    distance = matrix[0].copy()
+    lengths = []
+    for _i in range(num_points - 1):
+        distance[in_tree] = np.inf
+        nearest = np.argmin(distance)
+        lengths.append(distance[nearest])
+        in_tree[nearest] = True
+        distance = np.minimum(distance, matrix[nearest])
+    return np.sort(lengths)
+
+
+class TestPersistence(gt.PluginTestCase):
+    def setUp(self):
+        condensed = read_gudhi_matrix(
+            os.path.join(gt.TEST_DIR, 'sample_distance.matrix'))
+        num_points = 100
+        matrix = np.zeros((num_points, num_points))
+        matrix[np.tril_indices(num_points, -1)] = condensed
+        self.condensed = condensed
+        self.matrix = matrix + matrix.T
+
+    def test_condensed_to_pairs(self):
+        rows, cols = condensed_to_pairs(np.arange(len(self.condensed)))
+        npt.assert_equal(self.matrix[rows, cols], self.condensed)
+        self.assertTrue(np.all(cols < rows))
+
+    def test_h0_barcode(self):
+        """Compare against minimum spanning tree."""
+        mst = mst_lengths(self.matrix)
+        threshold = np.median(mst)
+
+        barcode = h0_barcode(self.condensed, max_edge_length=threshold)
+        self.assertEqual(len(barcode), 100)
+        npt.assert_equal(barcode['dim'], 0)
+        npt.assert_equal(barcode['birth'], 0)
+
+        finite = barcode['death'][np.isfinite(barcode['death'])]
+        npt.assert_almost_equal(
+            np.sort(finite), mst[mst <= threshold])
+
+        barcode = h0_barcode(self.condensed, min_persistence=mst[10])
+        self.assertEqual(np.isinf(barcode['death']).sum(), 1)
+        npt.assert_almost_equal(
+            np.sort(barcode['death'][1:]), mst[mst > mst[10]])
+
+    def test_components(self):
+        """Merged barcodes of components equal barcode of full matrix."""
+        threshold = np.median(mst_lengths(self.matrix))
+        labels = threshold_components(self.condensed, threshold)
+        self.assertGreater(labels.max(), 0)
+
+        barcodes = []
+        sizes = np.bincount(labels)
+        for label in np.flatnonzero(sizes > 1):
+            indices = np.flatnonzero(labels == label)
+            condensed = sub_matrix(self.condensed, indices)
+            npt.assert_equal(condensed,
+                             self.matrix[np.ix_(indices, indices)][
+                                 np.tril_indices(len(indices), -1)])
+            barcodes.append(h0_barcode(condensed, threshold))
+
+        merged = merge_barcodes(barcodes, num_singletons=(sizes == 1).sum())
+        full = h0_barcode(self.condensed, threshold)
+        npt.assert_equal(np.sort(merged['death']), np.sort(full['death']))
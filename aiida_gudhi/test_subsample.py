@@ -0,0 +1,66 @@
+""" Tests for landmark selection
+
+"""
+from functools import partial
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.distance import iter_distance_blocks
+from aiida_gudhi.subsample import (condensed_row, point_cloud_row,
+                                   farthest_point_sampling, random_landmarks)
+
+
+class TestSubsample(gt.PluginTestCase):
+    def setUp(self):
+        self.positions = np.random.RandomState(0).rand(200, 3)
+        self.condensed = np.concatenate(
+            [v for _start, _stop, v in iter_distance_blocks(self.positions)])
+
+    def test_rows(self):
+        for index in [0, 50, 199]:
+            npt.assert_almost_equal(
+                condensed_row(self.condensed, index),
+                point_cloud_row(self.positions, index))
+
+    def test_landmarks(self):
+        distance_row = partial(point_cloud_row, self.positions)
+        for indices, radius in [
+                farthest_point_sampling(200, distance_row, 20),
+                random_landmarks(200, distance_row, 20, seed=0),
+        ]:
+            self.assertEqual(len(np.unique(indices)), 20)
+            diff = self.positions[:, None, :] - self.positions[None, indices]
+            nearest = np.sqrt((diff**2).sum(axis=-1)).min(axis=1)
+            self.assertAlmostEqual(radius, nearest.max())
+
+        # farthest-point sampling covers better than random choice
+        _indices, fps_radius = farthest_point_sampling(
+            200, partial(condensed_row, self.condensed), 20)
+        self.assertLess(fps_radius, radius)
+
+    def test_coincident_points(self):
+        from aiida_gudhi.persistence import sub_matrix
+        # 3 distinct points, each present twice
+        positions = np.repeat(self.positions[:3], 2, axis=0)
+        condensed = np.concatenate(
+            [v for _start, _stop, v in iter_distance_blocks(positions)])
+
+        indices, radius = farthest_point_sampling(
+            6, partial(condensed_row, condensed), 5, start=1)
+        self.assertEqual(len(indices), 3)
+        self.assertEqual(len(np.unique(positions[indices], axis=0)), 3)
+        self.assertEqual(radius, 0)
+
+        indices = np.sort(indices)
+        npt.assert_almost_equal(
+            sub_matrix(condensed, indices),
+            np.concatenate([
+                v for _start, _stop, v in iter_distance_blocks(
+                    positions[indices])
+            ]))
+
+        with self.assertRaises(ValueError):
+            farthest_point_sampling(6, partial(condensed_row, condensed), 2,
+                                    start=6)
+        with self.assertRaises(ValueError):
+            sub_matrix(condensed, np.array([1, 1]))
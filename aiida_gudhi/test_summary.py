@@ -0,0 +1,36 @@
+""" Tests for remote-side barcode summaries
+
+"""
+import os
+import json
+import numpy as np
+import aiida_gudhi.tests as gt
+from aiida_gudhi.parsers.barcode import read_barcode
+from aiida_gudhi.summary import main, summarize_barcode, summary_file_name
+
+
+class TestSummary(gt.PluginTestCase):
+    def test_summary_script(self):
+        barcode_file = os.path.join(gt.TEST_DIR, 'sample.barcode')
+        output = os.path.join(gt.get_temp_folder().abspath,
+                              summary_file_name('out.barcode'))
+
+        main([
+            barcode_file, output, '--threshold', '4.2', '--grid', '0', '1',
+            '2', '--top-k', '3'
+        ])
+        with open(output) as handle:
+            summary = json.load(handle)
+
+        data = read_barcode(barcode_file)
+        self.assertEqual(summary,
+                         summarize_barcode(data, 4.2, [0., 1., 2.], top_k=3))
+
+        # top bars ordered by decreasing lifetime, infinite deaths as None
+        top = summary['dim_0']['top']
+        self.assertEqual(len(top), 3)
+        lifetimes = [(4.2 if d is None else d) - b for b, d in top]
+        self.assertEqual(lifetimes, sorted(lifetimes, reverse=True))
+        self.assertAlmostEqual(lifetimes[0],
+                               summary['dim_0']['max_persistence'])
+        self.assertTrue(np.isinf(data['death']).any())
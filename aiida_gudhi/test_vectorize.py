@@ -0,0 +1,79 @@
+""" Tests for vectorization of persistence diagrams
+
+"""
+import os
+import numpy as np
+import numpy.testing as npt
+import aiida_gudhi.tests as gt
+from aiida_gudhi.parsers.barcode import BarcodeParser
+from aiida_gudhi.vectorize import (diagrams_from_barcodes,
+                                   persistence_images, persistence_landscapes)
+
+
+class TestVectorize(gt.PluginTestCase):
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.diagrams = []
+        for num in [0, 1, 5, 30, 7]:
+            births = random.rand(num)
+            self.diagrams.append(
+                np.column_stack((births, births + random.rand(num))))
+
+    def test_diagrams_from_barcodes(self):
+        parser = BarcodeParser(os.path.join(gt.TEST_DIR, 'sample.barcode'))
+        finite, = diagrams_from_barcodes([parser], dimension=1)
+        capped, = diagrams_from_barcodes([parser.data], 1, infinity=5.0)
+        self.assertEqual(len(capped) - len(finite), 41)
+        self.assertEqual(capped[:, 1].max(), 5.0)
+
+    def test_persistence_images(self):
+        images = persistence_images(
+            self.diagrams,
+            resolution=(4, 3),
+            sigma=0.1,
+            birth_range=(0, 1),
+            persistence_range=(0, 1),
+            weight='constant',
+            chunk_size=100)
+        self.assertEqual(images.shape, (5, 3, 4))
+        npt.assert_equal(images[0], 0)
+
+        # brute force: Gaussians at pixel centres
+        x = np.array([0.125, 0.375, 0.625, 0.875])
+        y = np.array([1., 3., 5.]) / 6
+        for diagram, image in zip(self.diagrams, images):
+            expected = np.zeros((3, 4))
+            for birth, death in diagram:
+                expected += np.exp(-((x[None, :] - birth)**2 +
+                                     (y[:, None] - death + birth)**2) /
+                                   0.02) / (0.02 * np.pi)
+            npt.assert_almost_equal(image, expected)
+
+    def test_persistence_landscapes(self):
+        landscapes = persistence_landscapes(
+            self.diagrams,
+            num_landscapes=3,
+            resolution=11,
+            t_range=(0, 2),
+            chunk_size=100)
+        self.assertEqual(landscapes.shape, (5, 3, 11))
+
+        grid = np.linspace(0, 2, 11)
+        for diagram, landscape in zip(self.diagrams, landscapes):
+            tents = [np.maximum(np.minimum(grid - b, d - grid), 0)
+                     for b, d in diagram] + [np.zeros(11)] * 3
+            expected = -np.sort(-np.array(tents), axis=0)[:3]
+            npt.assert_almost_equal(landscape, expected)
+
+    def test_degenerate_inputs(self):
+        # no diagrams: empty batch of features
+        self.assertEqual(
+            persistence_images([], resolution=(4, 3)).shape, (0, 3, 4))
+        self.assertEqual(
+            persistence_landscapes([], num_landscapes=2,
+                                   resolution=7).shape, (0, 2, 7))
+
+        # only intervals of zero persistence: zero weights, not NaN
+        images = persistence_images([np.array([[1., 1.], [2., 2.]])],
+                                    resolution=(4, 3))
+        npt.assert_equal(images, np.zeros((1, 3, 4)))
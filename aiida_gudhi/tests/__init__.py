@@ -47,11 +47,17 @@ def get_computer(name='localhost'):
 
 executables = {
     'gudhi.rdm': 'rips_distance_matrix_persistence',
+    'gudhi.rdm_batch': 'rips_distance_matrix_persistence',
+    'gudhi.alpha': 'alpha_complex_persistence',
 }
 
 
 def get_code(entry_point, computer_name='localhost'):
-    """Setup code on localhost computer"""
+    """Setup code on localhost computer
+
+    Codes are labelled by entry point, since several plugins may use the same
+    executable.
+    """
     from aiida.orm import Code
     from aiida.common.exceptions import NotExistent
 
@@ -59,14 +65,15 @@ def get_code(entry_point, computer_name='localhost'):
     executable = executables[entry_point]
 
     try:
-        code = Code.get_from_string('{}@{}'.format(executable, computer_name))
+        code = Code.get_from_string('{}@{}'.format(entry_point,
+                                                   computer_name))
     except NotExistent:
         path = get_path_to_executable(executable)
         code = Code(
             input_plugin_name=entry_point,
             remote_computer_exec=[computer, path],
         )
-        code.label = executable
+        code.label = entry_point
         code.store()
 
     return code
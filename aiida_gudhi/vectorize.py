@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorization of persistence diagrams for machine learning.
+
+Turns many diagrams at once into persistence images [1] or persistence
+landscapes [2], returned as a single dense array.
+Diagrams are processed in chunks: the intervals of a chunk are padded into
+an array (diagrams, intervals) so that each chunk is handled by a few
+broadcast operations. Chunks can be spread over a process pool.
+
+[1] H. Adams et al., J. Mach. Learn. Res. 18, 1 (2017)
+[2] P. Bubenik, J. Mach. Learn. Res. 16, 77 (2015)
+
+Usage::
+
+    diagrams = diagrams_from_barcodes(barcodes, dimension=1, infinity=5.0)
+    images = persistence_images(diagrams, resolution=(20, 20), n_jobs=4)
+"""
+from functools import partial
+import numpy as np
+
+#: Maximum number of (padded) intervals per chunk times grid points
+CHUNK_SIZE = 2**24
+
+
+def diagrams_from_barcodes(barcodes, dimension, infinity=None):
+    """Extract persistence diagrams of one homology dimension.
+
+    :param barcodes: iterable of numpy arrays of dtype BARCODE_DTYPE or of
+        objects with a ``data`` attribute holding one (e.g. BarcodeParser)
+    :param dimension: homology dimension
+    :param infinity: value replacing infinite deaths (default: drop
+        infinite intervals)
+    :returns: list of arrays (n_i, 2) of births and deaths
+    """
+    diagrams = []
+    for barcode in barcodes:
+        data = barcode if isinstance(barcode, np.ndarray) else barcode.data
+        data = data[data['dim'] == dimension]
+        diagram = np.column_stack((data['birth'], data['death']))
+        infinite = np.isinf(diagram[:, 1])
+        if infinity is None:
+            diagram = diagram[~infinite]
+        else:
+            diagram[infinite, 1] = infinity
+        diagrams.append(diagram)
+    return diagrams
+
+
+def _pad(diagrams):
+    """Pad diagrams into arrays (diagrams, max intervals).
+
+    :returns: tuple (births, deaths, mask) where mask marks real intervals
+    """
+    lengths = np.array([len(d) for d in diagrams], dtype=np.int64)
+    width = max(lengths.max(), 1) if len(lengths) else 1
+    mask = np.arange(width)[None, :] < lengths[:, None]
+
+    births = np.zeros(mask.shape)
+    deaths = np.zeros(mask.shape)
+    if lengths.sum():
+        stacked = np.concatenate([np.asarray(d, dtype=np.float64).reshape(
+            -1, 2) for d in diagrams])
+        births[mask] = stacked[:, 0]
+        deaths[mask] = stacked[:, 1]
+    return births, deaths, mask
+
+
+def iter_chunks(diagrams, grid_size, chunk_size=CHUNK_SIZE):
+    """Split diagrams into consecutive chunks of bounded padded size.
+
+    A chunk of k diagrams with at most m intervals each uses arrays of
+    k * m * grid_size elements, which is kept below chunk_size.
+
+    :returns: generator of lists of diagrams
+    """
+    chunk = []
+    width = 0
+    for diagram in diagrams:
+        new_width = max(width, len(diagram))
+        if chunk and (len(chunk) + 1) * new_width * grid_size > chunk_size:
+            yield chunk
+            chunk = []
+            new_width = len(diagram)
+        chunk.append(diagram)
+        width = new_width
+    if chunk:
+        yield chunk
+
+
+def _map_chunks(function, diagrams, grid_size, chunk_size, n_jobs,
+                feature_shape):
+    """Apply function to chunks of diagrams, optionally in a process pool.
+
+    :param feature_shape: shape of the result of one diagram
+    :returns: concatenated results (n_diagrams,) + feature_shape
+    """
+    chunks = list(iter_chunks(diagrams, grid_size, chunk_size))
+    if not chunks:
+        return np.zeros((0, ) + tuple(feature_shape))
+    if n_jobs == 1:
+        results = [function(chunk) for chunk in chunks]
+    else:
+        from multiprocessing import Pool
+        pool = Pool(n_jobs)
+        try:
+            results = pool.map(function, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    return np.concatenate(results)
+
+
+def _ranges(diagrams):
+    """Ranges of births and persistences over all diagrams."""
+    finite = [np.asarray(d).reshape(-1, 2) for d in diagrams if len(d)]
+    if not finite:
+        return (0., 1.), (0., 1.)
+    stacked = np.concatenate(finite)
+    persistence = stacked[:, 1] - stacked[:, 0]
+    return (stacked[:, 0].min(), stacked[:, 0].max()), \
+        (0., persistence.max())
+
+
+def _weights(births, persistence, weight, persistence_range):
+    """Weights of intervals in persistence image."""
+    if weight == 'constant':
+        return np.ones_like(persistence)
+    elif weight == 'linear':
+        # all intervals of zero persistence carry no weight
+        if persistence_range[1] <= 0:
+            return np.zeros_like(persistence)
+        return np.clip(persistence / persistence_range[1], 0, 1)
+    elif callable(weight):
+        return weight(births, persistence)
+    raise ValueError("Unknown weight '{}'".format(weight))
+
+
+def _image_chunk(diagrams, birth_grid, persistence_grid, sigma, weight,
+                 persistence_range):
+    """Persistence images of a chunk of diagrams."""
+    births, deaths, mask = _pad(diagrams)
+    persistence = deaths - births
+    weights = np.where(mask,
+                       _weights(births, persistence, weight,
+                                persistence_range), 0.)
+
+    # separable Gaussian: exp(-(x^2 + y^2)/2s^2) = gx(x) gy(y)
+    norm = 1. / (2 * np.pi * sigma**2)
+    gauss_x = np.exp(-(birth_grid[None, None, :] - births[:, :, None])**2 /
+                     (2 * sigma**2))
+    gauss_y = np.exp(-(persistence_grid[None, None, :] -
+                       persistence[:, :, None])**2 / (2 * sigma**2))
+    gauss_y *= (norm * weights)[:, :, None]
+
+    # sum over intervals of outer products, one matrix product per diagram
+    return np.einsum('kny,knx->kyx', gauss_y, gauss_x)
+
+
+def persistence_images(diagrams,
+                       resolution=(20, 20),
+                       sigma=None,
+                       birth_range=None,
+                       persistence_range=None,
+                       weight='linear',
+                       chunk_size=CHUNK_SIZE,
+                       n_jobs=1):
+    """Persistence images of many diagrams.
+
+    Each interval (b, d) contributes a Gaussian centred at (b, d - b),
+    weighted by a function of its persistence, evaluated at the pixel
+    centres.
+
+    :param diagrams: list of arrays (n_i, 2) of finite births and deaths
+    :param resolution: number of pixels (birth, persistence)
+    :param sigma: width of Gaussians (default: size of a pixel in
+        persistence direction)
+    :param birth_range: (min, max) of births (default: over all diagrams)
+    :param persistence_range: (min, max) of persistence (default: over all
+        diagrams)
+    :param weight: 'linear' (persistence / max persistence), 'constant' or
+        function of arrays (births, persistence); must be picklable for
+        n_jobs > 1
+    :param chunk_size: maximum size of intermediate arrays per chunk
+    :param n_jobs: number of processes
+    :returns: array (n_diagrams, resolution[1], resolution[0])
+    """
+    default_births, default_persistence = _ranges(diagrams)
+    birth_range = birth_range or default_births
+    persistence_range = persistence_range or default_persistence
+
+    def centres(value_range, num):
+        edges = np.linspace(value_range[0], value_range[1], num + 1)
+        return (edges[:-1] + edges[1:]) / 2
+
+    birth_grid = centres(birth_range, resolution[0])
+    persistence_grid = centres(persistence_range, resolution[1])
+    if sigma is None:
+        sigma = (persistence_range[1] - persistence_range[0]) / \
+            resolution[1] or 1.
+
+    function = partial(
+        _image_chunk,
+        birth_grid=birth_grid,
+        persistence_grid=persistence_grid,
+        sigma=sigma,
+        weight=weight,
+        persistence_range=persistence_range)
+    return _map_chunks(function, diagrams, sum(resolution), chunk_size,
+                       n_jobs, (resolution[1], resolution[0]))
+
+
+def _landscape_chunk(diagrams, grid, num_landscapes):
+    """Persistence landscapes of a chunk of diagrams."""
+    births, deaths, mask = _pad(diagrams)
+
+    # tent functions max(0, min(t - b, d - t)), padding contributes 0
+    tents = np.minimum(grid[None, None, :] - births[:, :, None],
+                       deaths[:, :, None] - grid[None, None, :])
+    tents = np.where(mask[:, :, None], np.maximum(tents, 0), 0.)
+
+    width = tents.shape[1]
+    if width < num_landscapes:
+        tents = np.concatenate((tents, np.zeros(
+            (len(tents), num_landscapes - width, len(grid)))), axis=1)
+
+    # k-th landscape: k-th largest tent value
+    top = -np.partition(-tents, range(num_landscapes), axis=1)
+    return top[:, :num_landscapes, :]
+
+
+def persistence_landscapes(diagrams,
+                           num_landscapes=5,
+                           resolution=100,
+                           t_range=None,
+                           chunk_size=CHUNK_SIZE,
+                           n_jobs=1):
+    """Persistence landscapes of many diagrams, sampled on a grid.
+
+    :param diagrams: list of arrays (n_i, 2) of finite births and deaths
+    :param num_landscapes: number of landscape functions
+    :param resolution: number of grid points
+    :param t_range: (min, max) of filtration values (default: from min
+        birth to max death over all diagrams)
+    :param chunk_size: maximum size of intermediate arrays per chunk
+    :param n_jobs: number of processes
+    :returns: array (n_diagrams, num_landscapes, resolution)
+    """
+    if t_range is None:
+        finite = [np.asarray(d).reshape(-1, 2) for d in diagrams if len(d)]
+        stacked = np.concatenate(finite) if finite else np.zeros((1, 2))
+        t_range = (stacked.min(), stacked.max())
+    grid = np.linspace(t_range[0], t_range[1], resolution)
+
+    function = partial(
+        _landscape_chunk, grid=grid, num_landscapes=num_landscapes)
+    return _map_chunks(function, diagrams, resolution, chunk_size, n_jobs,
+                       (num_landscapes, resolution))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Rips persistence of disconnected distance matrices, one job per component
+"""
+
+import numpy as np
+from aiida.orm import CalculationFactory, DataFactory, Code
+from aiida.work.run import submit
+from aiida.work.workchain import WorkChain, append_
+from aiida_gudhi.calculations.components import (
+    split_distance_matrix_inline, merge_barcodes_inline, component_linkname)
+from aiida_gudhi.workflows.screening import DEFAULT_OPTIONS
+
+RipsDistanceMatrixCalculation = CalculationFactory('gudhi.rdm')
+RipsDistanceMatrixParameters = DataFactory('gudhi.rdm')
+ParameterData = DataFactory('parameter')
+SinglefileData = DataFactory('singlefile')
+ArrayData = DataFactory('array')
+DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+BarcodeData = DataFactory('gudhi.barcode')
+
+
+class RipsComponentsWorkChain(WorkChain):
+    """
+    Compute barcode of distance matrix by splitting it into the connected
+    components of the graph of edges up to max-edge-length.
+
+    Components are computed by parallel RipsDistanceMatrixCalculations
+    (isolated points need no calculation) and their barcodes are merged.
+    """
+
+    @classmethod
+    def define(cls, spec):
+        super(RipsComponentsWorkChain, cls).define(spec)
+        spec.input('code', valid_type=Code)
+        spec.input('parameters', valid_type=RipsDistanceMatrixParameters)
+        spec.input(
+            'distance_matrix',
+            valid_type=(SinglefileData, DistanceMatrixData))
+        spec.input('options', valid_type=ParameterData, required=False)
+        spec.outline(
+            cls.split,
+            cls.run_components,
+            cls.merge,
+        )
+        spec.output('barcode', valid_type=BarcodeData)
+        spec.output('labels', valid_type=ArrayData)
+
+    def split(self):
+        """Split distance matrix into connected components."""
+        _calc, result = split_distance_matrix_inline(
+            distance_matrix=self.inputs.distance_matrix,
+            parameters=self.inputs.parameters)
+        self.ctx.labels = result.pop('labels')
+        self.ctx.components = result
+        self.ctx.calcs = []
+
+        sizes = np.bincount(self.ctx.labels.get_array('labels'))
+        self.report("{} points in {} components ({} isolated points)".format(
+            sizes.sum(), len(sizes), (sizes == 1).sum()))
+
+    def run_components(self):
+        """Submit one calculation per component."""
+        if 'options' in self.inputs:
+            options = self.inputs.options.get_dict()
+        else:
+            options = DEFAULT_OPTIONS
+
+        process = RipsDistanceMatrixCalculation.process()
+        for link, component in sorted(self.ctx.components.items()):
+            future = submit(
+                process,
+                code=self.inputs.code,
+                parameters=self.inputs.parameters,
+                distance_matrix=component,
+                _options=options,
+                _label='component {}'.format(link))
+            self.to_context(calcs=append_(future))
+
+    def merge(self):
+        """Merge barcodes of components."""
+        link = '{}_barcode'.format(self.inputs.parameters.output_links[0])
+
+        barcodes = {}
+        for index, calc in enumerate(self.ctx.calcs):
+            outputs = calc.get_outputs_dict()
+            if link not in outputs:
+                self.abort_nowait("Calculation {} failed".format(calc.pk))
+                return
+            barcodes[component_linkname(index)] = outputs[link]
+
+        _calc, result = merge_barcodes_inline(
+            labels=self.ctx.labels,
+            parameters=self.inputs.parameters,
+            **barcodes)
+        self.out('barcode', result['barcode'])
+        self.out('labels', self.ctx.labels)
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+High-throughput screening of persistence barcodes
+"""
+import time
+
+from aiida.orm import CalculationFactory, DataFactory, Code, Group, load_node
+from aiida.orm.data.base import Str, Int, Bool
+from aiida.common.datastructures import calc_states
+from aiida.work.run import submit
+from aiida.work.workchain import WorkChain, while_
+from plum.wait import WaitOn
+from plum.wait_ons import WaitOnAny, WaitOnProcess
+
+RipsDistanceMatrixCalculation = CalculationFactory('gudhi.rdm')
+RipsDistanceMatrixParameters = DataFactory('gudhi.rdm')
+ParameterData = DataFactory('parameter')
+SinglefileData = DataFactory('singlefile')
+StructureData = DataFactory('structure')
+ArrayData = DataFactory('array')
+DistanceMatrixData = DataFactory('gudhi.distance_matrix')
+EdgeListData = DataFactory('gudhi.edge_list')
+
+#: scheduler options used unless 'options' input is given
+DEFAULT_OPTIONS = {
+    'resources': {
+        'num_machines': 1,
+        'num_mpiprocs_per_machine': 1
+    },
+    'max_wallclock_seconds': 30 * 60,
+    'withmpi': False,
+}
+
+
+#: states of job calculations submitted to or held by the scheduler
+SCHEDULER_STATES = [
+    calc_states.TOSUBMIT,
+    calc_states.SUBMITTING,
+    calc_states.WITHSCHEDULER,
+]
+
+
+def active_calculations(computer):
+    """Pks of job calculations occupying the scheduler of computer."""
+    from aiida.orm import Computer
+    from aiida.orm.calculation.job import JobCalculation
+    from aiida.orm.querybuilder import QueryBuilder
+
+    qb = QueryBuilder()
+    qb.append(Computer, filters={'id': computer.pk}, tag='computer')
+    qb.append(
+        JobCalculation,
+        has_computer='computer',
+        filters={'state': {
+            'in': SCHEDULER_STATES
+        }},
+        project=['id'])
+    return [pk for pk, in qb.all()]
+
+
+class WaitOnTime(WaitOn):
+    """Wait until a point in time (seconds since the epoch)."""
+    UNTIL = 'until'
+
+    @classmethod
+    def create_from(cls, bundle):
+        return cls(bundle[WaitOn.BundleKeys.CALLBACK_NAME.value],
+                   bundle[cls.UNTIL])
+
+    def __init__(self, callback_name, until):
+        super(WaitOnTime, self).__init__(callback_name)
+        self._until = until
+
+    def is_ready(self):
+        return time.time() >= self._until
+
+    def save_instance_state(self, out_state):
+        super(WaitOnTime, self).save_instance_state(out_state)
+        out_state[self.UNTIL] = self._until
+
+
+def wait_on_calculations(callback_name, pks, poll_until=None):
+    """Wait until any of the calculations finishes.
+
+    Only calculations submitted by the waiting workchain can be waited on.
+    With ``poll_until``, the wait also ends at that time, e.g. to check
+    whether other jobs on the computer have freed slots.
+
+    :param pks: pks of calculations submitted by the workchain
+    :param poll_until: time (seconds since the epoch) or None
+    :returns: WaitOnAny
+    """
+    wait_list = [WaitOnProcess(callback_name, pk) for pk in pks]
+    if poll_until is not None:
+        wait_list.append(WaitOnTime(callback_name, poll_until))
+    if not wait_list:
+        raise ValueError("Nothing to wait on")
+    return WaitOnAny(callback_name, wait_list)
+
+
+def input_link(node):
+    """Input link of RipsDistanceMatrixCalculation for input group member.
+
+    StructureData is converted to a distance matrix first.
+
+    :returns: 'distance_matrix' or 'point_cloud'
+    """
+    if isinstance(node, (SinglefileData, DistanceMatrixData, EdgeListData,
+                         StructureData)):
+        return 'distance_matrix'
+    elif isinstance(node, ArrayData):
+        return 'point_cloud'
+    raise ValueError("Unsupported node type {} in input group".format(
+        type(node)))
+
+
+def _seconds(delta):
+    return delta.total_seconds()
+
+
+def throughput_statistics(records):
+    """Compute throughput of a set of finished calculations.
+
+    :param records: list of dicts with datetime values 'submitted' (storing of
+        calculation), 'retrieved' (storing of retrieved folder) and 'parsed'
+        (storing of parsed output) and optionally 'queued' and 'dispatched'
+        (from the scheduler)
+    :returns: dict with 'jobs', 'jobs_per_hour', 'mean_queue_wait_seconds'
+        and 'mean_parse_seconds' (None where not available)
+    """
+    stats = {
+        'jobs': len(records),
+        'jobs_per_hour': None,
+        'mean_queue_wait_seconds': None,
+        'mean_parse_seconds': None,
+    }
+    if not records:
+        return stats
+
+    start = min(r['submitted'] for r in records)
+    end = max(r['parsed'] for r in records)
+    elapsed = _seconds(end - start)
+    if elapsed > 0:
+        stats['jobs_per_hour'] = len(records) * 3600. / elapsed
+
+    waits = [
+        _seconds(r['dispatched'] - r['queued']) for r in records
+        if r.get('queued') and r.get('dispatched')
+    ]
+    if waits:
+        stats['mean_queue_wait_seconds'] = sum(waits) / len(waits)
+
+    parse_times = [_seconds(r['parsed'] - r['retrieved']) for r in records]
+    stats['mean_parse_seconds'] = sum(parse_times) / len(parse_times)
+
+    return stats
+
+
+def _calculation_record(calc):
+    """Collect timestamps of finished calculation for throughput_statistics.
+    """
+    outputs = calc.get_outputs_dict()
+    link = calc.inp.parameters.output_links[0]
+    record = {
+        'submitted': calc.ctime,
+        'retrieved': outputs['retrieved'].ctime,
+        'parsed': outputs[link].ctime,
+    }
+
+    jobinfo = calc.get_last_jobinfo()
+    if jobinfo is not None:
+        record['queued'] = getattr(jobinfo, 'submission_time', None)
+        record['dispatched'] = getattr(jobinfo, 'dispatch_time', None)
+
+    return record
+
+
+class RipsScreeningWorkChain(WorkChain):
+    """
+    Compute barcodes for all distance matrices (or structures) of a group.
+
+    At most ``max_concurrent`` jobs (of this or any other workchain) occupy
+    the scheduler of the computer of the code. Calculations are submitted
+    in a sliding window: whenever one of them ends, free slots are filled
+    again. Slots freed by other jobs are noticed every ``poll_interval``
+    seconds.
+    Barcode outputs of successful calculations are added to the output group
+    and throughput statistics are returned in the ``throughput`` output.
+
+    Supported members of the input group: SinglefileData,
+    DistanceMatrixData and EdgeListData (distance matrix), ArrayData (point
+    cloud) and StructureData (converted with distance_matrix_inline).
+
+    With ``auto_size``, scheduler options of calculations are estimated from
+    the size of their Rips complex (see aiida_gudhi.estimate).
+    """
+
+    @classmethod
+    def define(cls, spec):
+        super(RipsScreeningWorkChain, cls).define(spec)
+        spec.input('code', valid_type=Code)
+        spec.input('parameters', valid_type=RipsDistanceMatrixParameters)
+        spec.input('input_group', valid_type=Str)
+        spec.input('output_group', valid_type=Str)
+        spec.input('max_concurrent', valid_type=Int, default=Int(50))
+        spec.input('poll_interval', valid_type=Int, default=Int(60))
+        spec.input('options', valid_type=ParameterData, required=False)
+        spec.input('auto_size', valid_type=Bool, default=Bool(False))
+        spec.outline(
+            cls.setup,
+            while_(cls.has_work)(
+                cls.submit_available,
+                cls.collect_finished,
+            ),
+            cls.report_throughput,
+        )
+        spec.output('throughput', valid_type=ParameterData)
+
+    def setup(self):
+        """Collect nodes to compute."""
+        group = Group.get_from_string(self.inputs.input_group.value)
+        self.ctx.remaining = [node.pk for node in group.nodes]
+        # pks of submitted calculations not collected yet
+        self.ctx.active = []
+        self.ctx.records = []
+        self.ctx.failed = []
+
+        if 'options' in self.inputs:
+            self.ctx.options = self.inputs.options.get_dict()
+        else:
+            self.ctx.options = DEFAULT_OPTIONS
+
+    def has_work(self):
+        return bool(self.ctx.remaining or self.ctx.active)
+
+    def _calculation_inputs(self, node):
+        """Return inputs of calculation for node of input group."""
+        inputs = {
+            'code': self.inputs.code,
+            'parameters': self.inputs.parameters,
+            '_options': self.ctx.options,
+            '_label': 'screening {}'.format(node.pk),
+        }
+
+        if isinstance(node, StructureData):
+            from aiida_gudhi.calculations.distance_matrix import \
+                distance_matrix_inline
+            _calc, result = distance_matrix_inline(structure=node)
+            node = result['distance_matrix']
+        inputs[input_link(node)] = node
+
+        if self.inputs.auto_size.value:
+            inputs['_options'] = self._estimated_options(node)
+
+        return inputs
+
+    def _estimated_options(self, node):
+        """Scheduler options estimated from size of Rips complex."""
+        from aiida_gudhi.estimate import estimate_input, calculation_options
+
+        parameters = self.inputs.parameters
+        parameters = parameters.validate(parameters.get_dict())
+        estimate = estimate_input(node, parameters['max-edge-length'],
+                                  parameters['cpx-dimension'])
+
+        options = dict(self.ctx.options)
+        options.update(calculation_options(estimate))
+        return options
+
+    def submit_available(self):
+        """Fill free slots of the computer, then wait for a job to end.
+
+        Occupied slots are the jobs of any user or workchain being submitted
+        to or held by the scheduler of the computer of the code, plus the
+        calculations of this workchain not yet picked up by the daemon.
+        """
+        computer = self.inputs.code.get_remote_computer()
+        occupied = set(active_calculations(computer)) | set(self.ctx.active)
+        free = self.inputs.max_concurrent.value - len(occupied)
+
+        process = RipsDistanceMatrixCalculation.process()
+        num_submitted = 0
+        while free > 0 and self.ctx.remaining:
+            inputs = self._calculation_inputs(
+                load_node(self.ctx.remaining.pop(0)))
+            self.ctx.active.append(submit(process, **inputs).pid)
+            num_submitted += 1
+            free -= 1
+
+        if num_submitted:
+            self.report("submitted {} calculations, {} remaining".format(
+                num_submitted, len(self.ctx.remaining)))
+
+        # jobs of others cannot be waited on; their load is polled instead
+        poll_until = None
+        if self.ctx.remaining:
+            poll_until = time.time() + self.inputs.poll_interval.value
+        self.insert_barrier(
+            wait_on_calculations(self.collect_finished.__name__,
+                                 self.ctx.active, poll_until))
+
+    def collect_finished(self):
+        """Add outputs of finished calculations to output group."""
+        group, _created = Group.get_or_create(
+            name=self.inputs.output_group.value)
+        link = self.inputs.parameters.output_links[0]
+
+        active = []
+        for pk in self.ctx.active:
+            calc = load_node(pk)
+            if not calc.has_finished():
+                active.append(pk)
+                continue
+
+            outputs = calc.get_outputs_dict()
+            if link in outputs:
+                group.add_nodes([outputs[link]])
+                self.ctx.records.append(_calculation_record(calc))
+            else:
+                self.ctx.failed.append(calc.pk)
+
+        self.ctx.active = active
+
+    def report_throughput(self):
+        """Output throughput statistics."""
+        stats = throughput_statistics(self.ctx.records)
+        stats['failed'] = len(self.ctx.failed)
+        self.report("throughput: {}".format(stats))
+        self.out('throughput', ParameterData(dict=stats).store())
@@ -0,0 +1,66 @@
+""" Tests for screening workchain
+
+"""
+import time
+from datetime import datetime, timedelta
+import aiida_gudhi.tests as gt
+
+
+class TestScreening(gt.PluginTestCase):
+    def test_throughput_statistics(self):
+        from aiida_gudhi.workflows.screening import throughput_statistics
+
+        start = datetime(2018, 1, 1)
+        records = []
+        for i in range(4):
+            submitted = start + timedelta(minutes=i)
+            records.append({
+                'submitted': submitted,
+                'queued': submitted,
+                'dispatched': submitted + timedelta(seconds=30),
+                'retrieved': submitted + timedelta(minutes=10),
+                'parsed': submitted + timedelta(minutes=10, seconds=2),
+            })
+
+        stats = throughput_statistics(records)
+        self.assertEqual(stats['jobs'], 4)
+        # 4 jobs from 00:00:00 to 00:13:02
+        self.assertAlmostEqual(stats['jobs_per_hour'], 4 * 3600. / 782)
+        self.assertAlmostEqual(stats['mean_queue_wait_seconds'], 30)
+        self.assertAlmostEqual(stats['mean_parse_seconds'], 2)
+
+    def test_wait_on_calculations(self):
+        # pylint: disable=protected-access
+        from plum.wait_ons import WaitOnProcess
+        from aiida_gudhi.workflows.screening import (wait_on_calculations,
+                                                     WaitOnTime)
+
+        # own calculations only
+        barrier = wait_on_calculations('collect', [3, 5])
+        self.assertEqual(
+            [type(w) for w in barrier._wait_list], [WaitOnProcess] * 2)
+
+        # without own calculations, the load of the computer is polled
+        barrier = wait_on_calculations('collect', [], time.time() - 1)
+        self.assertTrue(barrier.is_ready())
+        self.assertFalse(
+            WaitOnTime('collect', time.time() + 3600).is_ready())
+
+        with self.assertRaises(ValueError):
+            wait_on_calculations('collect', [])
+
+    def test_input_link(self):
+        import numpy as np
+        from aiida.orm import DataFactory
+        from aiida_gudhi.workflows.screening import input_link
+        ArrayData = DataFactory('array')
+        EdgeListData = DataFactory('gudhi.edge_list')
+
+        point_cloud = ArrayData()
+        point_cloud.set_array('positions', np.random.rand(5, 3))
+        edge_list = EdgeListData.from_point_cloud(np.random.rand(5, 3), 0.5)
+
+        self.assertEqual(input_link(point_cloud), 'point_cloud')
+        self.assertEqual(input_link(edge_list), 'distance_matrix')
+        with self.assertRaises(ValueError):
+            input_link(DataFactory('parameter')(dict={}))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark the alpha complex against the Rips complex.
+
+Runs ``alpha_complex_persistence`` and ``rips_distance_matrix_persistence``
+on random points in the unit cube and records wallclock time (incl. file
+I/O) and peak memory of both.
+
+Balls of radius r correspond to 'max-alpha-square' r**2 for the alpha
+complex and to 'max-edge-length' 2r for the Rips complex.
+
+Usage: python alpha_vs_rips.py --points 1000 --points 4000 --radius 0.1
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import click
+import numpy as np
+
+from aiida_gudhi.tests import get_path_to_executable
+from aiida_gudhi.distance import write_point_cloud_matrix
+from aiida_gudhi.calculations.alpha import write_off
+from aiida_gudhi.parsers.barcode import read_barcode
+
+# runs command and prints peak memory of the child in kB (Linux)
+MAXRSS_WRAPPER = ("import resource, subprocess, sys; "
+                  "subprocess.check_call(sys.argv[1:]); "
+                  "print(resource.getrusage(resource.RUSAGE_CHILDREN)"
+                  ".ru_maxrss)")
+
+
+def run(command):
+    """Run command and return (seconds, peak memory in bytes)."""
+    start = time.time()
+    maxrss_kb = subprocess.check_output([sys.executable, '-c', MAXRSS_WRAPPER]
+                                        + command).split()[-1]
+    return time.time() - start, int(maxrss_kb) * 1024
+
+
+def run_alpha(positions, radius, folder):
+    """Run alpha_complex_persistence on positions."""
+    points_file = os.path.join(folder, 'points.off')
+    output = os.path.join(folder, 'alpha.barcode')
+    with open(points_file, 'w') as handle:
+        write_off(handle, positions)
+
+    seconds, memory = run([
+        get_path_to_executable('alpha_complex_persistence'),
+        '--max-alpha-square',
+        str(radius**2), '--output-file', output, points_file
+    ])
+    return seconds, memory, read_barcode(output)
+
+
+def run_rips(positions, radius, cpx_dimension, folder):
+    """Run rips_distance_matrix_persistence on distances of positions."""
+    matrix_file = os.path.join(folder, 'distance.matrix')
+    output = os.path.join(folder, 'rips.barcode')
+    with open(matrix_file, 'w') as handle:
+        write_point_cloud_matrix(handle, positions)
+
+    seconds, memory = run([
+        get_path_to_executable('rips_distance_matrix_persistence'),
+        '--max-edge-length',
+        str(2 * radius), '--cpx-dimension',
+        str(cpx_dimension), '--output-file', output, matrix_file
+    ])
+    return seconds, memory, read_barcode(output)
+
+
+@click.command('cli')
+@click.option('--points', multiple=True, type=int, default=[500, 1000, 2000])
+@click.option('--radius', default=0.1, help='Ball radius')
+@click.option('--cpx-dimension', default=3, help='Rips simplex dimension')
+def main(points, radius, cpx_dimension):
+    """Compare time and memory of alpha and Rips complex."""
+    folder = tempfile.mkdtemp()
+
+    print("{:>7} {:>10} {:>10} {:>10} {:>10} {:>8} {:>8}".format(
+        'points', 'alpha [s]', 'rips [s]', 'alpha [MB]', 'rips [MB]',
+        'alpha #', 'rips #'))
+    try:
+        for num_points in points:
+            positions = np.random.RandomState(0).rand(num_points, 3)
+            t_alpha, m_alpha, b_alpha = run_alpha(positions, radius, folder)
+            t_rips, m_rips, b_rips = run_rips(positions, radius,
+                                              cpx_dimension, folder)
+            print("{:7d} {:10.2f} {:10.2f} {:10.1f} {:10.1f} {:8d} {:8d}".
+                  format(num_points, t_alpha, t_rips, m_alpha / 1024.**2,
+                         m_rips / 1024.**2, len(b_alpha), len(b_rips)))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark parsing of large GUDHI barcode files.
+
+Compares the structured, chunked reader of BarcodeParser against the
+previous ``np.genfromtxt`` path on ``sample.barcode`` scaled up by repetition.
+
+Usage: python barcode_parser.py --lines 10000000
+"""
+import os
+import time
+import tempfile
+import click
+import numpy as np
+
+from aiida_gudhi.tests import TEST_DIR
+from aiida_gudhi.parsers.barcode import BarcodeParser
+
+
+def scale_barcode(lines, filename):
+    """Write ``lines`` lines of sample.barcode (repeated) to filename."""
+    with open(os.path.join(TEST_DIR, 'sample.barcode'), 'r') as handle:
+        sample = handle.readlines()
+
+    repeats, rest = divmod(lines, len(sample))
+    block = ''.join(sample)
+    with open(filename, 'w') as handle:
+        for _i in range(repeats):
+            handle.write(block)
+        handle.write(''.join(sample[:rest]))
+
+
+def timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+
+@click.command('cli')
+@click.option('--lines', default=10**7, help='Number of barcode lines')
+@click.option('--skip-legacy', is_flag=True, help='Skip np.genfromtxt path')
+def main(lines, skip_legacy):
+    """Time parsing of a barcode with LINES lines."""
+    handle, filename = tempfile.mkstemp(suffix='.barcode')
+    os.close(handle)
+
+    try:
+        scale_barcode(lines, filename)
+        size = os.path.getsize(filename) / 1024.**2
+        print("Barcode file: {} lines, {:.1f} MB".format(lines, size))
+
+        t_fast, data = timed(BarcodeParser.parse, filename)
+        print("BarcodeParser.parse: {:.2f} s ({} intervals)".format(
+            t_fast, len(data)))
+
+        if not skip_legacy:
+            t_legacy, legacy = timed(np.genfromtxt, filename)
+            assert np.array_equal(legacy[:, 3], data['death'])
+            print("np.genfromtxt:       {:.2f} s".format(t_legacy))
+            print("Speedup:             {:.1f}x".format(t_legacy / t_fast))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Calibrate the resource estimator against GUDHI runs.
+
+Runs ``rips_distance_matrix_persistence`` on random point clouds of
+increasing size, records wallclock time and peak memory and fits the
+constants of aiida_gudhi.estimate by least squares.
+
+Without the command line tool, ``--backend python`` runs the same steps
+(C++ matrix reader, Rips complex, persistent cohomology) through the GUDHI
+Python module. The Python lists holding the matrix add some memory and
+time per entry, i.e. the per-entry constants are upper bounds.
+
+Usage: python calibrate_estimator.py --points 1000 --points 4000
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import click
+import numpy as np
+
+from aiida_gudhi import estimate
+from aiida_gudhi.tests import get_path_to_executable
+from aiida_gudhi.distance import write_point_cloud_matrix, read_gudhi_matrix
+
+# runs command and prints peak memory of the child in kB (Linux)
+MAXRSS_WRAPPER = ("import resource, subprocess, sys; "
+                  "subprocess.check_call(sys.argv[1:]); "
+                  "print(resource.getrusage(resource.RUSAGE_CHILDREN)"
+                  ".ru_maxrss)")
+
+# same steps as rips_distance_matrix_persistence, via the Python module
+PYTHON_BACKEND = r"""
+import sys, gudhi
+matrix_file, max_edge_length, cpx_dimension, output = sys.argv[1:]
+matrix = gudhi.read_lower_triangular_matrix_from_csv_file(matrix_file)
+rips = gudhi.RipsComplex(
+    distance_matrix=matrix, max_edge_length=float(max_edge_length))
+del matrix
+simplex_tree = rips.create_simplex_tree(max_dimension=int(cpx_dimension))
+with open(output, 'w') as handle:
+    for dim, (birth, death) in simplex_tree.persistence(
+            homology_coeff_field=11):
+        handle.write('11 {} {} {}\n'.format(dim, birth, death))
+"""
+
+
+def run_gudhi(executable, matrix_file, max_edge_length, cpx_dimension,
+              folder):
+    """Run GUDHI and return (seconds, peak memory in bytes).
+
+    :param executable: path to rips_distance_matrix_persistence or None to
+        use the GUDHI Python module
+    """
+    output = os.path.join(folder, 'out.barcode')
+    if executable is None:
+        gudhi_command = [
+            sys.executable, '-c', PYTHON_BACKEND, matrix_file,
+            str(max_edge_length),
+            str(cpx_dimension), output
+        ]
+    else:
+        gudhi_command = [
+            executable, '--max-edge-length',
+            str(max_edge_length), '--cpx-dimension',
+            str(cpx_dimension), '--output-file', output, matrix_file
+        ]
+    command = [sys.executable, '-c', MAXRSS_WRAPPER] + gudhi_command
+    start = time.time()
+    maxrss_kb = subprocess.check_output(command).split()[-1]
+    return time.time() - start, int(maxrss_kb) * 1024
+
+
+@click.command('cli')
+@click.option(
+    '--points', multiple=True, type=int, default=[500, 1000, 2000, 4000])
+@click.option(
+    '--max-edge-length',
+    multiple=True,
+    type=float,
+    default=[0.1, 0.15, 0.2],
+    help='Rips threshold')
+@click.option(
+    '--max-simplices',
+    default=3e7,
+    help='Skip runs with more (estimated) simplices')
+@click.option('--cpx-dimension', default=3, help='Maximum simplex dimension')
+@click.option(
+    '--backend',
+    type=click.Choice(['cli', 'python']),
+    default='cli',
+    help='GUDHI command line tool or Python module')
+def main(points, max_edge_length, cpx_dimension, max_simplices, backend):
+    """Fit memory and time per matrix entry and per simplex."""
+    executable = None
+    if backend == 'cli':
+        executable = get_path_to_executable(
+            'rips_distance_matrix_persistence')
+    folder = tempfile.mkdtemp()
+
+    rows = []
+    try:
+        for num_points in points:
+            positions = np.random.RandomState(0).rand(num_points, 3)
+            matrix_file = os.path.join(folder, 'distance.matrix')
+            with open(matrix_file, 'w') as handle:
+                write_point_cloud_matrix(handle, positions)
+
+            condensed = read_gudhi_matrix(matrix_file)
+            for threshold in max_edge_length:
+                result = estimate.estimate_resources(condensed, threshold,
+                                                     cpx_dimension)
+                simplices = sum(result['simplices'])
+                if simplices > max_simplices:
+                    continue
+                seconds, memory = run_gudhi(executable, matrix_file,
+                                            threshold, cpx_dimension, folder)
+                rows.append((len(condensed), simplices, seconds, memory))
+                print("{:6d} points, max-edge-length {}: {:.3g} simplices "
+                      "(est.), {:.2f} s (est. {:.2f} s), {:.1f} MB "
+                      "(est. {:.1f} MB)".format(
+                          num_points, threshold, simplices, seconds,
+                          result['seconds'], memory / 1024.**2,
+                          result['memory_bytes'] / 1024.**2))
+    finally:
+        shutil.rmtree(folder)
+
+    entries, simplices, seconds, memory = np.array(rows).T
+    # constant terms: start-up time (not estimated) and base memory
+    design = np.column_stack((np.ones_like(entries), entries, simplices))
+    time_fit = np.linalg.lstsq(design, seconds, rcond=None)[0]
+    memory_fit = np.linalg.lstsq(design, memory, rcond=None)[0]
+
+    print("\nFitted constants for aiida_gudhi/estimate.py:")
+    print("(start-up: {:.3g} s)".format(time_fit[0]))
+    print("SECONDS_PER_ENTRY = {:.3g}".format(time_fit[1]))
+    print("SECONDS_PER_SIMPLEX = {:.3g}".format(time_fit[2]))
+    print("BASE_BYTES = {:.3g}".format(memory_fit[0]))
+    print("BYTES_PER_ENTRY = {:.3g}".format(memory_fit[1]))
+    print("BYTES_PER_SIMPLEX = {:.3g}".format(memory_fit[2]))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
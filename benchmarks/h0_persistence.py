@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark in-process H0 persistence against GUDHI.
+
+Generates a random point cloud, computes its distance matrix and times
+``h0_barcode`` against ``rips_distance_matrix_persistence`` restricted to
+1-dimensional complexes (the minimum needed for H0).
+
+Usage: python h0_persistence.py --points 2000 --max-edge-length 0.2
+"""
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+import click
+import numpy as np
+
+from aiida_gudhi.tests import get_path_to_executable
+from aiida_gudhi.distance import write_point_cloud_matrix, read_gudhi_matrix
+from aiida_gudhi.parsers.barcode import BarcodeParser
+from aiida_gudhi.persistence import h0_barcode
+
+
+def timed(function, *args, **kwargs):
+    start = time.time()
+    result = function(*args, **kwargs)
+    return time.time() - start, result
+
+
+def run_gudhi(executable, matrix_file, max_edge_length, folder):
+    """Run rips_distance_matrix_persistence and parse its H0 barcode."""
+    output = os.path.join(folder, 'out.barcode')
+    subprocess.check_call([
+        executable, '--max-edge-length',
+        str(max_edge_length), '--cpx-dimension', '1', '--output-file',
+        output, matrix_file
+    ])
+    data = BarcodeParser.parse(output)
+    return data[data['dim'] == 0]
+
+
+@click.command('cli')
+@click.option('--points', default=2000, help='Number of points')
+@click.option('--max-edge-length', default=0.2, help='Rips threshold')
+@click.option('--skip-gudhi', is_flag=True, help='Skip external GUDHI run')
+def main(points, max_edge_length, skip_gudhi):
+    """Time H0 barcode of POINTS random points in the unit cube."""
+    positions = np.random.RandomState(0).rand(points, 3)
+    folder = tempfile.mkdtemp()
+
+    try:
+        matrix_file = os.path.join(folder, 'distance.matrix')
+        with open(matrix_file, 'w') as handle:
+            write_point_cloud_matrix(handle, positions)
+        condensed = read_gudhi_matrix(matrix_file)
+        print("Distance matrix: {} points".format(points))
+
+        t_numpy, barcode = timed(
+            h0_barcode, condensed, max_edge_length=max_edge_length)
+        print("h0_barcode:   {:.2f} s ({} intervals)".format(
+            t_numpy, len(barcode)))
+
+        if not skip_gudhi:
+            executable = get_path_to_executable(
+                'rips_distance_matrix_persistence')
+            t_gudhi, reference = timed(run_gudhi, executable, matrix_file,
+                                       max_edge_length, folder)
+            assert len(reference) == len(barcode)
+            print("GUDHI:        {:.2f} s (incl. file I/O)".format(t_gudhi))
+            print("Speedup:      {:.1f}x".format(t_gudhi / t_numpy))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,40 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+import click
+
+
+@click.command('cli')
+@click.argument('group')
+@click.argument('dataset')
+@click.option('--compress', is_flag=True, help='Store compressed chunk')
+@click.option('--jobs', default=1, help='Number of parsing processes')
+@click.option('--chunk-size', default=10000, help='Barcodes per chunk')
+@click.option(
+    '--consolidate',
+    'consolidate_chunks',
+    is_flag=True,
+    help='Merge chunks into one memory-mappable chunk')
+def main(group, dataset, compress, jobs, chunk_size, consolidate_chunks):
+    """Export barcodes of all calculations in GROUP to DATASET directory.
+
+    Barcodes already in the dataset are skipped, i.e. running the command
+    again appends new calculations only.
+    Load the dataset with aiida_gudhi.export.load_dataset.
+    """
+    from aiida_gudhi.export import (export_barcodes, group_barcode_sources,
+                                    consolidate)
+
+    count = export_barcodes(
+        dataset,
+        group_barcode_sources(group),
+        compress=compress,
+        n_jobs=jobs,
+        chunk_size=chunk_size)
+    print("exported {} new barcodes to {}".format(count, dataset))
+
+    if consolidate_chunks:
+        consolidate(dataset)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -13,9 +13,7 @@ code = get_code(entry_point='gudhi.rdm')
 # set up calculation
 calc = code.new_calc()
 calc.label = "compute rips from distance matrix"
-calc.set_max_wallclock_seconds(1 * 60)
 calc.set_withmpi(False)
-calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
 
 # Prepare input parameters
 from aiida.orm import DataFactory
@@ -28,6 +26,11 @@ distance_matrix = SinglefileData(
     file=os.path.join(TEST_DIR, 'sample_distance.matrix'))
 calc.use_distance_matrix(distance_matrix)
 
+# set resources, wallclock time and memory from estimated complex size
+from aiida_gudhi.estimate import size_calculation
+estimate = size_calculation(calc)
+print("Estimated simplices: {}".format(estimate['simplices']))
+
 calc.store_all()
 calc.submit()
 #calc.submit_test(folder=gt.get_temp_folder())
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Submit screening workchain for all distance matrices of a group.
+
+Usage: verdi run submit_screening.py <input group> <output group>
+
+Note: This script assumes you have set up computer and code as in README.md.
+"""
+import sys
+from aiida.orm import DataFactory
+from aiida.orm.data.base import Str, Int
+from aiida.work.run import submit
+from aiida_gudhi.tests import get_code
+from aiida_gudhi.workflows.screening import RipsScreeningWorkChain
+
+Parameters = DataFactory('gudhi.rdm')
+ParameterData = DataFactory('parameter')
+
+input_group, output_group = sys.argv[1:3]
+
+options = ParameterData(dict={
+    'resources': {
+        'num_machines': 1,
+        'num_mpiprocs_per_machine': 1
+    },
+    'max_wallclock_seconds': 30 * 60,
+})
+
+submit(
+    RipsScreeningWorkChain,
+    code=get_code(entry_point='gudhi.rdm'),
+    parameters=Parameters(dict={'max-edge-length': 4.2}),
+    input_group=Str(input_group),
+    output_group=Str(output_group),
+    max_concurrent=Int(100),
+    options=options)